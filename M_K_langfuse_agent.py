@@ -3,10 +3,13 @@ import json
 import os
 import time
 import re
+import uuid
 from datetime import datetime
 from dotenv import load_dotenv
 
 from mcp_manager.tools_manager import ToolsManager
+from mcp_manager.schema_cache import SchemaCache
+from mcp_manager.tool_policy import ToolPolicy
 load_dotenv(dotenv_path=r'C:\Users\MikelKulla\Desktop\langfuse_template\.env')
 
 # MUST come before any HTTP library imports
@@ -22,10 +25,18 @@ from langfuse.langchain import CallbackHandler as LangfuseCallbackHandler
 from server_configs import __version__, __author__, __description__, __last_updated__, get_server_configurations
 from prompts import ALL_PROMPTS
 from callbacks import CleanStatsCallback
+from budgets import BudgetExceededError, RunBudget
+from timeline import Timeline
+from agent_checkpoints import AgentCheckpoints
+from run_log import RunLog
+from step_journal import StepJournal
+from serializers import append_execution, get_serializer, write_execution
+from records import ExecutionRecord, ExecutionSummary
+from middleware import ContextCompactionMiddleware, RateLimitMiddleware, get_shared_governor
 
 
 # ====================== MAIN WITH PERSISTENT SESSION ======================
-async def main():
+async def main(server=None, prompt_number=None, trials=None, trial_numbers=None, log_dir=None):
     """
     Main execution function with persistent MCP session support.
 
@@ -34,8 +45,23 @@ async def main():
     - Comprehensive logging and metrics
     - Multi-server configuration support
     - Langfuse integration for observability
+
+    Every argument defaults to the settings below, so running the file as is
+    keeps working; work_queue.py workers pass them per job.
+
+    Args:
+        server: Server to run against (default: active_server below)
+        prompt_number: Prompt to run (default: idx below)
+        trials: Number of trials of the prompt (default: TRIALS env var, 1)
+        trial_numbers: Only run these trials out of 1..trials (default: all)
+        log_dir: Output directory of the logs and JSON files
+
+    Returns:
+        One dict per run: run_id, trial, termination_reason, json_path
     """
     start_time = time.perf_counter()
+    # Framework phases before the first trial (session setup), see timeline.py
+    setup_timeline = Timeline(start_time)
 
     # Print version banner
     print("=" * 70)
@@ -60,6 +86,8 @@ async def main():
     active_server = "cdata_monday_mcp_custom"
     active_server = "cdata_bc365_mcp_custom"
     active_server = "cdata_bc365_mcp"
+    if server:
+        active_server = server
     # =======================================================================================================================================
     # =======================================================================================================================================
     connections_map = get_server_configurations(monday_token)
@@ -71,14 +99,17 @@ async def main():
         )
 
     config = connections_map[active_server]
+    log_dir = log_dir or r"C:\Users\MikelKulla\Desktop\langfuse_template\executions"
     print(f"Selected Server: {active_server}")
     print(f"   Description: {config['description']}")
     print()
+    setup_timeline.extend("startup")
 
     # CRITICAL FIX: Give native server time to start
     if config["is_native"]:
         print(f"Starting native Monday MCP server ({active_server})... waiting 3 seconds")
         await asyncio.sleep(3)
+        setup_timeline.extend("server_start_wait")
 
     # Create MCP client
     print(f"Creating MCP client for '{active_server}'...")
@@ -86,6 +117,7 @@ async def main():
         connections={active_server: {k: v for k, v in config.items() if k not in ["is_native", "description"]}}
     )
     print("MCP client created")
+    setup_timeline.extend("client_create")
 
     # ═══════════════════════════════════════════════════════════════
     # USE PERSISTENT SESSION - SINGLE PROCESS ARCHITECTURE
@@ -93,8 +125,18 @@ async def main():
     print(f"Opening persistent session for '{active_server}' server...")
     async with mcp_client.session(active_server) as session:
         print(f"Persistent session opened")
-
-        tools_manager = ToolsManager(session)
+        setup_timeline.extend("session_open")
+
+        # CData servers: table/column discovery is served from a cache shared across runs
+        schema_cache = None if config["is_native"] else SchemaCache(os.path.join(log_dir, "schema_cache.db"))
+        # Per-tool timeouts, idempotency-aware retries and hedging of slow read-only calls
+        tools_manager = ToolsManager(
+            session,
+            server_name=active_server,
+            schema_cache=schema_cache,
+            default_policy=ToolPolicy(timeout_s=120, max_retries=2, hedge_percentile=95),
+            tool_policies={"run_query": ToolPolicy(timeout_s=300, max_retries=1, hedge_percentile=95)},
+        )
         # Optional retry for native servers
         for attempt in range(2):
             try:
@@ -106,6 +148,7 @@ async def main():
                     await asyncio.sleep(2)
                 else:
                     raise e
+        setup_timeline.extend("tool_load")
 
         llm = ChatAnthropic(
             model=os.environ["MODEL"],
@@ -114,184 +157,348 @@ async def main():
             max_tokens=10000,
             max_retries=6
         )
-
-        agent = create_agent(llm, safe_tools)
-        print("Agent created with persistent session tools")
+        setup_timeline.extend("llm_create")
 
         # ===== PROMPT SELECTION =====
-        idx = 48
+        idx = prompt_number or 48
         idx -= 1
         run_number, user_prompt = ALL_PROMPTS[idx]
 
+        # ===== REPEATED TRIALS =====
+        # Independent runs of the prompt on this server. LLM runs vary a lot, so with several
+        # trials utils/analyze_data.py compares medians and only names significant winners
+        trials = trials or int(os.environ.get("TRIALS", 1))
+
         # Generate clean filename
         clean_snippet = re.sub(r'[^a-zA-Z0-9]', '', user_prompt.replace(" ", ""))[:10]
         base_filename = f"{run_number}_{clean_snippet}"
-        log_dir = r"C:\Users\MikelKulla\Desktop\langfuse_template\executions"
-
-        # Include version in filename for tracking
-        versioned_filename = f"v{__version__.replace('.', '_')}_{active_server}_{base_filename}"
-        log_path = os.path.join(log_dir, f"{versioned_filename}.log")
-        json_path = os.path.join(log_dir, f"{versioned_filename}.json")
-
-        print(f"\n{'='*70}")
-        print(f"Running prompt #{run_number} with PERSISTENT session")
-        print(f"   Server: {active_server}")
-        print(f"   Version: {__version__}")
-        print(f"{'='*70}")
-        print(f"Logs: {log_path}")
-        print(f"JSON: {json_path}\n")
-
-        # Stats dict - mutated by CleanStatsCallback
-        stats = {
-            'total_llm_time': 0.0,
-            'total_tokens_input': 0,
-            'total_tokens_output': 0,
-            'total_mcp_time': 0.0,
-            'conversation_steps': [],
-        }
-
-        # Load prompt history
+
+        # Prompt history, appended to in place after each run (see serializers.py)
         prompt_json_path = os.path.join(log_dir, f"prompt_{run_number}.json")
-        if os.path.exists(prompt_json_path):
-            try:
-                with open(prompt_json_path, "r", encoding="utf-8") as f:
-                    prompt_history = json.load(f)
-                    if not isinstance(prompt_history, list):
-                        prompt_history = []
-            except:
-                prompt_history = []
-        else:
-            prompt_history = []
-
-        with open(log_path, "a", encoding="utf-8") as log_file:
-            print("=" * 90, file=log_file, flush=True)
-            print(f"  {__description__}", file=log_file, flush=True)
-            print(f"  Version: {__version__} | Author: {__author__}", file=log_file, flush=True)
-            print("=" * 90, file=log_file, flush=True)
-            print(f"EXECUTION #{run_number} | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", file=log_file, flush=True)
-            print(f"Model: {os.environ['MODEL']} | Provider: Anthropic", file=log_file, flush=True)
-            print(f"MCP Server: {active_server} | Session: PERSISTENT", file=log_file, flush=True)
-            print(f"Server Description: {config['description']}", file=log_file, flush=True)
-            print(f"Prompt: {user_prompt}", file=log_file, flush=True)
-            print("=" * 90, file=log_file, flush=True)
-
-            langfuse_handler = LangfuseCallbackHandler()
-            stats_handler = CleanStatsCallback(log_file, stats)
-
-            final_answer = ""
-            trace_url = ""
 
+        # ===== SERIALIZERS =====
+        # JSON for the step journal and prompt history (default: orjson when installed); the
+        # individual run files can also be archived as compact binary (RUN_FILE_SERIALIZER=msgpack)
+        serializer = get_serializer(os.environ.get("SERIALIZER"))
+        run_file_serializer = get_serializer(os.environ.get("RUN_FILE_SERIALIZER") or serializer.name)
+        setup_timeline.extend("prompt_load")
+
+        # ===== AGENT CHECKPOINTS =====
+        # Graph state saved after every step, so a trial whose run failed halfway resumes from its
+        # last completed step the next time it runs (AGENT_CHECKPOINTS=0 disables, AGENT_CHECKPOINT_DB moves it)
+        checkpoints = None
+        if os.environ.get("AGENT_CHECKPOINTS", "1") != "0":
             try:
-                agent_config = {
-                    "callbacks": [langfuse_handler, stats_handler],
-                    "run_name": f"CData_v{__version__}_Exec_{run_number}",
-                    "metadata": {
-                        "framework_version": __version__,
-                        "execution_number": run_number,
-                        "model": os.environ["MODEL"],
-                        "mcp_server": active_server,
-                        "session_mode": "persistent",
-                        "server_description": config['description']
-                    },
-                    "recursion_limit": 200,
-                }
-
-                response = await agent.ainvoke(
-                    {"messages": [{"role": "user", "content": user_prompt}]},
-                    config=agent_config,
-                )
-
-                final_answer = response["messages"][-1].content
-
-                print("\n" + "=" * 90, file=log_file, flush=True)
-                print("FINAL ANSWER:", file=log_file, flush=True)
-                print(final_answer, file=log_file, flush=True)
+                checkpoints = await AgentCheckpoints(
+                    os.environ.get("AGENT_CHECKPOINT_DB") or os.path.join(log_dir, "agent_checkpoints.db")).open()
+            except RuntimeError as e:
+                print(f"⚠️  {e}; failed runs will start over")
+        setup_timeline.extend("checkpoint_open")
+
+        results = []
+        for trial in trial_numbers or range(1, trials + 1):
+            # Each trial starts from fresh stats, middleware, agent and budget. A single run is
+            # timed from process start as before; repeated trials exclude the shared session setup
+            trial_start = start_time if trials == 1 else time.perf_counter()
+            # A single run's timeline includes the session setup; each repeated trial starts its own
+            timeline = setup_timeline if trials == 1 else Timeline(trial_start)
+
+            # Include version (and the trial, when repeating) in filename for tracking
+            versioned_filename = f"v{__version__.replace('.', '_')}_{active_server}_{base_filename}"
+            if trials > 1:
+                versioned_filename += f"_trial{trial}"
+            log_path = os.path.join(log_dir, f"{versioned_filename}.log")
+            json_path = os.path.join(log_dir, f"{versioned_filename}{run_file_serializer.extension}")
+            # Steps are spilled here as they complete; only their summaries stay in memory
+            journal_path = os.path.join(log_dir, f"{versioned_filename}.steps.jsonl")
+            run_id = str(uuid.uuid4())
+            # Checkpoint thread of this server, prompt and trial, picked up again by its next run
+            thread_id = versioned_filename
+
+            # Stats dict - mutated by CleanStatsCallback and the agent middleware
+            stats = {
+                'total_llm_time': 0.0,
+                'total_tokens_input': 0,
+                'total_tokens_output': 0,
+                'total_mcp_time': 0.0,
+                'total_llm_queue_time': 0.0,
+                'total_tool_calls': 0,
+                'conversation_steps': StepJournal(journal_path, serializer),
+            }
+
+            # Elide stale tool results once the history outgrows the budget
+            compaction = ContextCompactionMiddleware(stats, max_context_tokens=60000, keep_recent_messages=6)
+
+            # Queue LLM calls before they would exceed the account's rate limits, in a window shared
+            # with every process using the same file (ANTHROPIC_RATE_DB; work_queue.py workers share one)
+            governor = get_shared_governor(
+                os.environ.get("ANTHROPIC_RATE_DB") or os.path.join(log_dir, "rate_limits.db"),
+                requests_per_minute=int(os.environ.get("ANTHROPIC_RPM_LIMIT", 50)),
+                input_tokens_per_minute=int(os.environ.get("ANTHROPIC_ITPM_LIMIT", 30000)),
+                output_tokens_per_minute=int(os.environ.get("ANTHROPIC_OTPM_LIMIT", 8000)),
+            )
+            rate_limit = RateLimitMiddleware(stats, governor)
+
+            # Compaction runs first so the rate limiter sees the compacted request
+            agent = create_agent(llm, safe_tools, middleware=[compaction, rate_limit],
+                                 checkpointer=checkpoints.saver if checkpoints else None)
+            print("Agent created with persistent session tools")
+
+            # ===== RUN BUDGET =====
+            # Runaway runs are cancelled once any of these is reached (None = unlimited)
+            budget = RunBudget(
+                max_input_tokens=2_000_000,
+                max_output_tokens=100_000,
+                max_wall_time_s=1800,
+                max_tool_calls=150,
+            )
+
+            # ===== RESUME =====
+            # An earlier run of this trial that failed left a checkpoint: continue from it, with the
+            # restored LLM calls, tool calls and time counted against the budget
+            restored = await checkpoints.restore(agent, thread_id, user_prompt) if checkpoints else None
+            resumed = bool(restored and restored["resumed"])
+            if resumed:
+                budget.carry_over(restored["saved_input_tokens"], restored["saved_output_tokens"],
+                                  restored["saved_tool_calls"], restored["saved_time_s"])
+
+            # ===== RUN LOG =====
+            # Rotated and gzipped past LOG_MAX_MB; tool bodies cut to LOG_BODY_CHARS (0 = whole) and,
+            # with LOG_BODY_SAMPLE < 1, only that share logged. The JSON keeps the full bodies
+            run_log = RunLog(
+                log_path,
+                max_bytes=int(float(os.environ.get("LOG_MAX_MB", 10)) * 1024 * 1024),
+                max_segments=int(os.environ.get("LOG_MAX_SEGMENTS", 20)),
+                body_chars=int(os.environ.get("LOG_BODY_CHARS", 2000)) or None,
+                body_sample_rate=float(os.environ.get("LOG_BODY_SAMPLE", 1.0)),
+            )
+
+            print(f"\n{'='*70}")
+            print(f"Running prompt #{run_number} with PERSISTENT session")
+            print(f"   Server: {active_server}")
+            print(f"   Version: {__version__}")
+            if trials > 1:
+                print(f"   Trial: {trial}/{trials}")
+            print(f"{'='*70}")
+            print(f"Logs: {log_path}")
+            print(f"JSON: {json_path}\n")
+            if resumed:
+                print(f"▶ Resuming from checkpoint {restored['checkpoint_id']}: {restored['saved_llm_calls']} LLM calls, "
+                      f"{restored['saved_tool_calls']} tool calls and {restored['saved_time_s']:.1f}s restored\n")
+            timeline.extend("agent_setup")
+
+            with run_log as log_file:
+                print("=" * 90, file=log_file, flush=True)
+                print(f"  {__description__}", file=log_file, flush=True)
+                print(f"  Version: {__version__} | Author: {__author__}", file=log_file, flush=True)
+                print("=" * 90, file=log_file, flush=True)
+                print(f"EXECUTION #{run_number} | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", file=log_file, flush=True)
+                print(f"Model: {os.environ['MODEL']} | Provider: Anthropic", file=log_file, flush=True)
+                print(f"MCP Server: {active_server} | Session: PERSISTENT", file=log_file, flush=True)
+                print(f"Server Description: {config['description']}", file=log_file, flush=True)
+                print(f"Prompt: {user_prompt}", file=log_file, flush=True)
+                if trials > 1:
+                    print(f"Trial: {trial}/{trials}", file=log_file, flush=True)
+                if resumed:
+                    print(f"Resumed: checkpoint {restored['checkpoint_id']} of run(s) {', '.join(restored['resumed_runs'])} "
+                          f"({restored['restored_messages']} messages)", file=log_file, flush=True)
                 print("=" * 90, file=log_file, flush=True)
 
-                # Get trace URL safely
-                try:
-                    if hasattr(langfuse_handler, 'last_trace_id') and langfuse_handler.last_trace_id:
-                        project_id = langfuse_handler.client.project_id or "default"
-                        trace_url = f"https://cloud.langfuse.com/project/{project_id}/traces/{langfuse_handler.last_trace_id}"
-                        print(f"\nLangfuse Trace: {trace_url}", file=log_file, flush=True)
-                except:
-                    trace_url = ""
+                langfuse_handler = LangfuseCallbackHandler()
+                stats_handler = CleanStatsCallback(log_file, stats, budget=budget,
+                                                   tool_outcomes=tools_manager.call_outcomes, timeline=timeline)
 
-            except Exception as e:
-                final_answer = f"ERROR: {str(e)}"
-                print(f"\nFATAL ERROR: {e}", file=log_file, flush=True)
-                import traceback
-                traceback.print_exc(file=log_file)
-
-        # Save execution data with version info
-        total_execution_time = time.perf_counter() - start_time
-
-        current_execution = {
-            "framework_version": __version__,
-            "framework_author": __author__,
-            "execution_timestamp": datetime.now().isoformat(),
-            "execution_timestamp_readable": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "mcp_server": active_server,
-            "server_description": config['description'],
-            "session_mode": "persistent",
-            "execution_time_s": round(total_execution_time, 3),
-            "raw_user_prompt": user_prompt,
-            "prompt_id": run_number,
-            "final_answer": final_answer,
-            "langfuse_trace_url": trace_url,
-            "summary": {
-                "total_tokens": stats['total_tokens_input'] + stats['total_tokens_output'],
-                "input_tokens": stats['total_tokens_input'],
-                "output_tokens": stats['total_tokens_output'],
-                "llm_time_s": round(stats['total_llm_time'], 3),
-                "mcp_time_s": round(stats['total_mcp_time'], 3),
-                "total_steps": len(stats['conversation_steps'])
-            },
-            "conversation_flow": stats['conversation_steps']
-        }
-
-        prompt_history.append(current_execution)
-
-        # Save full history for this prompt
-        with open(prompt_json_path, "w", encoding="utf-8") as f:
-            json.dump(prompt_history, f, indent=2, ensure_ascii=False)
-
-        # Save individual run JSON
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(current_execution, f, indent=2, ensure_ascii=False)
-
-        # Append summary to log
-        with open(log_path, "a", encoding="utf-8") as log_file:
-            print("\n" + "=" * 50, file=log_file, flush=True)
-            print("                  EXECUTION SUMMARY                 ", file=log_file)
-            print("=" * 50, file=log_file)
-            print(f"  Framework Version: {__version__}", file=log_file)
-            print(f"  Session Mode     : PERSISTENT (single process)", file=log_file)
-            print(f"  Total Time       : {total_execution_time:.3f}s", file=log_file)
-            print(f"  Total Tokens     : {stats['total_tokens_input'] + stats['total_tokens_output']}", file=log_file)
-            print(f"  LLM Time         : {stats['total_llm_time']:.3f}s", file=log_file)
-            print(f"  MCP Time         : {stats['total_mcp_time']:.3f}s", file=log_file)
-            print(f"  Steps Recorded   : {len(stats['conversation_steps'])}", file=log_file)
-            print(f"  JSON Saved       : {json_path}", file=log_file)
-            print("=" * 50, file=log_file, flush=True)
-
-        print("\nExecution complete! Everything saved:")
-        print(f"   Log  : {log_path}")
-        print(f"   JSON : {json_path}")
-        if trace_url:
-            print(f"   Trace: {trace_url}")
+                final_answer = ""
+                trace_url = ""
+                termination_reason = "completed"
+                budget_limit = None
+
+                try:
+                    agent_config = {
+                        "callbacks": [langfuse_handler, stats_handler],
+                        "run_name": f"CData_v{__version__}_Exec_{run_number}",
+                        "metadata": {
+                            "framework_version": __version__,
+                            "execution_number": run_number,
+                            "model": os.environ["MODEL"],
+                            "mcp_server": active_server,
+                            "session_mode": "persistent",
+                            "server_description": config['description']
+                        },
+                        "recursion_limit": 200,
+                    }
+                    if checkpoints:
+                        agent_config.update(checkpoints.config(thread_id))
+                        checkpoints.start_attempt(thread_id, run_id)
+
+                    timeline.extend("log_open")
+
+                    budget.start()
+                    with timeline.phase("agent_run"):
+                        response = await asyncio.wait_for(
+                            agent.ainvoke(
+                                # None continues the checkpointed run instead of starting a new one
+                                None if resumed else {"messages": [{"role": "user", "content": user_prompt}]},
+                                config=agent_config,
+                            ),
+                            timeout=budget.remaining_wall_time(),
+                        )
+
+                    final_answer = response["messages"][-1].content
+
+                    print("\n" + "=" * 90, file=log_file, flush=True)
+                    print("FINAL ANSWER:", file=log_file, flush=True)
+                    print(final_answer, file=log_file, flush=True)
+                    print("=" * 90, file=log_file, flush=True)
+
+                    # Get trace URL safely
+                    try:
+                        if hasattr(langfuse_handler, 'last_trace_id') and langfuse_handler.last_trace_id:
+                            project_id = langfuse_handler.client.project_id or "default"
+                            trace_url = f"https://cloud.langfuse.com/project/{project_id}/traces/{langfuse_handler.last_trace_id}"
+                            print(f"\nLangfuse Trace: {trace_url}", file=log_file, flush=True)
+                    except:
+                        trace_url = ""
+
+                except (BudgetExceededError, asyncio.TimeoutError) as e:
+                    # Cancelled cleanly: keep the partial run and say why it stopped
+                    termination_reason = "budget_exceeded"
+                    budget_limit = e.limit_name if isinstance(e, BudgetExceededError) else "max_wall_time_s"
+                    last_text = stats['conversation_steps'].last_output_text()
+                    final_answer = f"BUDGET EXCEEDED ({budget_limit}): {last_text}"
+                    print(f"\nRUN CANCELLED: budget '{budget_limit}' exhausted after {budget.elapsed():.3f}s",
+                          file=log_file, flush=True)
+
+                except Exception as e:
+                    termination_reason = "error"
+                    final_answer = f"ERROR: {str(e)}"
+                    print(f"\nFATAL ERROR: {e}", file=log_file, flush=True)
+                    import traceback
+                    traceback.print_exc(file=log_file)
+
+            if checkpoints:
+                # Only a failed run is picked up again; a completed or cancelled one starts over next time
+                await checkpoints.finish_attempt(agent, thread_id, run_id, resumable=termination_reason == "error")
+
+            # Save execution data with version info
+            timeline.extend("finalize")
+            total_execution_time = time.perf_counter() - trial_start
+
+            current_execution = ExecutionRecord(
+                run_id=run_id,
+                framework_version=__version__,
+                framework_author=__author__,
+                execution_timestamp=datetime.now().isoformat(),
+                execution_timestamp_readable=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                mcp_server=active_server,
+                server_description=config['description'],
+                model=os.environ["MODEL"],
+                session_mode="persistent",
+                execution_time_s=round(total_execution_time, 3),
+                raw_user_prompt=user_prompt,
+                prompt_id=run_number,
+                trial=trial,
+                trials=trials,
+                final_answer=final_answer,
+                termination_reason=termination_reason,
+                budget_limit=budget_limit,
+                budget=budget.as_dict(),
+                schema_cache={"hits": schema_cache.hits, "misses": schema_cache.misses} if schema_cache else None,
+                checkpoint=restored,
+                langfuse_trace_url=trace_url,
+                summary=ExecutionSummary.from_stats(stats),
+                # Framework phases; with the steps' offsets they account for execution_time_s
+                phases=timeline.as_list(),
+            )
+
+            persistence_start = time.perf_counter()
+            journal = stats['conversation_steps']
+
+            # conversation_flow is streamed from the step journal into both files
+            record = current_execution.as_dict()
+
+            # Append to the full history for this prompt
+            append_execution(prompt_json_path, record, journal, serializer)
+
+            # Save individual run file (JSON, or an archive format)
+            write_execution(json_path, record, journal, run_file_serializer)
+            journal.remove()
+
+            # Append summary to log
+            with run_log as log_file:
+                print("\n" + "=" * 50, file=log_file, flush=True)
+                print("                  EXECUTION SUMMARY                 ", file=log_file)
+                print("=" * 50, file=log_file)
+                print(f"  Framework Version: {__version__}", file=log_file)
+                print(f"  Session Mode     : PERSISTENT (single process)", file=log_file)
+                print(f"  Termination      : {termination_reason}" + (f" ({budget_limit})" if budget_limit else ""), file=log_file)
+                print(f"  Total Time       : {total_execution_time:.3f}s", file=log_file)
+                print(f"  Total Tokens     : {current_execution.summary.total_tokens}", file=log_file)
+                print(f"  LLM Time         : {current_execution.summary.llm_time_s:.3f}s", file=log_file)
+                print(f"  LLM Queue Time   : {current_execution.summary.llm_queue_time_s:.3f}s", file=log_file)
+                print(f"  MCP Time         : {current_execution.summary.mcp_time_s:.3f}s", file=log_file)
+                # Written after the record, so the only phase not in its timeline
+                print(f"  Persistence Time : {time.perf_counter() - persistence_start:.3f}s", file=log_file)
+                print(f"  Steps Recorded   : {len(journal)} ({journal.bytes_written / 1024:.1f} KB spilled to the step journal)", file=log_file)
+                if schema_cache:
+                    print(f"  Schema Cache     : {schema_cache.hits} hits / {schema_cache.misses} misses", file=log_file)
+                if resumed:
+                    print(f"  Checkpoint       : resumed, saved {restored['saved_llm_calls']} LLM calls / "
+                          f"{restored['saved_tool_calls']} tool calls / "
+                          f"{restored['saved_input_tokens'] + restored['saved_output_tokens']} tokens / "
+                          f"{restored['saved_time_s']:.3f}s", file=log_file)
+                if checkpoints and termination_reason == "error":
+                    print(f"  Checkpoint       : kept, the next run of this trial resumes from it", file=log_file)
+                print(f"  Run File Saved   : {json_path} ({run_file_serializer.name})", file=log_file)
+                # Up to this line; the rest of the summary is a few hundred bytes
+                print(f"  Log Written      : {run_log.bytes_written / 1024:.1f} KB "
+                      f"({run_log.disk_bytes() / 1024:.1f} KB on disk, {run_log.rotations} rotations)", file=log_file)
+                print("=" * 50, file=log_file, flush=True)
+            run_log.finish()
+
+            results.append({"run_id": current_execution.run_id, "trial": trial,
+                            "termination_reason": termination_reason, "json_path": json_path})
+
+            print("\nExecution complete! Everything saved:")
+            print(f"   Log  : {log_path} ({run_log.bytes_written / 1024:.1f} KB written, "
+                  f"{run_log.disk_bytes() / 1024:.1f} KB on disk)")
+            print(f"   JSON : {json_path}")
+            if trace_url:
+                print(f"   Trace: {trace_url}")
+
+    if schema_cache:
+        schema_cache.close()
+    if checkpoints:
+        await checkpoints.close()
 
     # Session closes here automatically
     print("\nPersistent session closed - process terminated cleanly")
     print(f"Total execution time: {time.perf_counter() - start_time:.3f}s")
+    return results
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a prompt against an MCP server (defaults: the settings in main())')
+    parser.add_argument('--server', help='Server configuration to use')
+    parser.add_argument('--prompt', type=int, help='Prompt number')
+    parser.add_argument('--trials', type=int, help='Trials of the prompt (default: TRIALS env var, 1)')
+    parser.add_argument('--trial', type=int, action='append', help='Only run this trial (repeatable)')
+    parser.add_argument('--log-dir', help='Output directory of the logs and JSON files')
+    parser.add_argument('--result', help='Write the runs (run_id, trial, termination_reason, json_path) to this JSON file')
+    args = parser.parse_args()
+
     try:
-        asyncio.run(main())
+        results = asyncio.run(main(args.server, args.prompt, args.trials, args.trial, args.log_dir))
+        if args.result:
+            with open(args.result, "w", encoding="utf-8") as f:
+                json.dump(results, f)
     except KeyboardInterrupt:
         print("\nExecution interrupted by user")
     except Exception as e:
         print(f"\nFatal error: {e}")
         import traceback
         traceback.print_exc()
+        # Non-zero exit, so work_queue.py workers see the failure
+        raise SystemExit(1)
@@ -0,0 +1,153 @@
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:
+    AsyncSqliteSaver = None
+
+
+# ====================== AGENT CHECKPOINTS ======================
+class AgentCheckpoints:
+    """Graph state of the agent runs, checkpointed to a local SQLite file.
+
+    Pass ``saver`` to ``create_agent(checkpointer=...)``: langgraph then saves
+    the agent's state (its messages) after every LLM call and tool round,
+    under the run's thread id. A run that fails halfway (a transient MCP
+    error, an LLM timeout, a killed process) leaves its last checkpoint
+    behind, and the next run of the same thread resumes from there instead
+    of replaying the LLM and tool calls before it. A run that gets to its
+    end (completed, or cancelled by its budget) deletes its checkpoints, so
+    the next run of the thread starts over.
+
+    The ``attempts`` table records when each run of a thread started; with
+    the time of its last checkpoint this gives the wall time of the work a
+    resumed run did not have to redo.
+
+    Args:
+        path: SQLite file of the checkpoints, shared by the runs of a log directory.
+    """
+
+    def __init__(self, path: str):
+        if AsyncSqliteSaver is None:
+            raise RuntimeError("Agent checkpoints require langgraph-checkpoint-sqlite "
+                               "(pip install langgraph-checkpoint-sqlite)")
+        self.path = path
+        self.saver = None
+        self._aconn = None
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS attempts (
+                thread_id TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                checkpoint_at REAL,
+                PRIMARY KEY (thread_id, run_id)
+            )
+        """)
+
+    async def open(self) -> "AgentCheckpoints":
+        # Every worker on the host checkpoints to this file: wait for the others' writes like self.conn
+        self._aconn = await aiosqlite.connect(self.path, timeout=30)
+        self.saver = AsyncSqliteSaver(self._aconn)
+        await self.saver.setup()
+        return self
+
+    async def close(self):
+        if self._aconn is not None:
+            await self._aconn.close()
+            self._aconn = None
+        self.conn.close()
+
+    @staticmethod
+    def config(thread_id: str) -> Dict:
+        """Config entries that put an agent invocation on ``thread_id``."""
+        return {"configurable": {"thread_id": thread_id}}
+
+    # ----- resume -----
+    async def restore(self, agent, thread_id: str, user_prompt: str) -> Dict:
+        """
+        What the thread's last checkpoint saves the next run from redoing
+
+        A checkpoint only counts when its run stopped before the end and was
+        asked ``user_prompt``; any other is deleted.
+
+        Returns:
+            'resumed' (then invoke the agent with None as input to continue),
+            the checkpoint and earlier runs, and the LLM calls, tool calls,
+            tokens and seconds restored
+        """
+        restored = {
+            "thread_id": thread_id,
+            "resumed": False,
+            "checkpoint_id": None,
+            "resumed_runs": [],
+            "restored_messages": 0,
+            "saved_llm_calls": 0,
+            "saved_tool_calls": 0,
+            "saved_input_tokens": 0,
+            "saved_output_tokens": 0,
+            "saved_time_s": 0.0,
+        }
+        state = await agent.aget_state(self.config(thread_id))
+        messages = state.values.get("messages", []) if state.values else []
+        if not state.next or not messages or messages[0].content != user_prompt:
+            if state.values:
+                await self.discard(thread_id)
+            return restored
+
+        usage = [message.usage_metadata or {} for message in messages if message.type == "ai"]
+        attempts = self.conn.execute(
+            "SELECT run_id, started_at, checkpoint_at FROM attempts WHERE thread_id = ? ORDER BY started_at",
+            (thread_id,)).fetchall()
+        restored.update({
+            "resumed": True,
+            "checkpoint_id": state.config["configurable"]["checkpoint_id"],
+            "resumed_runs": [run_id for run_id, _, _ in attempts],
+            "restored_messages": len(messages),
+            "saved_llm_calls": len(usage),
+            "saved_tool_calls": sum(message.type == "tool" for message in messages),
+            "saved_input_tokens": sum(u.get("input_tokens", 0) for u in usage),
+            "saved_output_tokens": sum(u.get("output_tokens", 0) for u in usage),
+            "saved_time_s": round(self._restored_time(attempts, _timestamp(state.created_at)), 3),
+        })
+        return restored
+
+    @staticmethod
+    def _restored_time(attempts, last_checkpoint_at: Optional[float]) -> float:
+        # Each earlier run contributes from its start to its last checkpoint. A run that was
+        # killed never recorded that; when it was the last one, the restored checkpoint is its own
+        total = 0.0
+        for number, (_, started_at, checkpoint_at) in enumerate(attempts):
+            if checkpoint_at is None and number == len(attempts) - 1:
+                checkpoint_at = last_checkpoint_at
+            if checkpoint_at is not None:
+                total += max(checkpoint_at - started_at, 0.0)
+        return total
+
+    # ----- attempts -----
+    def start_attempt(self, thread_id: str, run_id: str):
+        """Record that ``run_id`` starts (or resumes) the thread now; call right before invoking the agent."""
+        self.conn.execute("INSERT OR REPLACE INTO attempts VALUES (?, ?, ?, NULL)", (thread_id, run_id, time.time()))
+
+    async def finish_attempt(self, agent, thread_id: str, run_id: str, resumable: bool):
+        """Keep the thread's checkpoints for the next run when ``resumable``, else delete them."""
+        if not resumable:
+            await self.discard(thread_id)
+            return
+        state = await agent.aget_state(self.config(thread_id))
+        self.conn.execute("UPDATE attempts SET checkpoint_at = ? WHERE thread_id = ? AND run_id = ?",
+                          (_timestamp(state.created_at), thread_id, run_id))
+
+    async def discard(self, thread_id: str):
+        await self.saver.adelete_thread(thread_id)
+        self.conn.execute("DELETE FROM attempts WHERE thread_id = ?", (thread_id,))
+
+
+def _timestamp(created_at: Optional[str]) -> Optional[float]:
+    # Checkpoint times are ISO 8601 in UTC
+    return datetime.fromisoformat(created_at).timestamp() if created_at else None
@@ -0,0 +1,149 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+from records import ExecutionRecord, ExecutionSummary
+from serializers import SERIALIZERS, get_serializer
+from step_journal import StepJournal
+
+# Words of the synthetic LLM texts and tool results (with some non-ASCII, as in real board data)
+WORDS = ["board", "item", "status", "Done", "Working on it", "owner", "deadline", "Größe", "café",
+         "priority", "High", "Low", "sprint", "2025-01-21", "€1,200.00", "customer", "invoice"]
+
+
+def build_synthetic_run(steps=40, output_chars=20_000, seed=42):
+    """
+    A realistic execution record: alternating LLM responses and tool calls with large results
+
+    Returns:
+        (record dict without its steps, list of step dicts)
+    """
+    rng = random.Random(seed)
+
+    def text(chars):
+        words, length = [], 0
+        while length < chars:
+            words.append(rng.choice(WORDS))
+            length += len(words[-1]) + 1
+        return " ".join(words)[:chars]
+
+    flow = []
+    offset = 1.5
+    for number in range(steps):
+        duration = round(rng.uniform(0.2, 4.0), 3)
+        if number % 2 == 0:
+            step = {"type": "llm_response", "duration_s": duration, "input_tokens": rng.randint(1_000, 60_000),
+                    "output_tokens": rng.randint(50, 800), "total_tokens": 0, "output_text": text(1_500),
+                    "context_tokens_before": rng.randint(1_000, 60_000), "context_tokens_after": 0,
+                    "compacted_messages": 0, "queue_wait_s": 0.0}
+            step["total_tokens"] = step["input_tokens"] + step["output_tokens"]
+        else:
+            step = {"type": "mcp_tool_call", "tool": rng.choice(["run_query", "get_tables", "get_columns"]),
+                    "duration_s": duration, "input": "{'query': 'SELECT * FROM Items WHERE Status = ''Done'''}",
+                    "output": text(output_chars), "retries": rng.randint(0, 1), "hedged": 0}
+        step["start_offset_s"] = round(offset, 3)
+        step["end_offset_s"] = round(offset + duration, 3)
+        offset += duration
+        flow.append(step)
+
+    record = ExecutionRecord(
+        run_id=str(uuid.UUID(int=rng.getrandbits(128))), framework_version="1.0.1", framework_author="benchmark",
+        execution_timestamp="2025-01-21T14:30:45", execution_timestamp_readable="2025-01-21 14:30:45",
+        mcp_server="cdata_bc365_mcp", server_description="Synthetic run", model="claude-sonnet-4-5",
+        session_mode="persistent", execution_time_s=round(offset + 1.0, 3), raw_user_prompt=text(200),
+        prompt_id=48, trial=1, trials=1, final_answer=text(2_000), termination_reason="completed",
+        budget_limit=None, budget={"max_tool_calls": 150}, schema_cache=None, langfuse_trace_url="",
+        summary=ExecutionSummary(total_steps=steps),
+        phases=[{"phase": "startup", "start_offset_s": 0.0, "end_offset_s": 1.5},
+                {"phase": "agent_run", "start_offset_s": 1.5, "end_offset_s": round(offset, 3)}],
+    )
+    return record.as_dict(), flow
+
+
+def best_of(repeat, function):
+    """Best-of-N wall time of function(), and its last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def benchmark_serializer(serializer, record, flow, repeat, workdir):
+    """Time dumps/loads of the whole record, the journal, and the streamed write of a run file"""
+    full = {**record, "conversation_flow": flow}
+    dumps, data = best_of(repeat, lambda: serializer.dumps(full))
+    loads, _ = best_of(repeat, lambda: ExecutionRecord.from_dict(serializer.loads(data)))
+
+    journal_path = os.path.join(workdir, f"bench_{serializer.name}.steps.jsonl")
+
+    def fill_journal():
+        journal = StepJournal(journal_path, serializer)
+        for step in flow:
+            journal.append(step)
+        journal.close()
+        return journal
+
+    journal_time, journal = best_of(repeat, fill_journal)
+    run_file = os.path.join(workdir, f"bench_{serializer.name}{serializer.extension}")
+
+    def write_run_file():
+        with open(run_file, "wb") as f:
+            serializer.write_record(f, record, journal)
+
+    write_time, _ = best_of(repeat, write_run_file)
+    with open(run_file, "rb") as f:
+        assert serializer.loads(f.read()) == full, f"{serializer.name} changed the record"
+    journal.remove()
+    os.remove(run_file)
+    return {'bytes': len(data), 'dumps': dumps, 'loads': loads, 'journal': journal_time, 'write': write_time}
+
+
+def run_benchmark(steps=40, output_chars=20_000, repeat=5):
+    record, flow = build_synthetic_run(steps, output_chars)
+    print(f"Synthetic record: {steps} steps, {output_chars:,} characters per tool result\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in SERIALIZERS:
+            try:
+                serializer = get_serializer(name)
+            except RuntimeError as e:
+                print(f"⚠️  Skipped {name}: {e}")
+                continue
+            results[name] = benchmark_serializer(serializer, record, flow, repeat, workdir)
+
+    baseline = results['json']
+    header = f"{'Serializer':<12}{'Size':>12}{'dumps':>11}{'loads+typed':>13}{'journal':>11}{'run file':>11}{'vs json':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    for name, result in results.items():
+        total = result['journal'] + result['write']
+        speedup = (baseline['journal'] + baseline['write']) / total if total else float('inf')
+        print(f"{name:<12}{result['bytes'] / 1024:>10.1f}KB{result['dumps'] * 1000:>9.2f}ms"
+              f"{result['loads'] * 1000:>11.2f}ms{result['journal'] * 1000:>9.2f}ms"
+              f"{result['write'] * 1000:>9.2f}ms{speedup:>8.1f}x")
+    print(f"\nTimes are best of {repeat} runs. 'loads+typed' parses the record back into an ExecutionRecord; "
+          "'journal' spills every step, 'run file' streams the record from the journal; 'vs json' compares both.")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the execution record serializers on a synthetic run')
+    parser.add_argument('--steps', type=int, default=40, help='Conversation steps in the record (default: 40)')
+    parser.add_argument('--output-chars', type=int, default=20_000, help='Characters per tool result (default: 20000)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per measurement, best is reported (default: 5)')
+    args = parser.parse_args()
+
+    try:
+        run_benchmark(args.steps, args.output_chars, args.repeat)
+    except KeyboardInterrupt:
+        print("\n👋 Exiting...")
+        sys.exit(1)
@@ -0,0 +1,95 @@
+import time
+from typing import Dict, Optional
+
+
+# ====================== BUDGET EXCEPTION ======================
+class BudgetExceededError(Exception):
+    """Raised when a run uses up one of its budgets.
+
+    Attributes:
+        limit_name: Name of the exhausted limit (e.g. 'max_tool_calls').
+        used: Amount consumed when the limit was hit.
+        limit: Configured limit.
+    """
+
+    def __init__(self, limit_name: str, used, limit):
+        self.limit_name = limit_name
+        self.used = used
+        self.limit = limit
+        super().__init__(f"{limit_name} exceeded ({used} >= {limit})")
+
+
+# ====================== PER-RUN BUDGET ======================
+class RunBudget:
+    """Per-run limits checked against the shared stats dict.
+
+    Any limit left as None is not enforced.
+
+    Args:
+        max_input_tokens: Maximum cumulative input tokens.
+        max_output_tokens: Maximum cumulative output tokens.
+        max_wall_time_s: Maximum wall-clock seconds since ``start()``.
+        max_tool_calls: Maximum number of MCP tool calls.
+    """
+
+    def __init__(self, max_input_tokens: Optional[int] = None, max_output_tokens: Optional[int] = None,
+                 max_wall_time_s: Optional[float] = None, max_tool_calls: Optional[int] = None):
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_wall_time_s = max_wall_time_s
+        self.max_tool_calls = max_tool_calls
+        self._started_at = time.perf_counter()
+        # Work restored from a checkpoint, counted as already spent (see carry_over)
+        self._carried = {'input_tokens': 0, 'output_tokens': 0, 'tool_calls': 0, 'wall_time_s': 0.0}
+
+    def start(self):
+        """Reset the wall-clock budget. Call right before invoking the agent."""
+        self._started_at = time.perf_counter()
+
+    def carry_over(self, input_tokens: int = 0, output_tokens: int = 0, tool_calls: int = 0,
+                   wall_time_s: float = 0.0):
+        """Count work restored from a checkpoint against the limits, so a resumed run gets no fresh budget."""
+        self._carried = {'input_tokens': input_tokens, 'output_tokens': output_tokens,
+                         'tool_calls': tool_calls, 'wall_time_s': wall_time_s}
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started_at + self._carried['wall_time_s']
+
+    def remaining_wall_time(self) -> Optional[float]:
+        """Seconds left on the wall-clock budget, or None if unlimited."""
+        if self.max_wall_time_s is None:
+            return None
+        return max(self.max_wall_time_s - self.elapsed(), 0.0)
+
+    def check(self, stats: dict, pending_tool_call: bool = False):
+        """Raise BudgetExceededError if ``stats`` has reached any limit.
+
+        Args:
+            stats: The stats dict mutated by ``CleanStatsCallback``.
+            pending_tool_call: True when checking before a tool call starts, so
+                the call itself counts against ``max_tool_calls``.
+        """
+        limits = [
+            ("max_input_tokens", stats.get('total_tokens_input', 0) + self._carried['input_tokens'],
+             self.max_input_tokens),
+            ("max_output_tokens", stats.get('total_tokens_output', 0) + self._carried['output_tokens'],
+             self.max_output_tokens),
+            ("max_tool_calls", stats.get('total_tool_calls', 0) + self._carried['tool_calls'] + int(pending_tool_call),
+             self.max_tool_calls),
+            ("max_wall_time_s", round(self.elapsed(), 3), self.max_wall_time_s),
+        ]
+        for name, used, limit in limits:
+            if limit is None:
+                continue
+            # A pending tool call may use the last slot, everything else must stay below the limit
+            over = used > limit if name == "max_tool_calls" else used >= limit
+            if over:
+                raise BudgetExceededError(name, used, limit)
+
+    def as_dict(self) -> Dict:
+        return {
+            "max_input_tokens": self.max_input_tokens,
+            "max_output_tokens": self.max_output_tokens,
+            "max_wall_time_s": self.max_wall_time_s,
+            "max_tool_calls": self.max_tool_calls,
+        }
@@ -1,17 +1,30 @@
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.outputs import LLMResult
 from langchain_core.agents import AgentAction
 
+from budgets import BudgetExceededError, RunBudget
+from timeline import Timeline
+
 
 # ====================== DETAILED LOGGING CALLBACK ======================
 class DetailedLoggingCallbackHandler(BaseCallbackHandler):
-    """Enhanced callback handler with detailed execution logging."""
+    """Enhanced callback handler with detailed execution logging.
+
+    Args:
+        log_file: Open file object for writing log lines. When it is a
+            ``RunLog``, tool request/response bodies are truncated or sampled
+            by its ``trim_body()``; otherwise they are logged whole.
+    """
 
     def __init__(self, log_file):
         self.log_file = log_file
 
+    def _body(self, body) -> str:
+        trim_body = getattr(self.log_file, "trim_body", None)
+        return trim_body(body) if trim_body else body
+
     def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs) -> None:
         print("\n=== LLM CALL STARTED ===", file=self.log_file, flush=True)
         self._llm_start_time = time.perf_counter()
@@ -35,7 +48,7 @@ class DetailedLoggingCallbackHandler(BaseCallbackHandler):
     def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs) -> None:
         tool_name = serialized.get("name", "UnknownTool")
         print(f"\n>>> TOOL START: {tool_name}", file=self.log_file, flush=True)
-        print(f"    Request -> {input_str}", file=self.log_file, flush=True)
+        print(f"    Request -> {self._body(input_str)}", file=self.log_file, flush=True)
         self._tool_start_time = time.perf_counter()
         self._current_tool_name = tool_name
 
@@ -43,12 +56,12 @@ class DetailedLoggingCallbackHandler(BaseCallbackHandler):
         duration = time.perf_counter() - self._tool_start_time
         tool_name = getattr(self, "_current_tool_name", "UnknownTool")
         print(f"<<< TOOL END: {tool_name}", file=self.log_file, flush=True)
-        print(f"    Response -> {output}", file=self.log_file, flush=True)
+        print(f"    Response -> {self._body(output)}", file=self.log_file, flush=True)
         print(f"    Tool duration: {duration:.3f}s", file=self.log_file, flush=True)
 
     def on_agent_action(self, action: AgentAction, **kwargs) -> None:
         print(f"\nAGENT ACTION -> Tool: {action.tool}", file=self.log_file, flush=True)
-        print(f"    Input -> {action.tool_input}", file=self.log_file, flush=True)
+        print(f"    Input -> {self._body(action.tool_input)}", file=self.log_file, flush=True)
 
 
 # ====================== STATS-TRACKING CALLBACK ======================
@@ -62,17 +75,56 @@ class CleanStatsCallback(DetailedLoggingCallbackHandler):
             - 'total_tokens_input' (int)
             - 'total_tokens_output' (int)
             - 'total_mcp_time' (float)
-            - 'conversation_steps' (list)
+            - 'total_llm_queue_time' (float) - rate limiter wait, not part of LLM time
+            - 'total_tool_calls' (int)
+            - 'conversation_steps' (list or StepJournal) - completed steps are
+              appended; a StepJournal spills them to disk as they come in
+            - 'pending_llm_step' (dict, optional) - extra fields set by agent
+              middleware, merged into the next 'llm_response' step
             This callback will mutate these values during execution.
+        budget: Optional RunBudget. When given, it is checked before every
+            LLM/tool call and after every LLM response; a BudgetExceededError
+            is raised out of the agent run as soon as a limit is reached.
+        tool_outcomes: Optional ToolsManager.call_outcomes dict. Retry, hedge
+            and timeout counts of each tool call are copied into its step.
+        timeline: Optional Timeline of the run. Each step then also gets
+            'start_offset_s' / 'end_offset_s' on the timeline's clock.
     """
 
-    def __init__(self, log_file, stats: dict):
+    def __init__(self, log_file, stats: dict, budget: Optional[RunBudget] = None,
+                 tool_outcomes: Optional[dict] = None, timeline: Optional[Timeline] = None):
         super().__init__(log_file)
         self._stats = stats
+        self._budget = budget
+        self._tool_outcomes = tool_outcomes if tool_outcomes is not None else {}
+        self._timeline = timeline
+        # Tool calls in flight by run_id (start, name, input): the agent runs tool calls concurrently
+        self._running_tools = {}
+        # Callback errors are swallowed by LangChain unless raise_error is set
+        self.raise_error = budget is not None
+
+    def _check_budget(self, pending_tool_call: bool = False):
+        if self._budget is None:
+            return
+        try:
+            self._budget.check(self._stats, pending_tool_call=pending_tool_call)
+        except BudgetExceededError as e:
+            print(f"\n!!! BUDGET EXCEEDED: {e}", file=self.log_file, flush=True)
+            raise
+
+    def _offsets(self, started: float, ended: float) -> dict:
+        if self._timeline is None:
+            return {}
+        return {"start_offset_s": self._timeline.offset(started), "end_offset_s": self._timeline.offset(ended)}
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs):
+        self._check_budget()
+        super().on_llm_start(serialized, prompts, **kwargs)
 
     def on_llm_end(self, response: LLMResult, **kwargs):
         super().on_llm_end(response, **kwargs)
-        duration = time.perf_counter() - self._llm_start_time
+        ended = time.perf_counter()
+        duration = ended - self._llm_start_time
 
         self._stats['total_llm_time'] += duration
         usage = {}
@@ -85,32 +137,49 @@ class CleanStatsCallback(DetailedLoggingCallbackHandler):
         self._stats['total_tokens_input'] += usage.get("input_tokens", 0)
         self._stats['total_tokens_output'] += usage.get("output_tokens", 0)
 
-        self._stats['conversation_steps'].append({
+        step = {
             "type": "llm_response",
             "duration_s": round(duration, 3),
             "input_tokens": usage.get("input_tokens"),
             "output_tokens": usage.get("output_tokens"),
             "total_tokens": usage.get("total_tokens"),
             "output_text": output_text
-        })
+        }
+        step.update(self._offsets(self._llm_start_time, ended))
+        step.update(self._stats.pop('pending_llm_step', {}))
+        self._stats['conversation_steps'].append(step)
+        self._check_budget()
 
     def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs):
+        self._check_budget(pending_tool_call=True)
+        self._stats['total_tool_calls'] = self._stats.get('total_tool_calls', 0) + 1
         tool_name = serialized.get("name", "Unknown")
         self._current_tool_name = tool_name
         self._current_tool_input = input_str
         super().on_tool_start(serialized, input_str, **kwargs)
+        self._running_tools[kwargs.get("run_id")] = (self._tool_start_time, tool_name, input_str)
 
     def on_tool_end(self, output: str, **kwargs):
-        duration = time.perf_counter() - self._tool_start_time
+        ended = time.perf_counter()
+        started, tool_name, tool_input = self._running_tools.pop(
+            kwargs.get("run_id"), (self._tool_start_time, self._current_tool_name, self._current_tool_input))
+        duration = ended - started
         self._stats['total_mcp_time'] += duration
-        print(f"<<< TOOL END: {self._current_tool_name}", file=self.log_file, flush=True)
-        print(f"    Response -> {output}", file=self.log_file, flush=True)
+        print(f"<<< TOOL END: {tool_name}", file=self.log_file, flush=True)
+        print(f"    Response -> {self._body(output)}", file=self.log_file, flush=True)
         print(f"    Tool duration: {duration:.3f}s", file=self.log_file, flush=True)
 
-        self._stats['conversation_steps'].append({
+        step = {
             "type": "mcp_tool_call",
-            "tool": self._current_tool_name,
+            "tool": tool_name,
             "duration_s": round(duration, 3),
-            "input": self._current_tool_input,
+            "input": tool_input,
             "output": str(output)
-        })
+        }
+        step.update(self._offsets(started, ended))
+        step.update(self._tool_outcomes.pop(kwargs.get("run_id"), {}))
+        self._stats['conversation_steps'].append(step)
+
+    def on_tool_error(self, error: BaseException, **kwargs):
+        self._running_tools.pop(kwargs.get("run_id"), None)
+        self._tool_outcomes.pop(kwargs.get("run_id"), None)
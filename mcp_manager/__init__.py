@@ -3,10 +3,14 @@ MCP (Model Context Protocol) integration package.
 
 This package handles:
 - Tools management and loading
+- Schema metadata caching for CData servers
+- Timeout / retry / hedging policies for tool calls
 - Resources management (future)
 - Session management (future)
 """
 
 from mcp_manager.tools_manager import ToolsManager
+from mcp_manager.schema_cache import SchemaCache
+from mcp_manager.tool_policy import ToolPolicy
 
-__all__ = ['ToolsManager']
\ No newline at end of file
+__all__ = ['ToolsManager', 'SchemaCache', 'ToolPolicy']
\ No newline at end of file
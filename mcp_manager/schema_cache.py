@@ -0,0 +1,101 @@
+import json
+import re
+import sqlite3
+import time
+
+
+# CData MCP servers expose metadata discovery as <prefix>_get_tables, <prefix>_get_columns, ...
+DISCOVERY_TOOL_SUFFIXES = (
+    "get_catalogs",
+    "get_schemas",
+    "get_tables",
+    "get_columns",
+    "get_procedures",
+    "get_procedure_parameters",
+)
+NONQUERY_TOOL_SUFFIX = "run_nonquery"
+
+# Statements that can change what discovery tools return
+DDL_PATTERN = re.compile(r"^\s*(CREATE|ALTER|DROP|RENAME|TRUNCATE|RESET\s+SCHEMA\s+CACHE)\b", re.IGNORECASE)
+
+
+def is_discovery_tool(name):
+    return name.endswith(DISCOVERY_TOOL_SUFFIXES)
+
+
+def is_nonquery_tool(name):
+    return name.endswith(NONQUERY_TOOL_SUFFIX)
+
+
+def is_ddl(arguments):
+    """True if any string argument of a run_nonquery call looks like DDL."""
+    return any(isinstance(v, str) and DDL_PATTERN.match(v) for v in arguments.values())
+
+
+class SchemaCache:
+    """Persistent cache of metadata discovery results for CData-style servers.
+
+    Entries live in a small SQLite file so they are shared across runs and
+    across processes running in parallel. An entry is keyed by server name,
+    tool name and canonical JSON arguments, and expires after ``ttl_s``.
+    """
+
+    def __init__(self, db_path="schema_cache.db", ttl_s=24 * 3600):
+        """
+        Args:
+            db_path: Path of the SQLite cache file
+            ttl_s: Seconds before a cached result is considered stale
+        """
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_cache (
+                server_name TEXT NOT NULL,
+                tool_name TEXT NOT NULL,
+                arguments TEXT NOT NULL,
+                content TEXT NOT NULL,
+                cached_at REAL NOT NULL,
+                PRIMARY KEY (server_name, tool_name, arguments)
+            )
+        """)
+
+    @staticmethod
+    def _key(arguments):
+        return json.dumps(arguments, sort_keys=True, ensure_ascii=False)
+
+    def get(self, server_name, tool_name, arguments):
+        """Return the cached tool content, or None on a miss or expired entry."""
+        row = self.conn.execute(
+            "SELECT content FROM schema_cache WHERE server_name = ? AND tool_name = ? AND arguments = ? AND cached_at > ?",
+            (server_name, tool_name, self._key(arguments), time.time() - self.ttl_s),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, server_name, tool_name, arguments, content):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO schema_cache (server_name, tool_name, arguments, content, cached_at) VALUES (?, ?, ?, ?, ?)",
+            (server_name, tool_name, self._key(arguments), json.dumps(content, ensure_ascii=False), time.time()),
+        )
+
+    def entries(self, server_name):
+        """List fresh (tool_name, arguments, content) entries for a server."""
+        rows = self.conn.execute(
+            "SELECT tool_name, arguments, content FROM schema_cache WHERE server_name = ? AND cached_at > ? ORDER BY tool_name, arguments",
+            (server_name, time.time() - self.ttl_s),
+        ).fetchall()
+        return [(tool_name, json.loads(arguments), json.loads(content)) for tool_name, arguments, content in rows]
+
+    def invalidate(self, server_name):
+        """Drop every cached entry for a server (e.g. after DDL)."""
+        self.conn.execute("DELETE FROM schema_cache WHERE server_name = ?", (server_name,))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,169 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+import anyio
+from langchain_core.tools import ToolException
+
+from mcp_manager.schema_cache import DISCOVERY_TOOL_SUFFIXES
+
+
+# Tools that only read data; safe to retry and to hedge
+READ_ONLY_TOOL_SUFFIXES = DISCOVERY_TOOL_SUFFIXES + ("run_query", "get_instructions")
+READ_ONLY_TOOL_PREFIXES = ("get_", "list_", "search", "read_", "fetch_")
+
+# Errors raised by a broken or stalled stdio transport rather than by the tool itself
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+
+
+class ToolPolicy:
+    """Timeout, retry and hedging settings for MCP tool calls."""
+
+    def __init__(self, timeout_s=120.0, max_retries=2, backoff_base_s=0.5, backoff_max_s=8.0,
+                 hedge_percentile=None, hedge_min_samples=5, idempotent=None):
+        """
+        Args:
+            timeout_s: Seconds before a single attempt is abandoned (None = no timeout)
+            max_retries: Extra attempts after a transient error (idempotent tools only)
+            backoff_base_s: First retry delay; doubles per attempt with full jitter
+            backoff_max_s: Upper bound for the retry delay
+            hedge_percentile: If set (e.g. 95), a duplicate request is sent for
+                read-only tools once the call runs longer than this percentile
+                of the tool's recent latencies
+            hedge_min_samples: Latency samples required before hedging kicks in
+            idempotent: Force the idempotency decision; None infers it from MCP
+                tool annotations and the tool name
+        """
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.idempotent = idempotent
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for a 1-based retry attempt."""
+        return random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** (attempt - 1)))
+
+
+def is_read_only_tool(tool):
+    """Infer whether a tool only reads data, from MCP annotations or its name."""
+    metadata = getattr(tool, "metadata", None) or {}
+    if metadata.get("readOnlyHint") is not None:
+        return bool(metadata["readOnlyHint"])
+    name = tool.name.lower()
+    # CData tools carry a server prefix (e.g. BC365_get_tables)
+    short_name = name.split("_", 1)[1] if "_" in name else name
+    return (name.endswith(READ_ONLY_TOOL_SUFFIXES)
+            or name.startswith(READ_ONLY_TOOL_PREFIXES)
+            or short_name.startswith(READ_ONLY_TOOL_PREFIXES))
+
+
+def is_idempotent_tool(tool, policy):
+    if policy.idempotent is not None:
+        return policy.idempotent
+    metadata = getattr(tool, "metadata", None) or {}
+    if metadata.get("idempotentHint"):
+        return True
+    return is_read_only_tool(tool)
+
+
+class LatencyTracker:
+    """Recent latencies of one tool, used to decide when to hedge."""
+
+    def __init__(self, size=50):
+        self._samples = deque(maxlen=size)
+
+    def add(self, duration):
+        self._samples.append(duration)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, pct):
+        ordered = sorted(self._samples)
+        index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+
+async def _hedged_call(call_tool, arguments, hedge_after, outcome):
+    """Run call_tool and, if it is still running after hedge_after seconds, race a duplicate."""
+    primary = asyncio.ensure_future(call_tool(**arguments))
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        outcome["hedged"] += 1
+        hedge = asyncio.ensure_future(call_tool(**arguments))
+        pending.add(hedge)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    outcome["hedge_won"] = task is hedge
+                    return task.result()
+        # Both failed: surface the primary error
+        return primary.result()
+    finally:
+        # Also runs when the surrounding timeout cancels us
+        for task in pending:
+            task.cancel()
+
+
+def with_policy(tool, policy, latency, outcomes):
+    """Return a copy of ``tool`` whose calls follow ``policy``.
+
+    Args:
+        tool: LangChain tool loaded from the MCP session
+        policy: ToolPolicy for this tool
+        latency: LatencyTracker for this tool
+        outcomes: Dict filled with {tool_run_id: outcome}, where outcome holds
+            attempts, retries, hedged, hedge_won and timed_out for the call
+    """
+    call_tool = tool.coroutine
+    tool_name = tool.name
+    idempotent = is_idempotent_tool(tool, policy)
+    hedgeable = policy.hedge_percentile is not None and is_read_only_tool(tool)
+
+    # StructuredTool passes the child callback manager when the coroutine asks for
+    # ``callbacks``; its parent_run_id is the run_id seen by on_tool_end
+    async def call_with_policy(callbacks=None, **arguments):
+        outcome = {"attempts": 0, "retries": 0, "hedged": 0, "hedge_won": False, "timed_out": 0}
+        run_id = getattr(callbacks, "parent_run_id", None)
+        if run_id is not None:
+            outcomes[run_id] = outcome
+
+        while True:
+            outcome["attempts"] += 1
+            started = time.perf_counter()
+            try:
+                if hedgeable and len(latency) >= policy.hedge_min_samples:
+                    attempt = _hedged_call(call_tool, arguments, latency.percentile(policy.hedge_percentile), outcome)
+                else:
+                    attempt = call_tool(**arguments)
+                result = await asyncio.wait_for(attempt, timeout=policy.timeout_s)
+                latency.add(time.perf_counter() - started)
+                return result
+            except TRANSIENT_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    outcome["timed_out"] += 1
+                if not idempotent or outcome["retries"] >= policy.max_retries:
+                    reason = f"timed out after {policy.timeout_s}s" if isinstance(e, asyncio.TimeoutError) else repr(e)
+                    # ToolException goes back to the model via error passthrough
+                    raise ToolException(
+                        f"Tool '{tool_name}' {reason} (attempts: {outcome['attempts']})"
+                    ) from e
+                outcome["retries"] += 1
+                await asyncio.sleep(policy.backoff(outcome["retries"]))
+
+    return tool.model_copy(update={"coroutine": call_with_policy})
@@ -1,12 +1,31 @@
+import json
+
+from mcp_manager.schema_cache import is_ddl, is_discovery_tool, is_nonquery_tool
+from mcp_manager.tool_policy import LatencyTracker, ToolPolicy, with_policy
+
+
 class ToolsManager:
     """Handles all tool-related operations for an MCP session."""
     
-    def __init__(self, session):
+    def __init__(self, session, server_name=None, schema_cache=None, default_policy=None, tool_policies=None):
         """
         Args:
             session: Active MCP session from mcp_client.session()
+            server_name: Key of the server in get_server_configurations()
+            schema_cache: Optional SchemaCache serving metadata discovery
+                results (CData servers only)
+            default_policy: ToolPolicy applied to every MCP tool (default: ToolPolicy())
+            tool_policies: Per-tool ToolPolicy overrides, keyed by tool name or
+                name suffix (e.g. {"run_query": ToolPolicy(timeout_s=300)})
         """
         self.session = session
+        self.server_name = server_name
+        self.schema_cache = schema_cache
+        self.default_policy = default_policy or ToolPolicy()
+        self.tool_policies = tool_policies or {}
+        # {tool run_id: {attempts, retries, hedged, hedge_won, timed_out}}, read by CleanStatsCallback
+        self.call_outcomes = {}
+        self._latency = {}
         self._tools = []
         self._tools_metadata = {}
     
@@ -23,6 +42,11 @@ class ToolsManager:
         self._tools = await load_mcp_tools(self.session)
         print(f"Loaded {len(self._tools)} tools")
         
+        if self.schema_cache is not None:
+            self._enable_schema_cache()
+        
+        self._apply_policies()
+        
         if enable_error_passthrough:
             self._enable_error_passthrough()
         
@@ -36,6 +60,95 @@ class ToolsManager:
             if hasattr(tool, "handle_validation_error"):
                 tool.handle_validation_error = True
     
+    def _policy_for(self, name):
+        """Resolve the ToolPolicy for a tool: exact name, then name suffix, then default."""
+        if name in self.tool_policies:
+            return self.tool_policies[name]
+        for suffix, policy in self.tool_policies.items():
+            if name.endswith(suffix):
+                return policy
+        return self.default_policy
+    
+    def _apply_policies(self):
+        """Wrap every MCP tool with its timeout/retry/hedging policy."""
+        wrapped = []
+        for tool in self._tools:
+            if tool.name == "schema_cache_lookup":
+                # Local synthetic tool, nothing to time out or retry
+                wrapped.append(tool)
+                continue
+            latency = self._latency.setdefault(tool.name, LatencyTracker())
+            wrapped.append(with_policy(tool, self._policy_for(tool.name), latency, self.call_outcomes))
+        self._tools = wrapped
+    
+    def _enable_schema_cache(self):
+        """Serve discovery tools from the schema cache and add the fast-path lookup tool."""
+        has_discovery = any(is_discovery_tool(tool.name) for tool in self._tools)
+        self._tools = [self._with_schema_cache(tool) for tool in self._tools]
+        if has_discovery:
+            self._tools.append(self._schema_cache_lookup_tool())
+            print(f"Schema cache enabled for '{self.server_name}'")
+    
+    def _with_schema_cache(self, tool):
+        """Return a copy of a discovery/nonquery tool wired to the schema cache."""
+        if not (is_discovery_tool(tool.name) or is_nonquery_tool(tool.name)):
+            return tool
+        
+        call_tool = tool.coroutine
+        tool_name = tool.name
+        cache = self.schema_cache
+        server_name = self.server_name
+        
+        if is_discovery_tool(tool_name):
+            async def cached_call(**arguments):
+                content = cache.get(server_name, tool_name, arguments)
+                if content is not None:
+                    return content, None
+                content, artifact = await call_tool(**arguments)
+                # Non-text artifacts (images, resources) are not cacheable
+                if not artifact:
+                    cache.put(server_name, tool_name, arguments, content)
+                return content, artifact
+        else:
+            async def cached_call(**arguments):
+                try:
+                    return await call_tool(**arguments)
+                finally:
+                    if is_ddl(arguments):
+                        cache.invalidate(server_name)
+        
+        return tool.model_copy(update={"coroutine": cached_call})
+    
+    def _schema_cache_lookup_tool(self):
+        """Synthetic tool returning cached discovery results without a backend round trip."""
+        from langchain_core.tools import StructuredTool
+        
+        cache = self.schema_cache
+        server_name = self.server_name
+        
+        async def schema_cache_lookup(table: str = "") -> str:
+            entries = cache.entries(server_name)
+            if table:
+                entries = [e for e in entries if table.lower() in json.dumps(e[1], ensure_ascii=False).lower()]
+            if not entries:
+                return "No cached metadata found. Use the regular discovery tools (get_tables, get_columns, ...)."
+            
+            sections = []
+            for tool_name, arguments, content in entries:
+                text = "\n".join(content) if isinstance(content, list) else str(content)
+                sections.append(f"### {tool_name} {json.dumps(arguments, ensure_ascii=False)}\n{text}")
+            return "\n\n".join(sections)
+        
+        return StructuredTool.from_function(
+            coroutine=schema_cache_lookup,
+            name="schema_cache_lookup",
+            description=(
+                "Return previously discovered table, column and procedure metadata for this "
+                "server from the local cache, without querying the backend. Optionally filter "
+                "by a table name. Call this before get_tables/get_columns."
+            ),
+        )
+    
     def get_tools(self):
         """Get currently loaded tools."""
         return self._tools
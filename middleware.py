@@ -0,0 +1,270 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+
+# ====================== CONTEXT COMPACTION MIDDLEWARE ======================
+class ContextCompactionMiddleware(AgentMiddleware):
+    """Keeps the message history sent to the model under a token budget.
+
+    The agent state is left untouched; only the request sent to the model is
+    compacted. Once the history exceeds ``max_context_tokens``, stale tool
+    results (everything older than the last ``keep_recent_messages`` messages)
+    are replaced, oldest first, by a short preview until the history fits
+    again. Recent turns are always sent verbatim.
+
+    Args:
+        stats: The shared stats dict (see ``CleanStatsCallback``). Before and
+            after token counts are stored under ``'pending_llm_step'`` and
+            merged into the next ``llm_response`` step.
+        max_context_tokens: Approximate token budget for the message history.
+        keep_recent_messages: Number of trailing messages never compacted.
+        preview_chars: Characters of each elided tool result kept as a preview.
+    """
+
+    def __init__(self, stats: dict, max_context_tokens: int = 60000,
+                 keep_recent_messages: int = 6, preview_chars: int = 300):
+        super().__init__()
+        self._stats = stats
+        self.max_context_tokens = max_context_tokens
+        self.keep_recent_messages = keep_recent_messages
+        self.preview_chars = preview_chars
+
+    def wrap_model_call(self, request: ModelRequest,
+                        handler: Callable[[ModelRequest], ModelResponse]) -> ModelResponse:
+        request.messages = self._compact(request.messages)
+        return handler(request)
+
+    async def awrap_model_call(self, request: ModelRequest,
+                               handler: Callable[[ModelRequest], Awaitable[ModelResponse]]) -> ModelResponse:
+        request.messages = self._compact(request.messages)
+        return await handler(request)
+
+    def _compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Return a compacted copy of ``messages`` and record the token counts."""
+        tokens_before = count_tokens_approximately(messages)
+        compacted = list(messages)
+        elided = 0
+
+        if tokens_before > self.max_context_tokens:
+            tokens = tokens_before
+            cutoff = max(len(compacted) - self.keep_recent_messages, 0)
+            for i in range(cutoff):
+                msg = compacted[i]
+                if not isinstance(msg, ToolMessage):
+                    continue
+                content = msg.content if isinstance(msg.content, str) else str(msg.content)
+                if len(content) <= self.preview_chars:
+                    continue
+
+                # Only the content changes, so tool_call_id pairing stays valid
+                stub = msg.model_copy(update={"content": self._preview(msg, content)})
+                tokens -= count_tokens_approximately([msg]) - count_tokens_approximately([stub])
+                compacted[i] = stub
+                elided += 1
+                if tokens <= self.max_context_tokens:
+                    break
+
+        tokens_after = count_tokens_approximately(compacted) if elided else tokens_before
+        self._stats.setdefault('pending_llm_step', {}).update({
+            "context_tokens_before": tokens_before,
+            "context_tokens_after": tokens_after,
+            "compacted_messages": elided,
+        })
+        return compacted
+
+    def _preview(self, msg: ToolMessage, content: str) -> str:
+        tool_name = msg.name or "tool"
+        return (
+            f"{content[:self.preview_chars]}\n"
+            f"[... {len(content) - self.preview_chars} more characters of an earlier "
+            f"'{tool_name}' result elided to save context. Call the tool again if you need them.]"
+        )
+
+
+# ====================== TOKEN RATE GOVERNOR ======================
+class TokenRateGovernor:
+    """Proactive requests/tokens-per-minute limiter shared by concurrent agents.
+
+    Every model call reserves one request plus its estimated input and output
+    tokens in a sliding 60 second window. A call that would push any window
+    over its limit waits until enough of the window has expired, so 429s are
+    avoided instead of retried. Reservations are corrected with the real
+    token usage once the response arrives.
+
+    The window is a table in the SQLite file ``path``, read and reserved in
+    one ``BEGIN IMMEDIATE`` transaction, so every process using the same file
+    draws on the same limits: the trials of one process, the work_queue.py
+    workers and, on a filesystem with POSIX locks, other hosts (whose clocks
+    must be synchronized). Within a process waiting calls are served in
+    order; across processes, by whichever checks first once there is room.
+
+    Args:
+        path: SQLite file of the window (None = this process only).
+        requests_per_minute: RPM limit, or None for unlimited.
+        input_tokens_per_minute: ITPM limit, or None for unlimited.
+        output_tokens_per_minute: OTPM limit, or None for unlimited.
+    """
+
+    WINDOW_S = 60.0
+
+    def __init__(self, path: Optional[str] = None, requests_per_minute: Optional[int] = None,
+                 input_tokens_per_minute: Optional[int] = None,
+                 output_tokens_per_minute: Optional[int] = None):
+        self.path = path
+        self.limits = {
+            "requests": requests_per_minute,
+            "input_tokens": input_tokens_per_minute,
+            "output_tokens": output_tokens_per_minute,
+        }
+        # Autocommit: reservations take their own transactions. Sync agents may call from threads
+        self.conn = sqlite3.connect(path or ":memory:", timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = DELETE")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_window (
+                reservation_id INTEGER PRIMARY KEY,
+                reserved_at REAL NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL
+            )
+        """)
+        self._conn_lock = threading.Lock()
+        # Queue the waiting calls of this process: async agents on the lock, sync ones on the other
+        self._lock = asyncio.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _reserve(self, input_tokens: int, output_tokens: int) -> Tuple[Optional[int], float]:
+        """Reserve the call if it fits in every window: (reservation, 0), else (None, seconds to wait)."""
+        with self._conn_lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                self.conn.execute("DELETE FROM rate_window WHERE reserved_at <= ?", (now - self.WINDOW_S,))
+                oldest, requests, used_input, used_output = self.conn.execute("""
+                    SELECT MIN(reserved_at), COUNT(*), COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0)
+                    FROM rate_window
+                """).fetchone()
+                usage = {"requests": requests + 1, "input_tokens": used_input + input_tokens,
+                         "output_tokens": used_output + output_tokens}
+                # An empty window always admits the call, even one larger than a limit
+                if oldest is None or all(limit is None or usage[key] <= limit for key, limit in self.limits.items()):
+                    reservation = self.conn.execute(
+                        "INSERT INTO rate_window (reserved_at, input_tokens, output_tokens) VALUES (?, ?, ?)",
+                        (now, input_tokens, output_tokens)).lastrowid
+                    self.conn.execute("COMMIT")
+                    return reservation, 0.0
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        # Until the oldest reservation leaves the window
+        return None, max(self.WINDOW_S - (now - oldest), 0.05)
+
+    async def acquire(self, input_tokens: int, output_tokens: int) -> int:
+        """Wait until the call fits in every window and reserve it.
+
+        The reservation waits for the file's lock in a thread, so the event
+        loop keeps running the other agents' tool calls and timeouts meanwhile.
+
+        Returns:
+            The reservation, to be passed to ``reconcile()``.
+        """
+        async with self._lock:
+            while True:
+                reservation, wait_s = await asyncio.to_thread(self._reserve, input_tokens, output_tokens)
+                if reservation is not None:
+                    return reservation
+                await asyncio.sleep(wait_s)
+
+    def acquire_sync(self, input_tokens: int, output_tokens: int) -> int:
+        """``acquire()`` for sync agents, blocking the calling thread."""
+        with self._sync_lock:
+            while True:
+                reservation, wait_s = self._reserve(input_tokens, output_tokens)
+                if reservation is not None:
+                    return reservation
+                time.sleep(wait_s)
+
+    def reconcile(self, reservation: int, input_tokens: Optional[int], output_tokens: Optional[int]):
+        """Replace the estimates of a reservation with the actual usage."""
+        with self._conn_lock:
+            self.conn.execute("""
+                UPDATE rate_window
+                SET input_tokens = COALESCE(?, input_tokens), output_tokens = COALESCE(?, output_tokens)
+                WHERE reservation_id = ?
+            """, (input_tokens, output_tokens, reservation))
+
+
+_shared_governor: Optional[TokenRateGovernor] = None
+
+
+def get_shared_governor(path: Optional[str] = None, **limits) -> TokenRateGovernor:
+    """Return the process-wide governor, creating it on ``path`` with ``limits`` on first use."""
+    global _shared_governor
+    if _shared_governor is None:
+        _shared_governor = TokenRateGovernor(path, **limits)
+    return _shared_governor
+
+
+# ====================== RATE LIMIT MIDDLEWARE ======================
+class RateLimitMiddleware(AgentMiddleware):
+    """Queues model calls through a TokenRateGovernor before they are sent.
+
+    Time spent waiting in the queue happens before the LLM callbacks fire, so
+    it is not part of ``total_llm_time``. It is accumulated separately in
+    ``stats['total_llm_queue_time']`` and recorded per step as ``queue_wait_s``.
+
+    Args:
+        stats: The shared stats dict (see ``CleanStatsCallback``).
+        governor: Governor shared by every agent using its file.
+        expected_output_tokens: Output tokens reserved per call until the
+            actual usage is known.
+    """
+
+    def __init__(self, stats: dict, governor: TokenRateGovernor, expected_output_tokens: int = 1000):
+        super().__init__()
+        self._stats = stats
+        self.governor = governor
+        self.expected_output_tokens = expected_output_tokens
+
+    def _estimate_input(self, request: ModelRequest) -> int:
+        estimated_input = count_tokens_approximately(request.messages)
+        if request.system_prompt:
+            estimated_input += len(request.system_prompt) // 4
+        return estimated_input
+
+    def _record_wait(self, queue_wait: float):
+        self._stats['total_llm_queue_time'] = self._stats.get('total_llm_queue_time', 0.0) + queue_wait
+        self._stats.setdefault('pending_llm_step', {})["queue_wait_s"] = round(queue_wait, 3)
+
+    def _reconcile(self, reservation: int, response: ModelResponse):
+        usage = {}
+        if response.result:
+            usage = getattr(response.result[-1], "usage_metadata", None) or {}
+        self.governor.reconcile(reservation, usage.get("input_tokens"), usage.get("output_tokens"))
+
+    def wrap_model_call(self, request: ModelRequest,
+                        handler: Callable[[ModelRequest], ModelResponse]) -> ModelResponse:
+        queued_at = time.perf_counter()
+        reservation = self.governor.acquire_sync(self._estimate_input(request), self.expected_output_tokens)
+        self._record_wait(time.perf_counter() - queued_at)
+
+        response = handler(request)
+        self._reconcile(reservation, response)
+        return response
+
+    async def awrap_model_call(self, request: ModelRequest,
+                               handler: Callable[[ModelRequest], Awaitable[ModelResponse]]) -> ModelResponse:
+        queued_at = time.perf_counter()
+        reservation = await self.governor.acquire(self._estimate_input(request), self.expected_output_tokens)
+        self._record_wait(time.perf_counter() - queued_at)
+
+        response = await handler(request)
+        await asyncio.to_thread(self._reconcile, reservation, response)
+        return response
@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional
+
+
+# ====================== RUN SUMMARY ======================
+class ExecutionSummary:
+    """Totals of one run, as stored under 'summary' in its record.
+
+    Args:
+        input_tokens / output_tokens: Token usage of every LLM call.
+        llm_time_s: Time spent in LLM calls.
+        llm_queue_time_s: Time LLM calls waited for the rate limiter.
+        mcp_time_s: Time spent in MCP tool calls.
+        tool_calls: Tool calls started (including failed ones).
+        tool_retries / tool_hedges: Retries and hedged requests of the tool calls.
+        total_steps: Conversation steps recorded.
+    """
+
+    __slots__ = ("input_tokens", "output_tokens", "llm_time_s", "llm_queue_time_s", "mcp_time_s",
+                 "tool_calls", "tool_retries", "tool_hedges", "total_steps")
+
+    def __init__(self, input_tokens: int = 0, output_tokens: int = 0, llm_time_s: float = 0.0,
+                 llm_queue_time_s: float = 0.0, mcp_time_s: float = 0.0, tool_calls: int = 0,
+                 tool_retries: int = 0, tool_hedges: int = 0, total_steps: int = 0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.llm_time_s = llm_time_s
+        self.llm_queue_time_s = llm_queue_time_s
+        self.mcp_time_s = mcp_time_s
+        self.tool_calls = tool_calls
+        self.tool_retries = tool_retries
+        self.tool_hedges = tool_hedges
+        self.total_steps = total_steps
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @classmethod
+    def from_stats(cls, stats: dict) -> "ExecutionSummary":
+        """Summary of the stats dict mutated by ``CleanStatsCallback``."""
+        steps = stats['conversation_steps']
+        return cls(
+            input_tokens=stats['total_tokens_input'],
+            output_tokens=stats['total_tokens_output'],
+            llm_time_s=round(stats['total_llm_time'], 3),
+            llm_queue_time_s=round(stats['total_llm_queue_time'], 3),
+            mcp_time_s=round(stats['total_mcp_time'], 3),
+            tool_calls=stats['total_tool_calls'],
+            tool_retries=sum(s.get('retries', 0) for s in steps),
+            tool_hedges=sum(s.get('hedged', 0) for s in steps),
+            total_steps=len(steps),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ExecutionSummary":
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_tokens": self.total_tokens,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "llm_time_s": self.llm_time_s,
+            "llm_queue_time_s": self.llm_queue_time_s,
+            "mcp_time_s": self.mcp_time_s,
+            "tool_calls": self.tool_calls,
+            "tool_retries": self.tool_retries,
+            "tool_hedges": self.tool_hedges,
+            "total_steps": self.total_steps,
+        }
+
+
+# ====================== EXECUTION RECORD ======================
+class ExecutionRecord:
+    """One run of a prompt, as written to its JSON file and the prompt history.
+
+    Conversation steps are not held here: they stay dicts (their fields
+    depend on the middleware and tool manager) and are streamed from the
+    run's ``StepJournal`` when the record is written. ``as_dict()`` gives the
+    record's fields in file order, with 'conversation_flow' as a placeholder.
+    """
+
+    __slots__ = ("run_id", "framework_version", "framework_author", "execution_timestamp",
+                 "execution_timestamp_readable", "mcp_server", "server_description", "model",
+                 "session_mode", "execution_time_s", "raw_user_prompt", "prompt_id", "trial", "trials",
+                 "final_answer", "termination_reason", "budget_limit", "budget", "schema_cache", "checkpoint",
+                 "langfuse_trace_url", "summary", "conversation_flow", "phases")
+
+    def __init__(self, run_id: str, framework_version: str, framework_author: str, execution_timestamp: str,
+                 execution_timestamp_readable: str, mcp_server: str, server_description: str, model: str,
+                 session_mode: str, execution_time_s: float, raw_user_prompt: str, prompt_id: int,
+                 trial: int, trials: int, final_answer: str, termination_reason: str,
+                 budget_limit: Optional[str], budget: Optional[Dict], schema_cache: Optional[Dict],
+                 langfuse_trace_url: str, summary: ExecutionSummary,
+                 conversation_flow: Optional[List[Dict]] = None, phases: Optional[List[Dict]] = None,
+                 checkpoint: Optional[Dict] = None):
+        self.run_id = run_id
+        self.framework_version = framework_version
+        self.framework_author = framework_author
+        self.execution_timestamp = execution_timestamp
+        self.execution_timestamp_readable = execution_timestamp_readable
+        self.mcp_server = mcp_server
+        self.server_description = server_description
+        self.model = model
+        self.session_mode = session_mode
+        self.execution_time_s = execution_time_s
+        self.raw_user_prompt = raw_user_prompt
+        self.prompt_id = prompt_id
+        self.trial = trial
+        self.trials = trials
+        self.final_answer = final_answer
+        self.termination_reason = termination_reason
+        self.budget_limit = budget_limit
+        self.budget = budget
+        self.schema_cache = schema_cache
+        # Agent checkpoint of the run: whether it resumed an earlier one, and what that saved
+        self.checkpoint = checkpoint
+        self.langfuse_trace_url = langfuse_trace_url
+        self.summary = summary
+        # Only set on records read back from a file
+        self.conversation_flow = conversation_flow
+        # Framework phases; with the steps' offsets they account for execution_time_s
+        self.phases = phases if phases is not None else []
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ExecutionRecord":
+        """Record read back from a run file or the prompt history (older records lack the newer fields)."""
+        fields = {key: data.get(key) for key in cls.__slots__}
+        fields["summary"] = ExecutionSummary.from_dict(data.get("summary") or {})
+        return cls(**fields)
+
+    def as_dict(self) -> Dict:
+        record = {key: getattr(self, key) for key in self.__slots__}
+        record["summary"] = self.summary.as_dict()
+        return record
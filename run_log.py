@@ -0,0 +1,153 @@
+import gzip
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+
+# ====================== RUN LOG ======================
+class RunLog:
+    """Size-capped, rotating and gzip-compressed log of one run.
+
+    A text file object for ``print(..., file=log)``. Once the active file
+    (``path``) reaches ``max_bytes``, it is closed at the next line end,
+    renamed to ``<path>.<n>`` and gzipped in a background thread to
+    ``<path>.<n>.gz``, and a new ``path`` is started. Only the newest
+    ``max_segments`` closed segments are kept, so a run never takes more than
+    about ``(max_segments + 1) * max_bytes`` of log before compression.
+    Segment numbers continue after the ones already on disk, so reading
+    ``<path>.1.gz``, ``<path>.2.gz``, ... and then ``path`` gives the log in order.
+
+    Tool request/response bodies go through ``trim_body()``: each is cut to
+    ``body_chars`` characters, and with ``body_sample_rate`` < 1 only that
+    share of the bodies (evenly spaced) is logged at all. The full bodies are
+    kept in the run's JSON file either way.
+
+    The log can be entered several times (``with log as log_file:``); the
+    byte counts add up over all of them. Call ``finish()`` once the run is
+    done with it.
+
+    Args:
+        path: Active log file, appended to.
+        max_bytes: Segment size that triggers a rotation (None = never rotate).
+        max_segments: Closed segments kept; older ones are deleted (None = keep all).
+        body_chars: Characters of each body logged (None = whole bodies).
+        body_sample_rate: Share of the bodies logged, from 0 to 1.
+        compresslevel: gzip level of the closed segments.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = 10 * 1024 * 1024, max_segments: Optional[int] = 20,
+                 body_chars: Optional[int] = 2000, body_sample_rate: float = 1.0, compresslevel: int = 6):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self.body_chars = body_chars
+        self.body_sample_rate = body_sample_rate
+        self.compresslevel = compresslevel
+        # Uncompressed bytes written through this object, and segments rotated / deleted by it
+        self.bytes_written = 0
+        self.rotations = 0
+        self.segments_deleted = 0
+        self._bodies = 0
+        self._file = None
+        self._segment_bytes = 0
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-gzip")
+        self._pending = []
+        self._next_segment = max(self._segment_numbers(), default=0) + 1
+
+    # ----- file object -----
+    def __enter__(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._segment_bytes = os.path.getsize(self.path)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        self._file = None
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._file.write(text)
+        self.bytes_written += len(data)
+        self._segment_bytes += len(data)
+        # Rotate between lines only, so no line is split over two segments
+        if self.max_bytes is not None and self._segment_bytes >= self.max_bytes and text.endswith("\n"):
+            self._rotate()
+        return len(text)
+
+    def flush(self):
+        self._file.flush()
+
+    # ----- bodies -----
+    def trim_body(self, body) -> str:
+        """``body`` as it should appear in the log: cut to body_chars, or left out when not sampled."""
+        text = str(body)
+        self._bodies += 1
+        # Evenly spaced sample: body n is logged when it crosses the next multiple of the rate
+        if int(self._bodies * self.body_sample_rate) == int((self._bodies - 1) * self.body_sample_rate):
+            return f"[{len(text)} characters, not sampled]"
+        if self.body_chars is not None and len(text) > self.body_chars:
+            return f"{text[:self.body_chars]} [... {len(text) - self.body_chars} more characters]"
+        return text
+
+    # ----- rotation -----
+    def _segment_numbers(self):
+        pattern = re.compile(re.escape(os.path.basename(self.path)) + r"\.(\d+)(\.gz)?$")
+        directory = os.path.dirname(self.path) or "."
+        return sorted({int(m.group(1)) for m in map(pattern.match, os.listdir(directory)) if m})
+
+    def _rotate(self):
+        self._file.close()
+        os.replace(self.path, f"{self.path}.{self._next_segment}")
+        self._next_segment += 1
+        self.rotations += 1
+        self._pending.append(self._compressor.submit(self._compress, self._next_segment - 1))
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._segment_bytes = 0
+
+    def _compress(self, number: int):
+        segment = f"{self.path}.{number}"
+        # Already pruned, or removed by hand: nothing left to compress
+        if os.path.exists(segment):
+            with open(segment, "rb") as raw, \
+                    gzip.open(segment + ".gz", "wb", compresslevel=self.compresslevel) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            os.remove(segment)
+        if self.max_segments is None:
+            return
+        # Segments are compressed in order, so the ones after this are still queued: prune before it only
+        closed = [n for n in self._segment_numbers() if n <= number]
+        for old in closed[:-self.max_segments or None]:
+            removed = False
+            for name in (f"{self.path}.{old}.gz", f"{self.path}.{old}"):
+                if os.path.exists(name):
+                    os.remove(name)
+                    removed = True
+            self.segments_deleted += removed
+
+    def _wait(self):
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def finish(self):
+        """Wait for the segments still being compressed and stop the compression thread."""
+        self._wait()
+        self._compressor.shutdown()
+
+    def disk_bytes(self) -> int:
+        """Bytes the log takes on disk: the active file and every closed segment, once compressed."""
+        self._wait()
+        names = [self.path] + [f"{self.path}.{n}{suffix}" for n in self._segment_numbers() for suffix in (".gz", "")]
+        return sum(os.path.getsize(name) for name in names if os.path.exists(name))
+
+    def as_dict(self) -> Dict:
+        return {
+            "bytes_written": self.bytes_written,
+            "disk_bytes": self.disk_bytes(),
+            "rotations": self.rotations,
+            "segments_deleted": self.segments_deleted,
+            "body_chars": self.body_chars,
+            "body_sample_rate": self.body_sample_rate,
+        }
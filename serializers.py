@@ -0,0 +1,193 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Placeholder replaced by the journal's steps when a record is written
+_STEPS_PLACEHOLDER = "\x00conversation_flow\x00"
+
+
+# ====================== SERIALIZERS ======================
+class JSONSerializer:
+    """Indented JSON with the standard library, the format the importer reads.
+
+    Every serializer turns records into bytes and back, and writes a record
+    with its 'conversation_flow' streamed from a ``StepJournal``, one step at
+    a time (see ``write_record``).
+    """
+
+    name = "json"
+    extension = ".json"
+    # Records can be spliced into a JSON array (the prompt history)
+    is_json = True
+
+    def dumps(self, obj: Any, indent: bool = True) -> bytes:
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def write_record(self, f, record: Dict, journal, level: int = 0):
+        """
+        Write ``record`` to the binary file ``f`` with its steps streamed from ``journal``
+
+        Gives the same bytes as dumps(record) with the steps in place (nested
+        ``level`` deep in an indented array).
+        """
+        prefix = b" " * (2 * level)
+        head, tail = self.dumps({**record, "conversation_flow": _STEPS_PLACEHOLDER}).split(
+            self.dumps(_STEPS_PLACEHOLDER))
+        f.write(_indent(head, prefix))
+
+        # The key's line gives the list's indentation
+        key_line = head.rsplit(b"\n", 1)[-1]
+        outer = prefix + key_line[:len(key_line) - len(key_line.lstrip())]
+        first = True
+        for step in journal.steps():
+            f.write(b"[\n" if first else b",\n")
+            f.write(outer + b"  " + _indent(self.dumps(step), outer + b"  "))
+            first = False
+        f.write(b"[]" if first else b"\n" + outer + b"]")
+        f.write(_indent(tail, prefix))
+
+
+class OrjsonSerializer(JSONSerializer):
+    """The same JSON as ``JSONSerializer`` several times faster (needs orjson).
+
+    Only tiny floats are spelled differently (0.00001 instead of 1e-05).
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("The orjson serializer requires orjson (pip install orjson)")
+
+    def dumps(self, obj: Any, indent: bool = True) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """Compact binary MessagePack, for archiving run files (needs ormsgpack).
+
+    Not readable by the importer, so only used for the individual run files;
+    the prompt history stays JSON.
+    """
+
+    name = "msgpack"
+    extension = ".msgpack"
+    is_json = False
+
+    def __init__(self):
+        try:
+            import ormsgpack
+        except ImportError:
+            raise RuntimeError("The msgpack serializer requires ormsgpack (pip install ormsgpack)")
+        self._ormsgpack = ormsgpack
+
+    def dumps(self, obj: Any, indent: bool = True) -> bytes:
+        return self._ormsgpack.packb(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._ormsgpack.unpackb(data)
+
+    def write_record(self, f, record: Dict, journal, level: int = 0):
+        """Write ``record`` as one MessagePack map, its steps packed one at a time from ``journal``."""
+        f.write(_msgpack_header(len(record), 0x80, 0xde))
+        for key, value in record.items():
+            f.write(self.dumps(key))
+            if key == "conversation_flow":
+                f.write(_msgpack_header(len(journal), 0x90, 0xdc))
+                for step in journal.steps():
+                    f.write(self.dumps(step))
+            else:
+                f.write(self.dumps(value))
+
+
+def _msgpack_header(size: int, fix: int, sized: int) -> bytes:
+    """Map (fixmap 0x80, map16 0xde) or array (fixarray 0x90, array16 0xdc) header; map32/array32 follow the 16-bit code."""
+    if size < 16:
+        return bytes([fix | size])
+    if size < 1 << 16:
+        return bytes([sized]) + size.to_bytes(2, "big")
+    return bytes([sized + 1]) + size.to_bytes(4, "big")
+
+
+SERIALIZERS = {
+    "json": JSONSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+# Fastest JSON serializer installed
+DEFAULT_SERIALIZER = "orjson" if orjson is not None else "json"
+
+
+def get_serializer(name: Optional[str] = None):
+    """Serializer by name (default: DEFAULT_SERIALIZER); RuntimeError if its package is missing."""
+    name = name or DEFAULT_SERIALIZER
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{name}' (choose from {', '.join(SERIALIZERS)})")
+    return SERIALIZERS[name]()
+
+
+def _indent(text: bytes, prefix: bytes) -> bytes:
+    # JSON escapes newlines inside strings, so every newline here is structural
+    return text.replace(b"\n", b"\n" + prefix)
+
+
+# ====================== RECORD WRITERS ======================
+def write_execution(path: str, record: Dict, journal, serializer=None):
+    """Write one run's file, with its steps taken from the journal."""
+    serializer = serializer or get_serializer()
+    with open(path, "wb") as f:
+        serializer.write_record(f, record, journal)
+
+
+def append_execution(history_path: str, record: Dict, journal, serializer=None):
+    """
+    Append one run to a prompt's history file (a JSON array) in place
+
+    The earlier runs are neither loaded nor rewritten: the closing bracket is
+    replaced by the new record. A missing file, or one that does not hold an
+    array, is started over with just this run.
+    """
+    serializer = serializer or get_serializer()
+    if not serializer.is_json:
+        raise ValueError(f"The prompt history is JSON, not {serializer.name}")
+    with open(history_path, "a+b") as f:
+        f.seek(0, os.SEEK_END)
+        closing = _last_char(f, f.tell())
+        if closing is None or closing[0] != b"]":
+            f.truncate(0)
+            f.write(b"[\n")
+        else:
+            opening = _last_char(f, closing[1])
+            # Cut after the last record (or the opening bracket of an empty array)
+            f.truncate(opening[1] + 1)
+            f.write(b"\n" if opening[0] == b"[" else b",\n")
+        f.write(b"  ")
+        serializer.write_record(f, record, journal, level=1)
+        f.write(b"\n]")
+
+
+def _last_char(f, before: int):
+    """(character, position) of the last non-whitespace byte before ``before``, or None."""
+    position = before
+    while position > 0:
+        step = min(4096, position)
+        position -= step
+        f.seek(position)
+        chunk = f.read(step).rstrip()
+        if chunk:
+            return chunk[-1:], position + len(chunk) - 1
+    return None
@@ -0,0 +1,77 @@
+import os
+from typing import Dict, Iterator, List
+
+from serializers import get_serializer
+
+
+# ====================== STEP JOURNAL ======================
+class StepJournal:
+    """Conversation steps of a run, spilled to a JSON Lines file as they complete.
+
+    Used as ``stats['conversation_steps']``: ``CleanStatsCallback`` appends
+    each step, which is written to ``path`` and flushed right away. Only a
+    summary of each step stays in memory: the large fields (tool input and
+    output, LLM text) are replaced by their length in characters, so memory
+    no longer grows with the size of the query results. Iterating the journal
+    yields these summaries; ``steps()`` reads the full steps back from disk.
+
+    Args:
+        path: Journal file, truncated when the journal is created.
+        serializer: JSON serializer of the lines (default: the fastest installed).
+    """
+
+    # Fields that stay on disk only; the summary keeps '<field>_chars'
+    PAYLOAD_FIELDS = ("input", "output", "output_text")
+
+    def __init__(self, path: str, serializer=None):
+        self.path = path
+        self._serializer = serializer if serializer is not None and serializer.is_json else get_serializer()
+        self._file = open(path, "wb")
+        self.summaries: List[Dict] = []
+        self.bytes_written = 0
+
+    def append(self, step: Dict):
+        line = self._serializer.dumps(step, indent=False) + b"\n"
+        self._file.write(line)
+        self._file.flush()
+        self.bytes_written += len(line)
+
+        summary = {key: value for key, value in step.items() if key not in self.PAYLOAD_FIELDS}
+        for field in self.PAYLOAD_FIELDS:
+            if step.get(field) is not None:
+                summary[f"{field}_chars"] = len(step[field])
+        self.summaries.append(summary)
+
+    def __len__(self) -> int:
+        return len(self.summaries)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.summaries)
+
+    def steps(self) -> Iterator[Dict]:
+        """Full steps, read back from the journal one at a time."""
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield self._serializer.loads(line)
+
+    def last_output_text(self) -> str:
+        """Text of the last LLM response that had any, e.g. for a cancelled run's answer."""
+        if not any(s["type"] == "llm_response" and s.get("output_text_chars") for s in self.summaries):
+            return ""
+        last_text = ""
+        for step in self.steps():
+            if step["type"] == "llm_response" and step.get("output_text"):
+                last_text = step["output_text"]
+        return last_text
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def remove(self):
+        """Close and delete the journal, once the run's files have been written from it."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
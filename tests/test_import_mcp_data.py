@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils"))
+
+from import_mcp_data import MCPDataImporter, register_payload_functions  # noqa: E402
+
+
+def _record(number):
+    return {
+        "run_id": f"run-{number}",
+        "framework_version": "1.0.1",
+        "execution_timestamp": f"2025-01-21T14:30:{number:02d}",
+        "mcp_server": "cdata_monday",
+        "model": "claude-sonnet-4-5",
+        "execution_time_s": 10.0 + number,
+        "raw_user_prompt": "How many items are Done? Größe",
+        "prompt_id": 1,
+        "final_answer": f"{number} items",
+        "summary": {"total_tokens": 120, "input_tokens": 100, "output_tokens": 20, "llm_time_s": 1.0,
+                    "mcp_time_s": 2.0, "tool_calls": 1, "total_steps": 2},
+        "conversation_flow": [
+            {"type": "llm_response", "duration_s": 1.0, "input_tokens": 100, "output_tokens": 20,
+             "total_tokens": 120, "output_text": "Let me query the board"},
+            {"type": "mcp_tool_call", "tool": "run_query", "duration_s": 2.0,
+             "input": "{'query': 'SELECT COUNT(*) FROM Items'}", "output": f"{number}"},
+        ],
+    }
+
+
+def _write_history(path, records, newline):
+    # json.dump in text mode, as the agent wrote histories before appending in place
+    with open(path, "w", encoding="utf-8", newline=newline) as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+
+
+def _import(db_path):
+    importer = MCPDataImporter(db_path)
+    importer.open_database()
+    importer.bulk_import_files("prompt_*.json", incremental=True)
+    importer.close()
+    with sqlite3.connect(db_path) as conn:
+        return sorted(row[0] for row in conn.execute("SELECT run_id FROM executions"))
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_appended_history_imports_only_new_records(tmp_path, monkeypatch, newline):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "analysis.db")
+
+    _write_history("prompt_1.json", [_record(n) for n in range(3)], newline)
+    assert _import(db_path) == ["run-0", "run-1", "run-2"]
+
+    # The whole array rewritten with two more records: earlier ones serialize identically
+    _write_history("prompt_1.json", [_record(n) for n in range(5)], newline)
+    assert _import(db_path) == [f"run-{n}" for n in range(5)]
+
+    with sqlite3.connect(db_path) as conn:
+        last_offset, records = conn.execute("SELECT last_offset, records FROM import_manifest").fetchone()
+    with open("prompt_1.json", "rb") as f:
+        data = f.read()
+    # Just past the last record's closing brace, in bytes of the file as written
+    assert data[:last_offset].endswith(b"}") and data[last_offset:].strip() == b"]"
+    assert records == 5
+
+
+def test_invalid_utf8_history_is_read_whole_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "analysis.db")
+
+    _write_history("prompt_1.json", [_record(n) for n in range(2)], "\r\n")
+    with open("prompt_1.json", "rb") as f:
+        data = f.read()
+    # A stray Latin-1 byte inside a string: decoded as U+FFFD, which shifts character offsets
+    with open("prompt_1.json", "wb") as f:
+        f.write(data.replace("Größe".encode("utf-8"), b"Gr\xf6\xdfe", 1))
+    assert _import(db_path) == ["run-0", "run-1"]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT last_offset FROM import_manifest").fetchone()[0] == 0
+
+    _write_history("prompt_1.json", [_record(n) for n in range(3)], "\r\n")
+    assert _import(db_path) == ["run-0", "run-1", "run-2"]
+
+
+def test_execution_sequence_follows_step_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "analysis.db")
+    record = _record(1)
+    record["conversation_flow"].append({"type": "mcp_tool_call", "tool": "get_items", "duration_s": 1.0,
+                                        "input": "{}", "output": "[]"})
+    _write_history("prompt_1.json", [record], "\n")
+    _import(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        # Steps stored newest first and no index to read them in step order
+        conn.execute("DROP INDEX idx_steps_execution")
+        conn.execute("UPDATE conversation_steps SET step_id = -step_id")
+        sequence, = conn.execute("SELECT execution_sequence FROM prompt_execution_patterns").fetchone()
+    assert sequence == "LLM → run_query → get_items"
+
+
+def test_compaction_counts_are_imported(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "analysis.db")
+    record = _record(1)
+    record["conversation_flow"][0].update(context_tokens_before=70000, context_tokens_after=58000,
+                                          compacted_messages=3)
+    _write_history("prompt_1.json", [record], "\n")
+    _import(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        register_payload_functions(conn)
+        rows = conn.execute("""
+            SELECT step_type, context_tokens_before, context_tokens_after, compacted_messages
+            FROM conversation_steps_with_execution ORDER BY step_number
+        """).fetchall()
+    assert rows == [("llm_response", 70000, 58000, 3), ("mcp_tool_call", None, None, None)]
+
+
+def test_per_file_import_replaces_the_steps_of_a_rerun(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "analysis.db")
+    # The same run in two files: the second import replaces the first
+    _write_history("prompt_1.json", [_record(1)], "\n")
+    _write_history("prompt_2.json", [_record(1)], "\n")
+
+    importer = MCPDataImporter(db_path)
+    importer.create_database()
+    importer.import_multiple_files("prompt_*.json")
+    importer.close()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM executions").fetchone() == (1,)
+        assert conn.execute("SELECT COUNT(*) FROM conversation_steps").fetchone() == (2,)
+        orphans = conn.execute("""
+            SELECT COUNT(*) FROM conversation_steps
+            WHERE execution_id NOT IN (SELECT execution_id FROM executions)
+        """).fetchone()
+        assert orphans == (0,)
@@ -0,0 +1,31 @@
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_log import RunLog  # noqa: E402
+
+
+def test_pruning_keeps_segments_still_queued_for_compression(tmp_path):
+    path = str(tmp_path / "run.log")
+    log = RunLog(path, max_bytes=1000, max_segments=3)
+    # Quick lines rotate faster than the segments compress
+    with log as log_file:
+        for number in range(100):
+            print(f"line {number} " + "x" * 200, file=log_file)
+    log.finish()
+
+    kept = [f"run.log.{n}.gz" for n in range(log.rotations - 2, log.rotations + 1)]
+    assert sorted(os.listdir(tmp_path)) == ["run.log"] + kept
+    assert log.segments_deleted == log.rotations - 3
+    with gzip.open(os.path.join(tmp_path, kept[-1]), "rt", encoding="utf-8") as segment:
+        assert segment.read().startswith("line ")
+
+
+def test_compress_skips_a_segment_already_gone(tmp_path):
+    path = str(tmp_path / "run.log")
+    log = RunLog(path, max_bytes=None, max_segments=3)
+    log._compress(1)
+    log.finish()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import WorkQueue  # noqa: E402
+
+
+def _fail_until_failed(queue):
+    while True:
+        job = queue.claim("worker-1")
+        if job is None:
+            return
+        queue.fail(job['job_id'], "worker-1", "boom", backoff_s=0)
+
+
+def test_retry_failed_grants_another_attempt_under_same_limit(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.enqueue([1, 2], ["cdata_monday"], max_attempts=2)
+    _fail_until_failed(queue)
+    assert queue.counts()['failed'] == 2
+
+    # Resuming with the same --max-attempts still retries every failed job once
+    assert queue.retry_failed(2) == 2
+    job = queue.claim("worker-1")
+    assert job['attempts'] == 3
+    queue.fail(job['job_id'], "worker-1", "boom", backoff_s=0)
+    _fail_until_failed(queue)
+    assert queue.counts()['failed'] == 2
+
+    # A higher limit gives the jobs the attempts up to it
+    assert queue.retry_failed(5) == 2
+    _fail_until_failed(queue)
+    attempts = {row['prompt_id']: row['attempts'] for row in queue.manifest()}
+    assert attempts == {1: 5, 2: 5}
+    queue.close()
+
+
+def test_retry_failed_without_limit_resets_attempts(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.enqueue([1], ["cdata_monday"], max_attempts=1)
+    _fail_until_failed(queue)
+
+    assert queue.retry_failed() == 1
+    assert queue.claim("worker-1")['attempts'] == 1
+    queue.close()
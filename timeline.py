@@ -0,0 +1,53 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# ====================== RUN TIMELINE ======================
+class Timeline:
+    """Start/end offsets of the framework phases of a run.
+
+    Offsets are seconds from ``origin`` on the ``time.perf_counter()`` clock.
+    CleanStatsCallback stamps the conversation steps against the same origin,
+    so phases and steps line up on one axis (see analyze_data.py --timeline).
+
+    Args:
+        origin: ``perf_counter()`` value that offset 0 stands for (default: now).
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases: List[Dict] = []
+
+    def offset(self, at: Optional[float] = None) -> float:
+        """Seconds from the origin to ``at`` (default: now), to the millisecond."""
+        return round((time.perf_counter() if at is None else at) - self.origin, 3)
+
+    def add(self, name: str, started: float, ended: Optional[float] = None):
+        """Record phase ``name`` between two ``perf_counter()`` values (``ended`` default: now)."""
+        self.phases.append({
+            "phase": name,
+            "start_offset_s": self.offset(started),
+            "end_offset_s": self.offset(ended),
+        })
+
+    def extend(self, name: str):
+        """Record phase ``name`` from the end of the previous phase (or the origin) until now.
+
+        Called after each section of ``main()``, this leaves no gap between
+        consecutive phases.
+        """
+        started = self.origin + self.phases[-1]["end_offset_s"] if self.phases else self.origin
+        self.add(name, started)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the enclosed block as phase ``name``, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started)
+
+    def as_list(self) -> List[Dict]:
+        return [dict(phase) for phase in self.phases]
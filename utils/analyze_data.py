@@ -1,209 +1,107 @@
 import sqlite3
 import pandas as pd
+import numpy as np
+import json
 import os
+import sys
+
+import duckdb_backend
+from import_mcp_data import register_payload_functions, use_materialized_reports
 
 # Get the directory where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(script_dir, "mcp_analysis.db")
 
+# DuckDB mirror to read instead of db_path (--duckdb), see duckdb_backend.py
+duckdb_path = None
+
+# Display names used in the per-prompt tables
+SERVER_LABELS = {
+    'cdata': 'CData Monday',
+    'static': 'Local Native (Static)',
+    'dynamic': 'Local Native (Dynamic)',
+    'full': 'Local Native (Full)',
+    'cdata_custom': 'CData Monday (Custom)',
+    'jira': 'CData Jira',
+    'bc365': 'CData BC365',
+    'bc365_custom': 'CData BC365 (Custom)',
+}
+
+# Column prefixes used in the Full Report (same as the Full_Report view)
+FULL_REPORT_PREFIXES = {
+    'cdata': 'CData',
+    'static': 'Monday',
+    'dynamic': 'Graph',
+    'full': 'Full',
+}
+
+# Token ranking within a prompt -> rating (rank 4 and above is 'Extreme')
+EFFICIENCY_LABELS = {1: "Low", 2: "Medium", 3: "High"}
+
+OUTPUT_FORMATS = ('console', 'csv', 'markdown')
+
+# Metrics compared across repeated trials (lower is better) -> label
+TRIAL_METRICS = {'execution_time_s': 'Time', 'total_tokens': 'Tokens', 'total_steps': 'Steps'}
+
+# Resamples drawn for each bootstrap confidence interval and each permutation test
+RESAMPLES = 10_000
+
+# Confidence of the bootstrap intervals, and the p-value below which a server is declared winner
+CONFIDENCE = 0.95
+ALPHA = 0.05
+
+# Fixed seed, so the same data always gives the same intervals and p-values
+RESAMPLING_SEED = 42
+
+# Characters of the waterfall bars (the whole run)
+WATERFALL_WIDTH = 60
+
+
 def format_time(seconds):
     """Format seconds to a readable string"""
-    if seconds is None:
+    if seconds is None or pd.isna(seconds):
         return "N/A"
     return f"{seconds:.3f}s"
 
-def get_efficiency_rating(total_tokens, all_tokens):
+def efficiency_ratings(df):
     """
-    Assign efficiency rating based on token count ranking
+    Assign efficiency ratings based on token count ranking within each prompt
     Low: Lowest token count (1st place)
     Medium: 2nd lowest token count
     High: 3rd lowest token count
     Extreme: Highest token count (4th place)
+
+    Args:
+        df: Executions with 'prompt_id' and 'total_tokens' columns
+
+    Returns:
+        Series of ratings aligned with df
     """
-    # Sort tokens and find rank (1 = lowest, 4 = highest)
-    sorted_tokens = sorted(all_tokens)
-    rank = sorted_tokens.index(total_tokens) + 1  # 1-indexed rank
-    
-    if rank == 1:
-        return "Low"
-    elif rank == 2:
-        return "Medium"
-    elif rank == 3:
-        return "High"
+    # Ties share the best rank, like the position of the first match in a sorted list
+    rank = df.groupby('prompt_id')['total_tokens'].rank(method='min').astype(int)
+    return rank.map(EFFICIENCY_LABELS).fillna("Extreme")
+
+def server_label(server_type):
+    return SERVER_LABELS.get(server_type, server_type.upper())
+
+def read_sql(query, params=()):
+    """Run a query on the SQLite database, or on the DuckDB mirror when duckdb_path is set"""
+    if duckdb_path:
+        conn = duckdb_backend.connect(duckdb_path)
+        df = conn.execute(query, list(params)).df()
     else:
-        return "Extreme"
+        conn = sqlite3.connect(db_path)
+        register_payload_functions(conn)
+        df = pd.read_sql_query(query, conn, params=params)
+    conn.close()
+    return df
 
-def print_full_report():
-    """Print the comprehensive Full Report comparing all servers across all prompts"""
-    conn = sqlite3.connect(db_path)
-    
-    # Create the Full_Report view query
+def load_executions(prompt_ids=None):
+    """Load the latest run's metrics for the given prompts (default: all prompts) in one query"""
     query = """
-        SELECT 
-            e.prompt_id as Number,
-            e.raw_user_prompt as Prompt,
-            -- Winners
-            (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY total_steps ASC LIMIT 1) as Steps_Winner,
-            (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY total_tokens ASC LIMIT 1) as Tokens_Winner,
-            (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY execution_time_s ASC LIMIT 1) as Time_Winner,
-            -- total_steps
-            MAX(CASE WHEN e.server_type = 'cdata' THEN e.total_steps END) as CData_Steps,
-            MAX(CASE WHEN e.server_type = 'static' THEN e.total_steps END) as Monday_Steps,
-            MAX(CASE WHEN e.server_type = 'dynamic' THEN e.total_steps END) as Graph_Steps,
-            MAX(CASE WHEN e.server_type = 'full' THEN e.total_steps END) as Full_Steps,
-            -- total_tokens
-            MAX(CASE WHEN e.server_type = 'cdata' THEN e.total_tokens END) as CData_Total_Tokens,
-            MAX(CASE WHEN e.server_type = 'static' THEN e.total_tokens END) as Monday_Total_Tokens,
-            MAX(CASE WHEN e.server_type = 'dynamic' THEN e.total_tokens END) as Graph_Total_Tokens,
-            MAX(CASE WHEN e.server_type = 'full' THEN e.total_tokens END) as Full_Total_Tokens,
-            -- execution_time_s
-            MAX(CASE WHEN e.server_type = 'cdata' THEN e.execution_time_s END) as CData_Whole_Chat_Time,
-            MAX(CASE WHEN e.server_type = 'static' THEN e.execution_time_s END) as Monday_Whole_Chat_Time,
-            MAX(CASE WHEN e.server_type = 'dynamic' THEN e.execution_time_s END) as Graph_Whole_Chat_Time,
-            MAX(CASE WHEN e.server_type = 'full' THEN e.execution_time_s END) as Full_Whole_Chat_Time
-        FROM executions e
-        GROUP BY e.prompt_id
-        ORDER BY e.prompt_id
-    """
-    
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    
-    if df.empty:
-        print("\n❌ No data found in database")
-        return
-    
-    # Column widths
-    col_number = 8
-    col_prompt = 60
-    col_winner = 12
-    col_steps = 10
-    
-    # Print header
-    print("\n" + "="*160)
-    print("FULL PERFORMANCE REPORT")
-    print("="*160)
-    
-    # Column headers
-    header = (f"{'Number':<{col_number}}"
-              f"{'Prompt':<{col_prompt}}"
-              f"{'Steps_W...':<{col_winner}}"
-              f"{'Tokens_...':<{col_winner}}"
-              f"{'Time_W...':<{col_winner}}"
-              f"{'CData_St...':<{col_steps}}"
-              f"{'Monday_...':<{col_steps}}"
-              f"{'Graph_St...':<{col_steps}}"
-              f"{'Full_Steps':<{col_steps}}")
-    
-    print(header)
-    print("-"*160)
-    
-    # Print each row
-    for _, row in df.iterrows():
-        # Truncate prompt if too long
-        prompt_text = row['Prompt']
-        if len(prompt_text) > col_prompt - 4:
-            prompt_text = prompt_text[:col_prompt - 7] + "..."
-        
-        # Format values
-        num = int(row['Number'])
-        steps_w = row['Steps_Winner'] if pd.notna(row['Steps_Winner']) else '-'
-        tokens_w = row['Tokens_Winner'] if pd.notna(row['Tokens_Winner']) else '-'
-        time_w = row['Time_Winner'] if pd.notna(row['Time_Winner']) else '-'
-        
-        cdata_steps = int(row['CData_Steps']) if pd.notna(row['CData_Steps']) else '-'
-        monday_steps = int(row['Monday_Steps']) if pd.notna(row['Monday_Steps']) else '-'
-        graph_steps = int(row['Graph_Steps']) if pd.notna(row['Graph_Steps']) else '-'
-        full_steps = int(row['Full_Steps']) if pd.notna(row['Full_Steps']) else '-'
-        
-        # Print row
-        row_str = (f"{num:<{col_number}}"
-                   f"{prompt_text:<{col_prompt}}"
-                   f"{steps_w:<{col_winner}}"
-                   f"{tokens_w:<{col_winner}}"
-                   f"{time_w:<{col_winner}}"
-                   f"{str(cdata_steps):<{col_steps}}"
-                   f"{str(monday_steps):<{col_steps}}"
-                   f"{str(graph_steps):<{col_steps}}"
-                   f"{str(full_steps):<{col_steps}}")
-        
-        print(row_str)
-    
-    print("="*160)
-    
-    # Print token and time data as separate table
-    print("\n" + "="*160)
-    print("TOKEN AND TIME METRICS")
-    print("="*160)
-    
-    # Token headers
-    header_tokens = (f"{'Number':<{col_number}}"
-                     f"{'CData_Tok...':<{col_steps+2}}"
-                     f"{'Monday_T...':<{col_steps+2}}"
-                     f"{'Graph_To...':<{col_steps+2}}"
-                     f"{'Full_Toke...':<{col_steps+2}}"
-                     f"{'CData_Tim...':<{col_steps+2}}"
-                     f"{'Monday_T...':<{col_steps+2}}"
-                     f"{'Graph_Ti...':<{col_steps+2}}"
-                     f"{'Full_Time':<{col_steps+2}}")
-    
-    print(header_tokens)
-    print("-"*160)
-    
-    # Print token and time rows
-    for _, row in df.iterrows():
-        num = int(row['Number'])
-        
-        # Tokens
-        cdata_tok = f"{int(row['CData_Total_Tokens']):,}" if pd.notna(row['CData_Total_Tokens']) else '-'
-        monday_tok = f"{int(row['Monday_Total_Tokens']):,}" if pd.notna(row['Monday_Total_Tokens']) else '-'
-        graph_tok = f"{int(row['Graph_Total_Tokens']):,}" if pd.notna(row['Graph_Total_Tokens']) else '-'
-        full_tok = f"{int(row['Full_Total_Tokens']):,}" if pd.notna(row['Full_Total_Tokens']) else '-'
-        
-        # Times
-        cdata_time = f"{row['CData_Whole_Chat_Time']:.1f}" if pd.notna(row['CData_Whole_Chat_Time']) else '-'
-        monday_time = f"{row['Monday_Whole_Chat_Time']:.1f}" if pd.notna(row['Monday_Whole_Chat_Time']) else '-'
-        graph_time = f"{row['Graph_Whole_Chat_Time']:.1f}" if pd.notna(row['Graph_Whole_Chat_Time']) else '-'
-        full_time = f"{row['Full_Whole_Chat_Time']:.1f}" if pd.notna(row['Full_Whole_Chat_Time']) else '-'
-        
-        # Print row
-        row_str = (f"{num:<{col_number}}"
-                   f"{cdata_tok:<{col_steps+2}}"
-                   f"{monday_tok:<{col_steps+2}}"
-                   f"{graph_tok:<{col_steps+2}}"
-                   f"{full_tok:<{col_steps+2}}"
-                   f"{cdata_time:<{col_steps+2}}"
-                   f"{monday_time:<{col_steps+2}}"
-                   f"{graph_time:<{col_steps+2}}"
-                   f"{full_time:<{col_steps+2}}")
-        
-        print(row_str)
-    
-    print("="*160 + "\n")
-
-def analyze_prompt_performance(prompt_id):
-    """Generate performance comparison tables for a specific prompt"""
-    conn = sqlite3.connect(db_path)
-    
-    # Check if prompt exists
-    prompt_check = pd.read_sql_query("""
-        SELECT COUNT(*) as count, raw_user_prompt
-        FROM executions
-        WHERE prompt_id = ?
-        GROUP BY raw_user_prompt
-    """, conn, params=(prompt_id,))
-    
-    if prompt_check.empty:
-        print(f"\n❌ No data found for prompt_id: {prompt_id}")
-        conn.close()
-        return
-    
-    prompt_text = prompt_check['raw_user_prompt'].iloc[0]
-    print(f"Use Case {prompt_id}\n{prompt_text[:]}")
-    
-    # Get execution data for the prompt
-    df_exec = pd.read_sql_query("""
-        SELECT 
+        SELECT
+            prompt_id,
+            raw_user_prompt,
             server_type,
             execution_time_s,
             llm_time_s,
@@ -212,146 +110,719 @@ def analyze_prompt_performance(prompt_id):
             input_tokens,
             output_tokens,
             total_steps
+        FROM latest_executions
+    """
+    params = ()
+    if prompt_ids is not None:
+        prompt_ids = list(prompt_ids)
+        query += f" WHERE prompt_id IN ({','.join('?' * len(prompt_ids))})"
+        params = tuple(prompt_ids)
+    query += " ORDER BY prompt_id, server_type"
+
+    return read_sql(query, params)
+
+def load_full_report():
+    """The materialized Full_Report kept by the importer (or DuckDB's Full_Report), None when stale"""
+    if duckdb_path:
+        return read_sql("SELECT * FROM Full_Report")
+    conn = sqlite3.connect(db_path)
+    report = None
+    if 'Full_Report' in use_materialized_reports(conn):
+        report = pd.read_sql_query("SELECT * FROM Full_Report", conn)
+    conn.close()
+    return report
+
+def load_trials(prompt_ids=None):
+    """Load every completed run (the repeated trials) of the given prompts, like median_executions"""
+    query = """
+        SELECT
+            prompt_id,
+            server_type,
+            execution_time_s,
+            total_tokens,
+            total_steps
         FROM executions
-        WHERE prompt_id = ?
+        WHERE termination_reason = 'completed'
+    """
+    params = ()
+    if prompt_ids is not None:
+        prompt_ids = list(prompt_ids)
+        query += f" AND prompt_id IN ({','.join('?' * len(prompt_ids))})"
+        params = tuple(prompt_ids)
+    query += " ORDER BY prompt_id, server_type"
+
+    return read_sql(query, params)
+
+# ====================== TRIAL STATISTICS ======================
+def bootstrap_median_ci(samples, rng, resamples=RESAMPLES, confidence=CONFIDENCE):
+    """
+    Percentile bootstrap confidence interval of the median
+
+    All resamples are drawn at once as a (resamples, n) index matrix and
+    reduced with one np.median over axis 1.
+    """
+    samples = np.asarray(samples, dtype=float)
+    indexes = rng.integers(0, len(samples), size=(resamples, len(samples)))
+    medians = np.median(samples[indexes], axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(medians, [tail, 100 - tail])
+    return low, high
+
+def permutation_test(a, b, rng, resamples=RESAMPLES):
+    """
+    Two-sided p-value of the difference in medians between two samples
+
+    The pooled samples are shuffled resamples times in one (resamples, n)
+    matrix; the p-value is the share of shuffles whose difference is at
+    least the observed one (+1 smoothing, so it is never 0).
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    observed = abs(np.median(a) - np.median(b))
+    shuffled = rng.permuted(np.tile(np.concatenate([a, b]), (resamples, 1)), axis=1)
+    differences = np.abs(np.median(shuffled[:, :len(a)], axis=1) - np.median(shuffled[:, len(a):], axis=1))
+    # Tolerance, so float noise does not make an identical split count as smaller
+    extreme = np.count_nonzero(differences >= observed - 1e-9 * max(observed, 1.0))
+    return (extreme + 1) / (resamples + 1)
+
+def trial_statistics(df_trials, seed=RESAMPLING_SEED):
+    """
+    Medians and bootstrap confidence intervals per prompt and server
+
+    Returns:
+        DataFrame indexed by (prompt_id, server_type) with trials and, per
+        TRIAL_METRICS column, median_<metric>, ci_low_<metric> and ci_high_<metric>
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for (prompt_id, server_type), group in df_trials.groupby(['prompt_id', 'server_type']):
+        row = {'prompt_id': prompt_id, 'server_type': server_type, 'trials': len(group)}
+        for metric in TRIAL_METRICS:
+            samples = group[metric].dropna().to_numpy()
+            if len(samples):
+                row[f'median_{metric}'] = np.median(samples)
+                row[f'ci_low_{metric}'], row[f'ci_high_{metric}'] = bootstrap_median_ci(samples, rng)
+            else:
+                row[f'median_{metric}'] = row[f'ci_low_{metric}'] = row[f'ci_high_{metric}'] = np.nan
+        rows.append(row)
+    return pd.DataFrame(rows).set_index(['prompt_id', 'server_type'])
+
+def trial_winners(df_trials, seed=RESAMPLING_SEED, alpha=ALPHA):
+    """
+    Per prompt and metric, the server with the lowest median, and whether it wins
+
+    The best server is tested against every other server; it is only declared
+    the winner when all those differences are significant (p < alpha).
+
+    Returns:
+        DataFrame with prompt_id, metric, best_server, p_value (the largest of
+        the comparisons) and winner (best_server, or None when not significant)
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for prompt_id, prompt_trials in df_trials.groupby('prompt_id'):
+        for metric in TRIAL_METRICS:
+            samples = {server: group[metric].dropna().to_numpy()
+                       for server, group in prompt_trials.groupby('server_type')}
+            samples = {server: values for server, values in samples.items() if len(values)}
+            if len(samples) < 2:
+                continue
+            best = min(samples, key=lambda server: np.median(samples[server]))
+            p_value = max(permutation_test(samples[best], values, rng)
+                          for server, values in samples.items() if server != best)
+            rows.append({'prompt_id': prompt_id, 'metric': metric, 'best_server': best,
+                         'p_value': p_value, 'winner': best if p_value < alpha else None})
+    return pd.DataFrame(rows, columns=['prompt_id', 'metric', 'best_server', 'p_value', 'winner'])
+
+# ====================== TIMELINE ======================
+def load_timeline(prompt_id, server_type=None):
+    """
+    Latest runs of a prompt (one per server) with their phases, and their timed steps
+
+    Returns:
+        (runs, steps) DataFrames; runs recorded before the timeline existed have no phases
+    """
+    where = "WHERE prompt_id = ?"
+    params = (prompt_id,)
+    if server_type:
+        where += " AND server_type = ?"
+        params += (server_type,)
+    runs = read_sql(f"""
+        SELECT execution_id, prompt_id, server_type, run_id, execution_time_s, phases
+        FROM latest_executions
+        {where}
         ORDER BY server_type
-    """, conn, params=(prompt_id,))
-    
+    """, params)
+    steps = read_sql(f"""
+        SELECT
+            c.execution_id, c.step_number, c.step_type, c.tool_name,
+            c.start_offset_s, c.end_offset_s, c.queue_wait_s
+        FROM conversation_steps c
+        JOIN latest_executions e ON c.execution_id = e.execution_id
+        {where.replace('prompt_id', 'e.prompt_id').replace('server_type', 'e.server_type')}
+          AND c.start_offset_s IS NOT NULL
+        ORDER BY c.execution_id, c.start_offset_s
+    """, params)
+    return runs, steps
+
+def build_waterfall(phases, steps):
+    """
+    Phases and steps of one run as waterfall rows, in start order
+
+    LLM responses that waited for the rate limiter get a 'LLM queue' row
+    right before them.
+    """
+    rows = [('phase', phase['phase'], phase['start_offset_s'], phase['end_offset_s']) for phase in phases]
+    for step in steps.itertuples():
+        if step.step_type == 'llm_response':
+            if pd.notna(step.queue_wait_s) and step.queue_wait_s > 0:
+                rows.append(('llm_queue', 'LLM queue', step.start_offset_s - step.queue_wait_s, step.start_offset_s))
+            rows.append(('llm_response', f"LLM #{step.step_number}", step.start_offset_s, step.end_offset_s))
+        else:
+            rows.append(('mcp_tool_call', f"{step.tool_name} #{step.step_number}", step.start_offset_s, step.end_offset_s))
+    waterfall = pd.DataFrame(rows, columns=['kind', 'event', 'start_s', 'end_s'])
+    waterfall['duration_s'] = (waterfall['end_s'] - waterfall['start_s']).round(3)
+    # Phases first at equal offsets, so they enclose their steps
+    waterfall['order'] = (waterfall['kind'] != 'phase').astype(int)
+    return waterfall.sort_values(['start_s', 'order'], kind='stable').drop(columns='order').reset_index(drop=True)
+
+def attribute_wall_time(waterfall, wall):
+    """
+    Attribute every instant of [0, wall] to one activity
+
+    The run is cut at every start and end offset; each slice goes to the
+    first activity covering it: MCP tool calls, then LLM responses, then LLM
+    queue waits, then the framework phase it falls in (time in a phase not
+    covered by a step, e.g. agent callbacks and middleware inside agent_run),
+    and 'untracked' when nothing covers it. The slices add up to wall.
+
+    Returns:
+        (DataFrame of activity, seconds, share; dict of tool concurrency figures)
+    """
+    events = waterfall.assign(start_s=waterfall['start_s'].clip(0, wall), end_s=waterfall['end_s'].clip(0, wall))
+    cuts = np.unique(np.concatenate([[0.0, wall], events['start_s'], events['end_s']]))
+    lengths = np.diff(cuts)
+    middles = cuts[:-1] + lengths / 2
+    # (events, slices) matrix: which events cover each slice
+    covering = ((events['start_s'].to_numpy()[:, None] <= middles) & (middles < events['end_s'].to_numpy()[:, None]))
+
+    def covered(kind):
+        return covering[(events['kind'] == kind).to_numpy()]
+
+    tools = covered('mcp_tool_call').sum(axis=0)
+    phases = events[events['kind'] == 'phase']
+    phase_covering = covered('phase')
+    # Innermost (latest started) phase of each slice
+    phase_names = np.array([f"{name} (framework)" for name in phases['event']] + ['untracked'])
+    phase_index = np.where(phase_covering.any(axis=0),
+                           len(phases) - 1 - np.argmax(phase_covering[::-1], axis=0), len(phases))
+    activity = np.select(
+        [tools > 0, covered('llm_response').any(axis=0), covered('llm_queue').any(axis=0)],
+        ['MCP tool calls', 'LLM responses', 'LLM queue wait'],
+        default=phase_names[phase_index])
+
+    attribution = pd.Series(lengths).groupby(activity).sum().sort_values(ascending=False)
+    attribution = attribution.rename('seconds').rename_axis('activity').reset_index()
+    attribution['share'] = attribution['seconds'] / wall if wall else np.nan
+
+    tool_calls = events[events['kind'] == 'mcp_tool_call']
+    concurrency = {
+        'tool_time_s': float(tool_calls['duration_s'].sum()),
+        'tool_busy_s': float(lengths[tools > 0].sum()),
+        'parallel_tools_s': float(lengths[tools > 1].sum()),
+        'max_parallel_tools': int(tools.max()) if len(tools) else 0,
+    }
+    return attribution, concurrency
+
+def _console_timeline(run, waterfall, attribution, concurrency):
+    wall = run['execution_time_s']
+    scale = WATERFALL_WIDTH / wall if wall else 0
+    lines = ["", "=" * 120,
+             f"TIMELINE: prompt {run['prompt_id']} | {server_label(run['server_type'])} | run {run['run_id']} | "
+             f"{format_time(wall)}",
+             "=" * 120,
+             f"{'Offset':>10} {'Duration':>10}  {'Event':<36} |{'0s':<{WATERFALL_WIDTH // 2}}{format_time(wall):>{WATERFALL_WIDTH - WATERFALL_WIDTH // 2}}|",
+             "-" * 120]
+    for event in waterfall.itertuples():
+        start = min(int(event.start_s * scale), WATERFALL_WIDTH - 1)
+        width = max(1, min(int(round(event.duration_s * scale)), WATERFALL_WIDTH - start))
+        bar = " " * start + ("▒" if event.kind == 'phase' else "█") * width
+        label = event.event if event.kind == 'phase' else "  " + event.event
+        lines.append(f"{event.start_s:>9.3f}s {event.duration_s:>9.3f}s  {label[:36]:<36} |{bar:<{WATERFALL_WIDTH}}|")
+
+    lines += ["", "Wall time attribution", "-" * 60]
+    for row in attribution.itertuples():
+        lines.append(f"  {row.activity:<36}{row.seconds:>10.3f}s{row.share:>8.1%}")
+    lines.append(f"  {'Total':<36}{attribution['seconds'].sum():>10.3f}s{attribution['share'].sum():>8.1%}")
+    if concurrency['parallel_tools_s'] > 0:
+        lines.append(f"  Tool calls overlapped for {concurrency['parallel_tools_s']:.3f}s "
+                     f"(up to {concurrency['max_parallel_tools']} at once): "
+                     f"{concurrency['tool_time_s']:.3f}s of calls took {concurrency['tool_busy_s']:.3f}s of wall time")
+    lines.append("=" * 120)
+    return "\n".join(lines)
+
+# ====================== TABLE BUILDERS ======================
+def build_prompt_tables(df_exec):
+    """
+    Build the per-prompt comparison tables for every prompt in df_exec at once
+
+    Returns:
+        Dict of {table title: DataFrame indexed by (prompt_id, Metric) with one
+        column per server}
+    """
+    df = df_exec.assign(
+        total_time=df_exec['llm_time_s'] + df_exec['mcp_time_s'],
+        server=df_exec['server_type'].map(server_label),
+    )
+
+    # Format every metric column once, vectorized over all prompts and servers
+    execution_metrics = {
+        'Total Time': df['total_time'].map(format_time),
+        'MCP Time': df['mcp_time_s'].map(format_time),
+        'LLM Time': df['llm_time_s'].map(format_time),
+        'Execution Time': df['execution_time_s'].map(format_time),
+        'Total Steps': df['total_steps'].astype('Int64').astype(str),
+    }
+    token_metrics = {
+        'Total Token Count': df['total_tokens'].map(lambda t: f"{int(t):,} tokens" if pd.notna(t) else "N/A"),
+        'Token Consumption': efficiency_ratings(df),
+    }
+
+    tables = {}
+    for title, metrics in (("Execution Metrics", execution_metrics), ("AI Token Costs", token_metrics)):
+        tables[title] = _metric_table(pd.DataFrame(metrics), df['prompt_id'], df_exec['server_type'])
+    return tables
+
+def _metric_table(metrics, prompt_ids, server_types):
+    """Pivot formatted metric columns (one row per prompt and server) to rows per (prompt, metric), one column per server"""
+    formatted = metrics.assign(prompt_id=prompt_ids.to_numpy(), server=server_types.map(server_label).to_numpy())
+    # One pivot per table: (metric, server) columns -> rows per (prompt, metric)
+    table = formatted.pivot(index='prompt_id', columns='server', values=list(metrics))
+    table = table.stack(level=0, future_stack=True)
+    table.index.names = ['prompt_id', 'Metric']
+    table = table.reindex(pd.MultiIndex.from_product([table.index.levels[0], list(metrics)],
+                                                     names=['prompt_id', 'Metric']))
+    servers = [server_label(s) for s in sorted(server_types.unique())]
+    return table.reindex(columns=servers)
+
+def _format_metric(metric, values):
+    if metric == 'execution_time_s':
+        return values.map(format_time)
+    if metric == 'total_tokens':
+        return values.map(lambda v: f"{v:,.0f}" if pd.notna(v) else "N/A")
+    return values.map(lambda v: f"{v:g}" if pd.notna(v) else "N/A")
+
+def build_trial_table(df_trials):
+    """
+    Build the repeated-trials table for every prompt in df_trials
+
+    Per server: number of trials, then per metric the median and its bootstrap
+    confidence interval. The '<metric> Winner' rows mark the server with the
+    lowest median: 'Winner' when it is significantly better than every other
+    server, 'Best, n.s.' when it is not, with the p-value.
+
+    Returns:
+        DataFrame indexed by (prompt_id, Metric) with one column per server
+    """
+    stats = trial_statistics(df_trials).reset_index()
+    winners = trial_winners(df_trials)
+    pairs = pd.MultiIndex.from_frame(stats[['prompt_id', 'server_type']])
+
+    metrics = {'Trials': stats['trials'].astype(str)}
+    for metric, label in TRIAL_METRICS.items():
+        metrics[f'Median {label}'] = _format_metric(metric, stats[f'median_{metric}'])
+        metrics[f'{label} {CONFIDENCE:.0%} CI'] = (_format_metric(metric, stats[f'ci_low_{metric}']) + " - " +
+                                                   _format_metric(metric, stats[f'ci_high_{metric}']))
+        # The verdict goes in the best server's column
+        verdicts = winners[winners['metric'] == metric]
+        text = (np.where(verdicts['winner'].notna(), "Winner", "Best, n.s.") +
+                verdicts['p_value'].map(lambda p: f" (p={p:.3f})"))
+        text.index = pd.MultiIndex.from_frame(verdicts[['prompt_id', 'best_server']])
+        metrics[f'{label} Winner'] = pd.Series(text.reindex(pairs).to_numpy()).fillna("-")
+    return _metric_table(pd.DataFrame(metrics), stats['prompt_id'], stats['server_type'])
+
+# Winner columns of the Full Report and the trial metric each is decided on
+FULL_REPORT_WINNERS = {'Steps_Winner': 'total_steps', 'Tokens_Winner': 'total_tokens', 'Time_Winner': 'execution_time_s'}
+
+def add_trial_winners(report, df_trials):
+    """
+    Insert the Full Report's winner columns, decided over the repeated trials
+
+    A winner is only named when trial_winners() finds it significantly better
+    than every other server; otherwise the cell stays blank, as one run per
+    server cannot name one.
+
+    Returns:
+        The report with Steps_Winner, Tokens_Winner and Time_Winner after Prompt
+    """
+    winners = trial_winners(df_trials)
+    report = report.drop(columns=list(FULL_REPORT_WINNERS), errors='ignore')
+    first = report.columns.get_loc('Prompt') + 1
+    for position, (column, metric) in enumerate(FULL_REPORT_WINNERS.items(), start=first):
+        verdicts = winners[winners['metric'] == metric].set_index('prompt_id')['winner']
+        report.insert(position, column, report['Number'].map(verdicts))
+    return report
+
+def build_full_report(df_exec):
+    """
+    Build the Full Report (steps/tokens/time of the latest run per server) for all prompts
+
+    Returns:
+        DataFrame with the same columns as the Full_Report view
+    """
+    servers = list(FULL_REPORT_PREFIXES)
+    report = df_exec.groupby('prompt_id')['raw_user_prompt'].first().rename('Prompt').to_frame()
+
+    # One pivot per metric, columns renamed to the view's naming
+    for metric, suffix in (('total_steps', 'Steps'),
+                           ('total_tokens', 'Total_Tokens'),
+                           ('execution_time_s', 'Whole_Chat_Time')):
+        pivot = df_exec.pivot_table(index='prompt_id', columns='server_type', values=metric, aggfunc='max')
+        pivot = pivot.reindex(columns=servers)
+        pivot.columns = [f"{FULL_REPORT_PREFIXES[s]}_{suffix}" for s in servers]
+        report = report.join(pivot)
+
+    report.index.name = 'Number'
+    return report.reset_index()
+
+# ====================== RENDERERS ======================
+def _write(text, output=None):
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"✓ Report saved to: {output}")
+    else:
+        print(text)
+
+def _int_or_dash(series):
+    return series.map(lambda v: str(int(v)) if pd.notna(v) else '-')
+
+def _console_full_report(report):
+    # Column widths
+    col_number = 8
+    col_prompt = 60
+    col_winner = 12
+    col_steps = 10
+
+    prompts = report['Prompt'].fillna('')
+    too_long = prompts.str.len() > col_prompt - 4
+    prompts = prompts.where(~too_long, prompts.str[:col_prompt - 7] + "...")
+
+    lines = ["", "=" * 160, "FULL PERFORMANCE REPORT", "=" * 160]
+    lines.append(f"{'Number':<{col_number}}"
+                 f"{'Prompt':<{col_prompt}}"
+                 f"{'Steps_W...':<{col_winner}}"
+                 f"{'Tokens_...':<{col_winner}}"
+                 f"{'Time_W...':<{col_winner}}"
+                 f"{'CData_St...':<{col_steps}}"
+                 f"{'Monday_...':<{col_steps}}"
+                 f"{'Graph_St...':<{col_steps}}"
+                 f"{'Full_Steps':<{col_steps}}")
+    lines.append("-" * 160)
+
+    # Build each column as padded strings, then join row-wise
+    columns = [
+        report['Number'].astype(int).astype(str).str.ljust(col_number),
+        prompts.str.ljust(col_prompt),
+    ]
+    columns += [report[c].fillna('-').astype(str).str.ljust(col_winner)
+                for c in ('Steps_Winner', 'Tokens_Winner', 'Time_Winner')]
+    columns += [_int_or_dash(report[f"{p}_Steps"]).str.ljust(col_steps) for p in FULL_REPORT_PREFIXES.values()]
+    lines += pd.concat(columns, axis=1).sum(axis=1).tolist()
+    lines.append("=" * 160)
+
+    # Token and time data as separate table
+    width = col_steps + 2
+    lines += ["", "=" * 160, "TOKEN AND TIME METRICS", "=" * 160]
+    lines.append(f"{'Number':<{col_number}}"
+                 f"{'CData_Tok...':<{width}}"
+                 f"{'Monday_T...':<{width}}"
+                 f"{'Graph_To...':<{width}}"
+                 f"{'Full_Toke...':<{width}}"
+                 f"{'CData_Tim...':<{width}}"
+                 f"{'Monday_T...':<{width}}"
+                 f"{'Graph_Ti...':<{width}}"
+                 f"{'Full_Time':<{width}}")
+    lines.append("-" * 160)
+
+    columns = [report['Number'].astype(int).astype(str).str.ljust(col_number)]
+    columns += [report[f"{p}_Total_Tokens"].map(lambda v: f"{int(v):,}" if pd.notna(v) else '-').str.ljust(width)
+                for p in FULL_REPORT_PREFIXES.values()]
+    columns += [report[f"{p}_Whole_Chat_Time"].map(lambda v: f"{v:.1f}" if pd.notna(v) else '-').str.ljust(width)
+                for p in FULL_REPORT_PREFIXES.values()]
+    lines += pd.concat(columns, axis=1).sum(axis=1).tolist()
+    lines.append("=" * 160 + "\n")
+    return "\n".join(lines)
+
+def _console_prompt_tables(tables, prompt_texts):
+    lines = []
+    for prompt_id, prompt_text in prompt_texts.items():
+        lines.append(f"Use Case {prompt_id}\n{prompt_text}")
+        for i, (title, table) in enumerate(tables.items()):
+            rows = table.loc[prompt_id]
+            if i:
+                lines.append(f"\n{'='*80}")
+            lines.append(title)
+            lines.append(f"{'='*80}")
+            lines.append(f"{'Metric':<30} " + "".join(f"{c:<25}" for c in rows.columns))
+            lines.append("-" * 80)
+            padded = rows.fillna('-').apply(lambda col: col.str.ljust(25))
+            lines += (padded.index.to_series().str.ljust(30) + " " + padded.sum(axis=1)).tolist()
+        lines.append(f"\n{'='*80}\n")
+    return "\n".join(lines)
+
+def _markdown_prompt_tables(tables, prompt_texts):
+    sections = []
+    for prompt_id, prompt_text in prompt_texts.items():
+        sections.append(f"## Use Case {prompt_id}\n\n{prompt_text}\n")
+        for title, table in tables.items():
+            sections.append(f"### {title}\n\n{table.loc[prompt_id].fillna('-').to_markdown()}\n")
+    return "\n".join(sections)
+
+def render_prompt_tables(tables, prompt_texts, fmt='console', output=None):
+    """
+    Render per-prompt tables
+
+    Args:
+        tables: Output of build_prompt_tables()
+        prompt_texts: Series of prompt text indexed by prompt_id, in display order
+        fmt: 'console', 'csv' or 'markdown'
+        output: File path (csv: one file per table, suffixed with the table name)
+    """
+    if fmt == 'console':
+        _write(_console_prompt_tables(tables, prompt_texts), output)
+    elif fmt == 'markdown':
+        _write(_markdown_prompt_tables(tables, prompt_texts), output)
+    elif fmt == 'csv':
+        for title, table in tables.items():
+            if output:
+                base, ext = os.path.splitext(output)
+                path = f"{base}_{title.lower().replace(' ', '_')}{ext or '.csv'}"
+                table.to_csv(path)
+                print(f"✓ Table '{title}' saved to: {path}")
+            else:
+                table.to_csv(sys.stdout)
+    else:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(OUTPUT_FORMATS)}")
+
+def render_full_report(report, fmt='console', output=None):
+    """Render the Full Report to the console, CSV or Markdown"""
+    if fmt == 'console':
+        _write(_console_full_report(report), output)
+    elif fmt == 'markdown':
+        _write("# Full Performance Report\n\n" + report.to_markdown(index=False) + "\n", output)
+    elif fmt == 'csv':
+        if output:
+            report.to_csv(output, index=False)
+            print(f"✓ Report saved to: {output}")
+        else:
+            report.to_csv(sys.stdout, index=False)
+    else:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(OUTPUT_FORMATS)}")
+
+# ====================== REPORTS ======================
+def print_full_report(fmt='console', output=None):
+    """Print the comprehensive Full Report comparing all servers across all prompts"""
+    report = load_full_report()
+    if report is None or report.empty:
+        df = load_executions()
+
+        if df.empty:
+            print("\n❌ No data found in database")
+            return
+
+        report = build_full_report(df)
+
+    # Winners over the repeated trials; single runs vary too much to name one
+    report = add_trial_winners(report, load_trials(report['Number'].tolist()))
+    render_full_report(report, fmt, output)
+
+def analyze_prompt_performance(prompt_id, fmt='console', output=None):
+    """Generate performance comparison tables for a specific prompt"""
+    analyze_prompts([prompt_id], fmt, output)
+
+def analyze_prompts(prompt_ids=None, fmt='console', output=None):
+    """
+    Generate performance comparison tables for several prompts in one pass
+
+    Args:
+        prompt_ids: Prompt IDs to report (default: every prompt in the database)
+        fmt: 'console', 'csv' or 'markdown'
+        output: Optional output file path
+    """
+    df_exec = load_executions(prompt_ids)
+
     if df_exec.empty:
-        print(f"\n❌ No execution data found for prompt_id: {prompt_id}")
-        conn.close()
+        which = ', '.join(map(str, prompt_ids)) if prompt_ids is not None else 'any prompt'
+        print(f"\n❌ No data found for prompt_id: {which}")
         return
-    
-    # Get all token counts for efficiency rating comparison
-    all_tokens = df_exec['total_tokens'].tolist()
-    
-    # TABLE 1: Execution Metrics
-    print("Execution Metrics")
-    print(f"{'='*80}")
-    print(f"{'Metric':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        server_name = row['server_type'].upper()
-        if server_name == 'CDATA':
-            server_name = 'CData Monday'
-        elif server_name == 'STATIC':
-            server_name = 'Local Native (Static)'
-        elif server_name == 'DYNAMIC':
-            server_name = 'Local Native (Dynamic)'
-        elif server_name == 'FULL':
-            server_name = 'Local Native (Full)'
-        print(f"{server_name:<25}", end="")
-    print()
-    print("-" * 80)
-    
-    # Total Time
-    print(f"{'Total Time':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        total_time = row['llm_time_s'] + row['mcp_time_s']
-        print(f"{format_time(total_time):<25}", end="")
-    print()
-    
-    # MCP Time
-    print(f"{'MCP Time':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        print(f"{format_time(row['mcp_time_s']):<25}", end="")
-    print()
-    
-    # LLM Time
-    print(f"{'LLM Time':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        print(f"{format_time(row['llm_time_s']):<25}", end="")
-    print()
-    
-    # Execution Time (actual wall clock time)
-    print(f"{'Execution Time':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        print(f"{format_time(row['execution_time_s']):<25}", end="")
-    print()
-    
-    # Total Steps
-    print(f"{'Total Steps':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        print(f"{int(row['total_steps']):<25}", end="")
-    print()
-    
-    # TABLE 2: Token Metrics
-    print(f"\n{'='*80}")
-    print("AI Token Costs")
-    print(f"{'='*80}")
-    print(f"{'Metric':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        server_name = row['server_type'].upper()
-        if server_name == 'CDATA':
-            server_name = 'CData Monday'
-        elif server_name == 'STATIC':
-            server_name = 'Local Native (Static)'
-        elif server_name == 'DYNAMIC':
-            server_name = 'Local Native (Dynamic)'
-        elif server_name == 'FULL':
-            server_name = 'Local Native (Full)'
-        print(f"{server_name:<25}", end="")
-    print()
-    print("-" * 80)
-    
-    # Total Tokens
-    print(f"{'Total Token Count':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        print(f"{int(row['total_tokens']):,} tokens{'':<10}", end="")
-    print()
-    
-    # Token Efficiency with ratings (based on ranking)
-    print(f"{'Token Consumption':<30} ", end="")
-    for _, row in df_exec.iterrows():
-        rating = get_efficiency_rating(row['total_tokens'], all_tokens)
-        print(f"{rating:<25}", end="")
-    print()
-    
-    print(f"\n{'='*80}\n")
-    
-    conn.close()
+
+    prompt_texts = df_exec.groupby('prompt_id')['raw_user_prompt'].first()
+    tables = build_prompt_tables(df_exec)
+    # Winners over the repeated trials; single runs vary too much to name one
+    df_trials = load_trials(prompt_texts.index)
+    if not df_trials.empty:
+        trial_table = build_trial_table(df_trials)
+        # Prompts without a completed run get an empty section
+        rows = trial_table.index.get_level_values('Metric').unique()
+        tables["Repeated Trials"] = trial_table.reindex(
+            pd.MultiIndex.from_product([prompt_texts.index, rows], names=['prompt_id', 'Metric']))
+    render_prompt_tables(tables, prompt_texts, fmt, output)
+
+def print_timeline(prompt_id, server_type=None, fmt='console', output=None):
+    """
+    Waterfall of the latest run of a prompt on each server, with the wall time attributed
+
+    Args:
+        prompt_id: Prompt to show
+        server_type: Only this server (default: every server)
+        fmt: 'console', 'csv' or 'markdown'
+        output: Optional output file path
+    """
+    runs, steps = load_timeline(prompt_id, server_type)
+    if runs.empty:
+        print(f"\n❌ No data found for prompt_id: {prompt_id}")
+        return
+
+    sections, frames = [], []
+    for run in runs.to_dict('records'):
+        if not run['phases']:
+            print(f"⚠️  Run {run['run_id']} ({run['server_type']}) has no timeline "
+                  "(recorded before the framework stored phase offsets)", file=sys.stderr)
+            continue
+        waterfall = build_waterfall(json.loads(run['phases']), steps[steps['execution_id'] == run['execution_id']])
+        attribution, concurrency = attribute_wall_time(waterfall, run['execution_time_s'])
+        if fmt == 'console':
+            sections.append(_console_timeline(run, waterfall, attribution, concurrency))
+        elif fmt == 'markdown':
+            sections.append(f"## Prompt {prompt_id} on {server_label(run['server_type'])} (run {run['run_id']})\n\n"
+                            f"{waterfall.to_markdown(index=False, floatfmt='.3f')}\n\n"
+                            f"### Wall time attribution\n\n{attribution.to_markdown(index=False, floatfmt='.3f')}\n")
+        else:
+            frames.append(pd.concat([
+                waterfall.assign(section='waterfall'),
+                attribution.rename(columns={'activity': 'event', 'seconds': 'duration_s'}).assign(section='attribution'),
+            ]).assign(server_type=run['server_type'], run_id=run['run_id']))
+
+    if fmt == 'csv':
+        if not frames:
+            return
+        table = pd.concat(frames)[['server_type', 'run_id', 'section', 'kind', 'event', 'start_s', 'end_s',
+                                   'duration_s', 'share']]
+        if output:
+            table.to_csv(output, index=False)
+            print(f"✓ Timeline saved to: {output}")
+        else:
+            table.to_csv(sys.stdout, index=False)
+    elif sections:
+        _write("\n".join(sections), output)
 
 def list_available_prompts():
     """List all available prompt IDs"""
-    conn = sqlite3.connect(db_path)
-    
-    df = pd.read_sql_query("""
-        SELECT DISTINCT 
+    df = read_sql("""
+        SELECT DISTINCT
             prompt_id,
             raw_user_prompt,
             COUNT(DISTINCT server_type) as server_count
-        FROM executions
+        FROM latest_executions
         GROUP BY prompt_id, raw_user_prompt
         ORDER BY prompt_id
-    """, conn)
-    
+    """)
+
     print("\n=== AVAILABLE PROMPTS ===")
-    for _, row in df.iterrows():
-        prompt_preview = row['raw_user_prompt'][:80] + "..." if len(row['raw_user_prompt']) > 80 else row['raw_user_prompt']
-        print(f"Prompt {row['prompt_id']:2d} ({row['server_count']} servers): {prompt_preview}")
-    
-    conn.close()
+    previews = np.where(df['raw_user_prompt'].str.len() > 80,
+                        df['raw_user_prompt'].str[:80] + "...",
+                        df['raw_user_prompt'])
+    for prompt_id, server_count, preview in zip(df['prompt_id'], df['server_count'], previews):
+        print(f"Prompt {prompt_id:2d} ({server_count} servers): {preview}")
+
     return df
 
-if __name__ == "__main__":
+def main():
+    """Main entry point"""
+    global db_path, duckdb_path
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Performance reports for the MCP analysis database',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Interactive mode
+  python analyze_data.py
+
+  # Tables for one prompt / every prompt
+  python analyze_data.py -p 13
+  python analyze_data.py -p all --format markdown -o prompts.md
+
+  # Full report as CSV
+  python analyze_data.py --full --format csv -o full_report.csv
+
+  # Waterfall of prompt 13's latest runs, every second of wall time attributed
+  python analyze_data.py -p 13 --timeline
+  python analyze_data.py -p 13 --timeline --server cdata
+
+  # Read the DuckDB mirror written by import_mcp_data.py --duckdb
+  python analyze_data.py --full --duckdb
+
+  # Another database, e.g. one merged by work_queue.py
+  python analyze_data.py --full --db ../batch.db
+        """
+    )
+    parser.add_argument('-p', '--prompt', help="Prompt number to analyze, or 'all'")
+    parser.add_argument('--full', action='store_true', help='Full report for all use cases')
+    parser.add_argument('--timeline', action='store_true', help="Waterfall and wall time attribution of the prompt's latest runs")
+    parser.add_argument('--server', help='Server type for --timeline (default: every server)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='console', help='Output format (default: console)')
+    parser.add_argument('-o', '--output', help='Output file (default: print to console)')
+    parser.add_argument('--db', default=db_path, help='SQLite database (default: mcp_analysis.db next to this script)')
+    parser.add_argument('--duckdb', nargs='?', const='', metavar='PATH',
+                        help='Query the DuckDB mirror (default path: the database path with a .duckdb extension)')
+    args = parser.parse_args()
+    db_path = args.db
+    if args.duckdb is not None:
+        duckdb_path = args.duckdb or duckdb_backend.default_duckdb_path(db_path)
+
+    if args.full:
+        print_full_report(args.format, args.output)
+        return
+    if args.timeline:
+        if not args.prompt or not args.prompt.isdigit():
+            parser.error("--timeline needs a prompt number (-p N)")
+        print_timeline(int(args.prompt), args.server, args.format, args.output)
+        return
+    if args.prompt:
+        if args.prompt.lower() == 'all':
+            analyze_prompts(None, args.format, args.output)
+        else:
+            analyze_prompt_performance(int(args.prompt), args.format, args.output)
+        return
+
     # List available prompts
     available_prompts = list_available_prompts()
-    
+
     # Get user input
     print("\n" + "="*80)
     print("Options:")
     print("  Enter a prompt number to analyze a specific use case")
+    print("  Enter 'prompts' to analyze every use case")
     print("  Enter 'full' or 'all' to see the full report for all use cases")
     print("="*80)
-    
+
     try:
         user_input = input("Enter your choice: ").strip().lower()
-        
+
         if user_input in ['full', 'all']:
             print_full_report()
+        elif user_input == 'prompts':
+            analyze_prompts()
         else:
             prompt_id = int(user_input)
             analyze_prompt_performance(prompt_id)
     except ValueError:
-        print("❌ Invalid input. Please enter a number or 'full'/'all'.")
+        print("❌ Invalid input. Please enter a number, 'prompts' or 'full'/'all'.")
     except KeyboardInterrupt:
-        print("\n\n👋 Exiting...")
\ No newline at end of file
+        print("\n\n👋 Exiting...")
+
+if __name__ == "__main__":
+    main()
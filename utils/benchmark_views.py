@@ -0,0 +1,239 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from import_mcp_data import MCPDataImporter
+
+SERVER_TYPES = ['cdata', 'static', 'dynamic', 'full']
+
+# Views timed with and without the importer's indexes
+BENCHMARK_VIEWS = [
+    'Full_Report',
+    'performance_comparison_by_prompt',
+    'tool_usage_stats',
+    'prompt_execution_patterns',
+    'tool_usage_by_tool',
+]
+
+# Window-function formulation of the per-prompt server lookups, kept as a reference point:
+# on SQLite it needs one sort per ORDER BY and loses to index-backed correlated lookups
+WINDOW_QUERIES = {
+    "Server lookups (window functions)": """
+        SELECT
+            e.prompt_id,
+            MAX(CASE WHEN e.fastest_rank = 1 THEN e.server_type END) as fastest_server,
+            MAX(CASE WHEN e.slowest_rank = 1 THEN e.server_type END) as slowest_server,
+            MAX(CASE WHEN e.efficient_rank = 1 THEN e.server_type END) as most_efficient_server,
+            MAX(CASE WHEN e.inefficient_rank = 1 THEN e.server_type END) as least_efficient_server
+        FROM (
+            SELECT
+                prompt_id, server_type,
+                ROW_NUMBER() OVER (PARTITION BY prompt_id ORDER BY execution_time_s) as fastest_rank,
+                ROW_NUMBER() OVER (PARTITION BY prompt_id ORDER BY execution_time_s DESC) as slowest_rank,
+                ROW_NUMBER() OVER (PARTITION BY prompt_id ORDER BY CAST(output_tokens AS REAL) / input_tokens)
+                    as efficient_rank,
+                ROW_NUMBER() OVER (PARTITION BY prompt_id ORDER BY CAST(output_tokens AS REAL) / input_tokens DESC)
+                    as inefficient_rank
+            FROM latest_executions
+        ) e
+        GROUP BY e.prompt_id
+        ORDER BY e.prompt_id
+    """,
+}
+
+# Wide aggregations over all runs, written in SQL both SQLite and DuckDB accept
+ANALYTIC_QUERIES = {
+    "Tool latency percentiles": """
+        SELECT
+            tool_name,
+            COUNT(*) as calls,
+            MIN(CASE WHEN position >= 0.50 * calls THEN duration_s END) as p50_s,
+            MIN(CASE WHEN position >= 0.95 * calls THEN duration_s END) as p95_s,
+            MIN(CASE WHEN position >= 0.99 * calls THEN duration_s END) as p99_s
+        FROM (
+            SELECT
+                tool_name, duration_s,
+                ROW_NUMBER() OVER (PARTITION BY tool_name ORDER BY duration_s) as position,
+                COUNT(*) OVER (PARTITION BY tool_name) as calls
+            FROM conversation_steps
+            WHERE step_type = 'mcp_tool_call'
+        ) ranked
+        GROUP BY tool_name
+        ORDER BY tool_name
+    """,
+    "Token distribution by version": """
+        SELECT
+            framework_version,
+            model,
+            server_type,
+            COUNT(*) as runs,
+            ROUND(AVG(total_tokens), 0) as avg_tokens,
+            SUM(CASE WHEN total_tokens < 50000 THEN 1 ELSE 0 END) as under_50k,
+            SUM(CASE WHEN total_tokens >= 50000 AND total_tokens < 150000 THEN 1 ELSE 0 END) as from_50k_to_150k,
+            SUM(CASE WHEN total_tokens >= 150000 THEN 1 ELSE 0 END) as over_150k
+        FROM executions
+        GROUP BY framework_version, model, server_type
+        ORDER BY framework_version, model, server_type
+    """,
+}
+
+
+def build_synthetic_database(db_path, executions=100_000, steps_per_execution=4, seed=42):
+    """
+    Create a database with the importer's schema filled with synthetic runs
+
+    Args:
+        db_path: Path of the database to (re)create
+        executions: Number of execution rows (one latest run per prompt/server pair)
+        steps_per_execution: Conversation steps generated per execution
+        seed: Random seed, so runs are comparable
+    """
+    rng = random.Random(seed)
+    importer = MCPDataImporter(db_path)
+    importer.create_database()
+    conn = importer.conn
+
+    execution_rows = []
+    step_rows = []
+    for execution_id in range(1, executions + 1):
+        prompt_id = (execution_id - 1) // len(SERVER_TYPES) + 1
+        server_type = SERVER_TYPES[(execution_id - 1) % len(SERVER_TYPES)]
+        input_tokens = rng.randint(2_000, 200_000)
+        output_tokens = rng.randint(100, 8_000)
+        llm_time = rng.uniform(2, 120)
+        mcp_time = rng.uniform(0.5, 60)
+        execution_rows.append((
+            execution_id, str(execution_id), 1, prompt_id, server_type, f"Synthetic prompt {prompt_id}",
+            round(llm_time + mcp_time + rng.uniform(0, 5), 3),
+            input_tokens + output_tokens, input_tokens, output_tokens,
+            round(llm_time, 3), round(mcp_time, 3), steps_per_execution,
+        ))
+        for step_number in range(1, steps_per_execution + 1):
+            is_tool = step_number % 2 == 0
+            step_rows.append((
+                execution_id, step_number,
+                'mcp_tool_call' if is_tool else 'llm_response',
+                round(rng.uniform(0.05, 10), 3),
+                f"tool_{rng.randint(1, 12)}" if is_tool else None,
+            ))
+
+    conn.executemany("""
+        INSERT INTO executions (
+            execution_id, run_id, is_latest, prompt_id, server_type, raw_user_prompt, execution_time_s,
+            total_tokens, input_tokens, output_tokens, llm_time_s, mcp_time_s, total_steps
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, execution_rows)
+    conn.executemany("""
+        INSERT INTO conversation_steps (execution_id, step_number, step_type, duration_s, tool_name)
+        VALUES (?, ?, ?, ?, ?)
+    """, step_rows)
+    conn.commit()
+    importer.close()
+
+
+def time_query(conn, query, repeat):
+    """Best-of-N wall time for fully fetching a query (SQLite or DuckDB connection)"""
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(conn.execute(query).fetchall())
+        best = min(best, time.perf_counter() - started)
+    return best, rows
+
+
+def time_all(conn, repeat):
+    queries = {name: f"SELECT * FROM {name}" for name in BENCHMARK_VIEWS}
+    queries.update(WINDOW_QUERIES)
+    queries.update(ANALYTIC_QUERIES)
+    return {name: time_query(conn, query, repeat) for name, query in queries.items()}
+
+
+# Kept in the baseline: prompt_id lookups, as the old UNIQUE(prompt_id, server_type) index provided
+BASELINE_INDEXES = {'idx_executions_history'}
+
+
+def drop_indexes(conn):
+    """Drop the covering indexes, leaving the baseline lookup index and the UNIQUE(run_id) autoindex"""
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")]
+    for name in names:
+        if name not in BASELINE_INDEXES:
+            conn.execute(f"DROP INDEX {name}")
+    conn.execute("ANALYZE")
+
+
+def run_benchmark(executions=100_000, steps_per_execution=4, repeat=3, db_path=None, duckdb=False):
+    """
+    Time the report views on a synthetic database, without and with the importer's indexes
+
+    With duckdb=True the same queries also run on a DuckDB mirror of the database.
+    """
+    if db_path is None:
+        db_path = os.path.join(tempfile.gettempdir(), "mcp_analysis_benchmark.db")
+
+    print(f"Building synthetic database: {executions:,} executions, "
+          f"{executions * steps_per_execution:,} steps -> {db_path}")
+    started = time.perf_counter()
+    build_synthetic_database(db_path, executions, steps_per_execution)
+    print(f"✓ Built in {time.perf_counter() - started:.2f}s\n")
+
+    importer = MCPDataImporter(db_path)
+    importer.conn = sqlite3.connect(db_path)
+    conn = importer.conn
+
+    drop_indexes(conn)
+    before = time_all(conn, repeat)
+
+    started = time.perf_counter()
+    importer.create_indexes()
+    conn.execute("ANALYZE")
+    index_build = time.perf_counter() - started
+    after = time_all(conn, repeat)
+    importer.close()
+
+    columnar = {}
+    if duckdb:
+        import duckdb_backend
+        duckdb_path = duckdb_backend.default_duckdb_path(db_path)
+        duckdb_backend.build_duckdb(db_path, duckdb_path)
+        duck = duckdb_backend.connect(duckdb_path)
+        columnar = time_all(duck, repeat)
+        duck.close()
+        print()
+
+    header = f"{'Query':<36}{'Rows':>9}{'No indexes':>13}{'Indexed':>11}{'Speedup':>10}"
+    print(header + (f"{'DuckDB':>11}{'vs indexed':>12}" if columnar else ""))
+    print("-" * (len(header) + (23 if columnar else 0)))
+    for name, (plain, rows) in before.items():
+        indexed = after[name][0]
+        speedup = plain / indexed if indexed else float('inf')
+        line = f"{name:<36}{rows:>9,}{plain:>12.3f}s{indexed:>10.3f}s{speedup:>9.1f}x"
+        if columnar:
+            duck_time = columnar[name][0]
+            line += f"{duck_time:>10.3f}s{indexed / duck_time if duck_time else float('inf'):>11.1f}x"
+        print(line)
+    print(f"\nIndex build: {index_build:.3f}s. Times are best of {repeat} runs. "
+          "'No indexes' keeps only the (prompt_id, server_type, execution_timestamp) lookup index.")
+    return before, after, columnar
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the report views on a synthetic database')
+    parser.add_argument('-n', '--executions', type=int, default=100_000, help='Execution rows to generate (default: 100000)')
+    parser.add_argument('--steps', type=int, default=4, help='Steps per execution (default: 4)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per query, best is reported (default: 3)')
+    parser.add_argument('--db', help='Where to build the synthetic database (default: temp dir)')
+    parser.add_argument('--duckdb', action='store_true', help='Also time the queries on a DuckDB mirror (needs duckdb)')
+    args = parser.parse_args()
+
+    try:
+        run_benchmark(args.executions, args.steps, args.repeat, args.db, args.duckdb)
+    except KeyboardInterrupt:
+        print("\n👋 Exiting...")
+        sys.exit(1)
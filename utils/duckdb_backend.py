@@ -0,0 +1,170 @@
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from import_mcp_data import payload_preview, payload_text
+
+# Tables copied from the SQLite database; the bookkeeping tables (import manifest,
+# materialized reports) stay in SQLite, DuckDB computes the report views directly
+MIRRORED_TABLES = ('executions', 'conversation_steps', 'payloads')
+
+# SQLite declared type -> DuckDB type
+COLUMN_TYPES = {
+    'INTEGER': 'BIGINT',
+    'REAL': 'DOUBLE',
+    'TEXT': 'VARCHAR',
+    'BLOB': 'BLOB',
+}
+
+# Rows read from SQLite per chunk while copying
+COPY_CHUNK_ROWS = 50_000
+
+
+def import_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise RuntimeError("The DuckDB backend requires duckdb (pip install duckdb)")
+    return duckdb
+
+
+def register_payload_functions(duck):
+    """The payload_text() / payload_preview() SQL functions of the SQLite views, as DuckDB Python UDFs"""
+    duck.create_function('payload_text', payload_text, ['VARCHAR', 'BLOB'], 'VARCHAR')
+    duck.create_function('payload_preview', payload_preview, ['VARCHAR', 'BLOB', 'BIGINT'], 'VARCHAR')
+
+
+def default_duckdb_path(sqlite_path):
+    return os.path.splitext(sqlite_path)[0] + ".duckdb"
+
+
+def connect(duckdb_path, read_only=True):
+    """
+    Open the DuckDB mirror
+
+    The views keep SQLite semantics for '/', which is integer division
+    between integers (used by the median ranks).
+    """
+    duckdb = import_duckdb()
+    if not os.path.exists(duckdb_path):
+        raise FileNotFoundError(f"DuckDB database not found: {duckdb_path} (import with --duckdb first)")
+    conn = duckdb.connect(duckdb_path, read_only=read_only)
+    conn.execute("SET integer_division = true")
+    register_payload_functions(conn)
+    return conn
+
+
+# SQLite view SQL -> DuckDB
+VIEW_REWRITES = [
+    # REAL is a 4-byte float in DuckDB, 8-byte in SQLite
+    (r"\bAS REAL\b", "AS DOUBLE"),
+    # SQLite concatenates steps in the order of the ordered subquery; DuckDB does not keep it, so spell it out
+    (r"END,\s*' → '\s*\)", "END, ' → ' ORDER BY s.step_number)"),
+]
+
+
+def translate_view(sql):
+    for pattern, replacement in VIEW_REWRITES:
+        sql = re.sub(pattern, replacement, sql, flags=re.IGNORECASE)
+    return sql
+
+
+def _create_table(sqlite_conn, duck, table):
+    columns = []
+    for _, name, declared, _, _, _ in sqlite_conn.execute(f"PRAGMA table_info({table})"):
+        columns.append(f"{name} {COLUMN_TYPES.get(declared.upper(), 'VARCHAR')}")
+    duck.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+
+
+def _copy_table(sqlite_conn, duck, table, chunk_rows):
+    import pandas as pd
+
+    rows = 0
+    for chunk in pd.read_sql_query(f"SELECT * FROM {table}", sqlite_conn, chunksize=chunk_rows):
+        duck.register('chunk', chunk)
+        duck.execute(f"INSERT INTO {table} SELECT * FROM chunk")
+        duck.unregister('chunk')
+        rows += len(chunk)
+    return rows
+
+
+def build_duckdb(sqlite_path, duckdb_path=None, parquet_dir=None, chunk_rows=COPY_CHUNK_ROWS):
+    """
+    Rebuild the DuckDB mirror of an imported SQLite database
+
+    Copies executions and conversation_steps and recreates every SQLite view
+    on top of them, so the same queries run on either backend. The mirror is
+    built next to the target and swapped in at the end, so readers never see
+    a half-written file.
+
+    Args:
+        sqlite_path: Database written by import_mcp_data.py
+        duckdb_path: Target file (default: the SQLite path with a .duckdb extension)
+        parquet_dir: Also write each mirrored table to <dir>/<table>.parquet
+        chunk_rows: Rows copied per chunk
+
+    Returns:
+        Dict with rows per table, views created, views skipped and seconds
+    """
+    duckdb = import_duckdb()
+    duckdb_path = duckdb_path or default_duckdb_path(sqlite_path)
+    building = duckdb_path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+
+    started = time.perf_counter()
+    sqlite_conn = sqlite3.connect(sqlite_path)
+    duck = duckdb.connect(building)
+    duck.execute("SET integer_division = true")
+    register_payload_functions(duck)
+
+    rows = {}
+    for table in MIRRORED_TABLES:
+        _create_table(sqlite_conn, duck, table)
+        rows[table] = _copy_table(sqlite_conn, duck, table, chunk_rows)
+
+    # Views in creation order, so views built on other views find them
+    views, skipped = [], {}
+    for name, sql in sqlite_conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view' ORDER BY rowid"):
+        try:
+            duck.execute(translate_view(sql))
+            views.append(name)
+        except duckdb.Error as e:
+            skipped[name] = str(e).splitlines()[0]
+
+    if parquet_dir:
+        os.makedirs(parquet_dir, exist_ok=True)
+        for table in MIRRORED_TABLES:
+            target = os.path.join(parquet_dir, f"{table}.parquet").replace("'", "''")
+            duck.execute(f"COPY {table} TO '{target}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+
+    duck.close()
+    sqlite_conn.close()
+    os.replace(building, duckdb_path)
+
+    seconds = time.perf_counter() - started
+    print(f"✓ DuckDB mirror written: {duckdb_path} "
+          f"({', '.join(f'{count:,} {table}' for table, count in rows.items())}, {len(views)} views) in {seconds:.2f}s")
+    for name, error in skipped.items():
+        print(f"  ❌ View {name} not created: {error}")
+    if parquet_dir:
+        print(f"✓ Parquet files written to: {parquet_dir}")
+    return {'rows': rows, 'views': views, 'skipped': skipped, 'seconds': round(seconds, 3)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mirror the SQLite analysis database into DuckDB (and Parquet)')
+    parser.add_argument('--db', default='mcp_analysis.db', help='SQLite database (default: mcp_analysis.db)')
+    parser.add_argument('--out', help='DuckDB file (default: the database path with a .duckdb extension)')
+    parser.add_argument('--parquet', metavar='DIR', help='Also write executions and conversation_steps as Parquet files')
+    args = parser.parse_args()
+
+    try:
+        build_duckdb(args.db, args.out, args.parquet)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
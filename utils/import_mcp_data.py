@@ -1,22 +1,665 @@
+import hashlib
+import io
 import json
+import multiprocessing
+import os
 import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from queue import Empty
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # payloads are compressed with zlib instead
+    zstandard = None
+
+# Server name in the execution JSON -> server_type column (unlisted servers keep their name)
+SERVER_MAPPING = {
+    'cdata_monday': 'cdata',
+    'native_monday_static': 'static',
+    'native_monday_dynamic': 'dynamic',
+    'native_monday_full': 'full',
+    'cdata_monday_mcp_custom': 'cdata_custom',
+    'cdata_jira_mcp': 'jira',
+    'cdata_bc365_mcp': 'bc365',
+    'cdata_bc365_mcp_custom': 'bc365_custom',
+}
+
+# Column order shared by the per-file and bulk import paths
+EXECUTION_COLUMNS = (
+    'prompt_id', 'server_type', 'server_description', 'execution_timestamp',
+    'session_mode', 'raw_user_prompt', 'final_answer', 'execution_time_s',
+    'total_tokens', 'input_tokens', 'output_tokens', 'llm_time_s', 'llm_queue_time_s', 'mcp_time_s',
+    'total_steps', 'tool_calls', 'termination_reason', 'budget_limit', 'langfuse_trace_url',
+    'framework_version', 'model', 'server_name', 'phases', 'run_id', 'fingerprint'
+)
+STEP_COLUMNS = (
+    'execution_id', 'step_number', 'step_type', 'duration_s', 'start_offset_s', 'end_offset_s', 'queue_wait_s',
+    'input_tokens', 'output_tokens', 'total_tokens',
+    'context_tokens_before', 'context_tokens_after', 'compacted_messages',
+    'tool_name', 'tool_input_hash', 'tool_output_hash', 'output_text_hash',
+    'attempts', 'retries', 'hedged', 'timed_out'
+)
+# Step columns holding a payloads.hash; step_rows() puts the text there, the writer swaps in the hash
+PAYLOAD_COLUMNS = ('tool_input_hash', 'tool_output_hash', 'output_text_hash')
+
+# Bumped whenever the tables or views change; an incremental import into an older database rebuilds it
+SCHEMA_VERSION = 10
+
+# Indexes used by the views; dropped during bulk imports and rebuilt at the end
+INDEXES = {
+    # Fastest / most efficient server lookups in performance_comparison_by_prompt:
+    # "WHERE prompt_id = ? ORDER BY <metric> LIMIT 1" becomes a single covering index seek
+    # Partial on is_latest, which is what latest_executions (and every report view on it) filters by
+    'idx_executions_prompt_time': "executions(prompt_id, execution_time_s, server_type) WHERE is_latest = 1",
+    'idx_executions_prompt_efficiency': "executions(prompt_id, (CAST(output_tokens AS REAL) / input_tokens), server_type) WHERE is_latest = 1",
+    # Run history of one prompt on one server, newest last
+    'idx_executions_history': "executions(prompt_id, server_type, execution_timestamp)",
+    # Execution -> steps joins and per-type step aggregates (every step view joins on execution_id).
+    # step_number second so joins read steps already in step order, without a sort
+    # No index on step_type alone: about half the steps are tool calls, so a full scan beats it
+    'idx_steps_execution': "conversation_steps(execution_id, step_number, step_type, duration_s)",
+    # Payload -> steps lookups (search hits, pruning); partial, each column is empty for one step type
+    'idx_steps_tool_input_hash': "conversation_steps(tool_input_hash) WHERE tool_input_hash IS NOT NULL",
+    'idx_steps_tool_output_hash': "conversation_steps(tool_output_hash) WHERE tool_output_hash IS NOT NULL",
+    'idx_steps_output_text_hash': "conversation_steps(output_text_hash) WHERE output_text_hash IS NOT NULL",
+}
+
+# Report views kept materialized in a table, refreshed by the importer:
+# view -> (table, {view key column: executions column it is grouped by})
+MATERIALIZED_REPORTS = {
+    'Full_Report': ('mv_full_report', {'Number': 'prompt_id'}),
+    'tool_usage_by_server': ('mv_tool_usage_by_server', {'server_type': 'server_type'}),
+    'prompt_execution_patterns': ('mv_prompt_execution_patterns', {'prompt_id': 'prompt_id', 'server_type': 'server_type'}),
+}
+
+# Queries of the materialized report views; {where} is empty in the view and filters
+# latest_executions e down to the touched rows on incremental refreshes
+REPORT_QUERIES = {
+    # Aggregated tool usage by server type (one row per server)
+    'tool_usage_by_server': """
+        SELECT 
+            e.server_type,
+            COUNT(DISTINCT e.prompt_id) as prompt_count,
+            COUNT(CASE WHEN c.step_type = 'mcp_tool_call' THEN 1 END) as total_tool_calls,
+            ROUND(AVG(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as avg_tool_duration,
+            ROUND(MIN(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as min_tool_duration,
+            ROUND(MAX(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as max_tool_duration,
+            COUNT(CASE WHEN c.step_type = 'llm_response' THEN 1 END) as total_llm_responses,
+            ROUND(AVG(CASE WHEN c.step_type = 'llm_response' THEN c.duration_s END), 3) as avg_llm_duration,
+            ROUND(AVG(e.execution_time_s), 3) as avg_execution_time,
+            ROUND(AVG(e.total_tokens), 0) as avg_total_tokens
+        FROM latest_executions e
+        LEFT JOIN conversation_steps c ON e.execution_id = c.execution_id
+        {where}
+        GROUP BY e.server_type
+        ORDER BY e.server_type
+    """,
+    'prompt_execution_patterns': """
+        SELECT 
+            s.prompt_id,
+            s.raw_user_prompt,
+            s.server_type,
+            s.total_steps,
+            COUNT(CASE WHEN s.step_type = 'mcp_tool_call' THEN 1 END) as tool_calls,
+            COUNT(CASE WHEN s.step_type = 'llm_response' THEN 1 END) as llm_responses,
+            GROUP_CONCAT(
+                CASE 
+                    WHEN s.step_type = 'mcp_tool_call' THEN s.tool_name 
+                    ELSE 'LLM'
+                END, ' → '
+            ) as execution_sequence,
+            ROUND(SUM(CASE WHEN s.step_type = 'mcp_tool_call' THEN s.duration_s END), 3) as total_tool_time,
+            ROUND(SUM(CASE WHEN s.step_type = 'llm_response' THEN s.duration_s END), 3) as total_llm_time
+        FROM (
+            -- GROUP_CONCAT joins the rows in the order they come: each execution's steps in step order
+            SELECT e.execution_id, e.prompt_id, e.raw_user_prompt, e.server_type, e.total_steps,
+                   c.step_number, c.step_type, c.tool_name, c.duration_s
+            FROM latest_executions e
+            LEFT JOIN conversation_steps c ON e.execution_id = c.execution_id
+            {where}
+            ORDER BY e.execution_id, c.step_number
+        ) s
+        GROUP BY s.execution_id, s.prompt_id, s.raw_user_prompt, s.server_type, s.total_steps
+        ORDER BY s.prompt_id, s.server_type
+    """,
+    'Full_Report': """
+        SELECT 
+            e.prompt_id as Number,
+            MAX(e.raw_user_prompt) as Prompt,
+            -- No winners: one run per server can't name one; analyze_data.py adds them from the trials
+            -- total_steps
+            MAX(CASE WHEN e.server_type = 'cdata' THEN e.total_steps END) as CData_Steps,
+            MAX(CASE WHEN e.server_type = 'static' THEN e.total_steps END) as Monday_Steps,
+            MAX(CASE WHEN e.server_type = 'dynamic' THEN e.total_steps END) as Graph_Steps,
+            MAX(CASE WHEN e.server_type = 'full' THEN e.total_steps END) as Full_Steps,
+            -- total_tokens
+            MAX(CASE WHEN e.server_type = 'cdata' THEN e.total_tokens END) as CData_Total_Tokens,
+            MAX(CASE WHEN e.server_type = 'static' THEN e.total_tokens END) as Monday_Total_Tokens,
+            MAX(CASE WHEN e.server_type = 'dynamic' THEN e.total_tokens END) as Graph_Total_Tokens,
+            MAX(CASE WHEN e.server_type = 'full' THEN e.total_tokens END) as Full_Total_Tokens,
+            -- execution_time_s
+            MAX(CASE WHEN e.server_type = 'cdata' THEN e.execution_time_s END) as CData_Whole_Chat_Time,
+            MAX(CASE WHEN e.server_type = 'static' THEN e.execution_time_s END) as Monday_Whole_Chat_Time,
+            MAX(CASE WHEN e.server_type = 'dynamic' THEN e.execution_time_s END) as Graph_Whole_Chat_Time,
+            MAX(CASE WHEN e.server_type = 'full' THEN e.execution_time_s END) as Full_Whole_Chat_Time
+        FROM latest_executions e
+        {where}
+        GROUP BY e.prompt_id
+        ORDER BY e.prompt_id
+    """,
+}
+
+
+def _insert_sql(table: str, columns: Tuple[str, ...], verb: str = "INSERT") -> str:
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def server_type_for(server_name: Optional[str]) -> str:
+    return SERVER_MAPPING.get(server_name or '', server_name or 'unknown')
+
+
+def execution_row(data: Dict) -> tuple:
+    """Values for EXECUTION_COLUMNS (except run_id and fingerprint) from one execution record"""
+    summary = data['summary']
+    return (
+        data.get('prompt_id'),
+        server_type_for(data.get('mcp_server')),
+        data.get('server_description'),
+        data.get('execution_timestamp'),
+        data.get('session_mode'),
+        data.get('raw_user_prompt'),
+        data.get('final_answer'),
+        data.get('execution_time_s'),
+        summary.get('total_tokens'),
+        summary.get('input_tokens'),
+        summary.get('output_tokens'),
+        summary.get('llm_time_s'),
+        summary.get('llm_queue_time_s', 0.0),
+        summary.get('mcp_time_s'),
+        summary.get('total_steps'),
+        summary.get('tool_calls'),
+        data.get('termination_reason', 'completed'),
+        data.get('budget_limit'),
+        data.get('langfuse_trace_url'),
+        data.get('framework_version'),
+        data.get('model'),
+        data.get('mcp_server'),
+        json.dumps(data['phases']) if data.get('phases') else None
+    )
+
+
+def step_rows(execution_id: int, data: Dict) -> List[tuple]:
+    """Values for STEP_COLUMNS, one tuple per conversation_flow step (payload texts not yet hashed)"""
+    return [
+        (
+            execution_id,
+            idx,
+            step.get('type'),
+            step.get('duration_s'),
+            step.get('start_offset_s'),
+            step.get('end_offset_s'),
+            step.get('queue_wait_s'),
+            step.get('input_tokens'),
+            step.get('output_tokens'),
+            step.get('total_tokens'),
+            step.get('context_tokens_before'),
+            step.get('context_tokens_after'),
+            step.get('compacted_messages'),
+            step.get('tool'),
+            step.get('input'),
+            step.get('output'),
+            step.get('output_text'),
+            step.get('attempts'),
+            step.get('retries'),
+            step.get('hedged'),
+            step.get('timed_out')
+        )
+        for idx, step in enumerate(data.get('conversation_flow', []), 1)
+    ]
+
+
+def record_rows(data: Dict, record_fingerprint: Optional[str] = None) -> Tuple[tuple, List[tuple]]:
+    """
+    Execution and step rows of one record; execution_id is filled in by the writer
+
+    Records written before the agent stored a run_id are identified by their fingerprint.
+    """
+    if record_fingerprint is None:
+        record_fingerprint = fingerprint(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    run_id = data.get('run_id') or record_fingerprint
+    return execution_row(data) + (run_id, record_fingerprint), step_rows(None, data)
+
+
+def fingerprint(raw: bytes) -> str:
+    """Content hash identifying one execution record (or one file)"""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def _iter_json_array(f, chunk_size: int, offset: int = 0) -> Iterator[Tuple[Dict, bytes, int]]:
+    """
+    Yield the elements of a top-level JSON array, holding one element in memory at a time
+
+    Each element comes with its raw UTF-8 text and the byte offset just past
+    it. With offset > 0, f must already be positioned at that offset (the end
+    of a previously read element) and parsing continues from there.
+    """
+    buffer = ''
+    pos = 0
+    # Separators and whitespace are ASCII, so only element text needs encoding to track bytes
+    byte_pos = offset
+    started = offset > 0
+    read_size = chunk_size
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+            byte_pos += 1
+        if pos < len(buffer):
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    # A single execution object rather than an array
+                    text = buffer[pos:] + f.read()
+                    raw = text.encode('utf-8')
+                    yield json.loads(text), raw, byte_pos + len(raw)
+                    return
+                started = True
+                pos += 1
+                byte_pos += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                pos += 1
+                byte_pos += 1
+                continue
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely the element continues in the next chunk
+                if eof:
+                    raise
+            else:
+                raw = buffer[pos:end].encode('utf-8')
+                byte_pos += len(raw)
+                pos = end
+                read_size = chunk_size
+                yield value, raw, byte_pos
+                continue
+        elif eof:
+            raise json.JSONDecodeError("Unterminated array" if started else "Expecting value", buffer, pos)
+        
+        chunk = f.read(read_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        # Grow reads while one element spans several chunks, so re-parsing stays linear
+        read_size *= 2
+
+
+def iter_record_entries(json_file_path: str, offset: int = 0,
+                        chunk_size: int = 1 << 20) -> Iterator[Tuple[Dict, str, int]]:
+    """
+    Stream (record, fingerprint, end_offset) from one JSON file (an array or a single object)
+
+    Offsets are byte positions in the file as written, CRLF line ends included.
+    A file that is not valid UTF-8 is decoded with replacement characters,
+    which shifts offsets; its records then come with end_offset 0, so the
+    next incremental import reads it whole again.
+
+    Args:
+        json_file_path: File to read
+        offset: Byte offset just past an already imported record, to read only what follows it
+        chunk_size: Characters read at a time
+    """
+    yielded = 0
+    for errors in ('strict', 'replace'):
+        try:
+            # Use UTF-8 encoding to handle Unicode characters (emojis, special chars)
+            with open(json_file_path, 'rb') as raw_file:
+                raw_file.seek(offset)
+                # newline='' keeps CRLF line ends, so the text maps back to byte offsets
+                f = io.TextIOWrapper(raw_file, encoding='utf-8', errors=errors, newline='')
+                for index, (record, raw, end_offset) in enumerate(_iter_json_array(f, chunk_size, offset)):
+                    # After a restart, skip the records already yielded
+                    if index >= yielded:
+                        yielded += 1
+                        # JSON strings escape line breaks, so CRLF only occurs between tokens: a
+                        # record has the same fingerprint whichever line ends its file uses
+                        yield (record, fingerprint(raw.replace(b'\r\n', b'\n')),
+                               end_offset if errors == 'strict' else 0)
+            return
+        except UnicodeDecodeError as e:
+            if errors == 'replace':
+                raise
+            print(f"✗ Encoding error in {json_file_path}: {e}")
+            print("  Trying with error handling...")
+
+
+def iter_records(json_file_path: str, chunk_size: int = 1 << 20) -> Iterator[Dict]:
+    """Stream the execution records of one JSON file (an array or a single object)"""
+    for record, _, _ in iter_record_entries(json_file_path, chunk_size=chunk_size):
+        yield record
+
+
+def hash_file(path: str, prefix_bytes: int = 0, chunk_size: int = 1 << 20) -> Tuple[str, str]:
+    """Return (hash of the whole file, hash of its first prefix_bytes bytes)"""
+    whole = hashlib.blake2b(digest_size=16)
+    prefix = hashlib.blake2b(digest_size=16)
+    remaining = prefix_bytes
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            whole.update(chunk)
+            if remaining > 0:
+                prefix.update(chunk[:remaining])
+                remaining -= len(chunk)
+    return whole.hexdigest(), prefix.hexdigest()
+
+
+# ====================== PAYLOADS ======================
+# Payloads smaller than this are stored uncompressed (compression would not pay off)
+MIN_COMPRESSED_BYTES = 64
+
+_PAYLOAD_INDEXES = tuple(STEP_COLUMNS.index(column) for column in PAYLOAD_COLUMNS)
+
+
+def compress_payload(raw: bytes) -> Tuple[str, bytes]:
+    """(codec, data): zstd when zstandard is installed, else zlib; 'raw' when that does not shrink it"""
+    if len(raw) >= MIN_COMPRESSED_BYTES:
+        if zstandard is not None:
+            codec, data = 'zstd', zstandard.ZstdCompressor(level=9).compress(raw)
+        else:
+            codec, data = 'zlib', zlib.compress(raw, 9)
+        if len(data) < len(raw):
+            return codec, data
+    return 'raw', raw
+
+
+def _decompress(codec: str, data: bytes, max_bytes: int = -1) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd payloads require zstandard (pip install zstandard)")
+        if max_bytes < 0:
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zstandard.ZstdDecompressor().stream_reader(data).read(max_bytes)
+    if codec == 'zlib':
+        return zlib.decompressobj().decompress(data, max(max_bytes, 0))
+    return data if max_bytes < 0 else data[:max_bytes]
+
+
+def payload_text(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    """SQL function payload_text(codec, data): the stored text"""
+    if data is None:
+        return None
+    return _decompress(codec, data).decode('utf-8', 'surrogatepass')
+
+
+def payload_preview(codec: Optional[str], data: Optional[bytes], chars: int) -> Optional[str]:
+    """SQL function payload_preview(codec, data, chars): the first chars characters, decompressing only those"""
+    if data is None:
+        return None
+    # At most 4 bytes per character in UTF-8; a character cut at the end is dropped
+    return _decompress(codec, data, chars * 4).decode('utf-8', 'ignore')[:chars]
+
+
+def register_payload_functions(conn: sqlite3.Connection):
+    """Make payload_text() and payload_preview(), used by the step views, available on a connection"""
+    conn.create_function('payload_text', 2, payload_text, deterministic=True)
+    conn.create_function('payload_preview', 3, payload_preview, deterministic=True)
+
+
+class PayloadStore:
+    """
+    Writes step payloads (tool inputs and outputs, LLM texts) to the payloads table
+
+    Each distinct text is compressed and stored once under its content hash,
+    and indexed once in payloads_fts; step rows keep only the hash. Counts
+    references and bytes for the deduplication report.
+    """
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.known = {row[0] for row in conn.execute("SELECT hash FROM payloads")}
+        self.next_id = conn.execute("SELECT COALESCE(MAX(payload_id), 0) + 1 FROM payloads").fetchone()[0]
+        self.pending = []
+        self.pending_search = []
+        # Sizes of the distinct payloads referenced by this import, new or not
+        self.distinct = {}
+        self.references = self.referenced_bytes = 0
+        self.new_payloads = self.new_bytes = self.stored_bytes = 0
+
+    def hash_step(self, step: tuple) -> tuple:
+        """The step row with its payload texts replaced by hashes, queueing payloads not stored yet"""
+        step = list(step)
+        for index in _PAYLOAD_INDEXES:
+            text = step[index]
+            if text is None:
+                continue
+            if not isinstance(text, str):
+                text = str(text)
+            raw = text.encode('utf-8', 'surrogatepass')
+            digest = fingerprint(raw)
+            self.references += 1
+            self.referenced_bytes += len(raw)
+            self.distinct[digest] = len(raw)
+            if digest not in self.known:
+                self.known.add(digest)
+                codec, data = compress_payload(raw)
+                self.pending.append((self.next_id, digest, codec, len(raw), data))
+                self.pending_search.append((self.next_id, text))
+                self.next_id += 1
+                self.new_payloads += 1
+                self.new_bytes += len(raw)
+                self.stored_bytes += len(data)
+            step[index] = digest
+        return tuple(step)
+
+    def flush(self):
+        self.conn.executemany("INSERT INTO payloads (payload_id, hash, codec, size, data) VALUES (?, ?, ?, ?, ?)",
+                              self.pending)
+        self.conn.executemany("INSERT INTO payloads_fts (rowid, text) VALUES (?, ?)", self.pending_search)
+        self.pending = []
+        self.pending_search = []
+
+    def prune(self) -> int:
+        """Delete payloads no step refers to any more (after runs were replaced), and their index entries"""
+        orphans = self.conn.execute(f"""
+            SELECT payload_id, hash, text FROM payload_texts
+            WHERE {' AND '.join(f"hash NOT IN (SELECT {column} FROM conversation_steps WHERE {column} IS NOT NULL)"
+                                for column in PAYLOAD_COLUMNS)}
+        """).fetchall()
+        # External-content FTS5 forgets a row only when given the text it indexed
+        self.conn.executemany("INSERT INTO payloads_fts (payloads_fts, rowid, text) VALUES ('delete', ?, ?)",
+                              [(payload_id, text) for payload_id, _, text in orphans])
+        self.conn.executemany("DELETE FROM payloads WHERE payload_id = ?", [(payload_id,) for payload_id, _, _ in orphans])
+        self.known.difference_update(digest for _, digest, _ in orphans)
+        return len(orphans)
+
+    def stats(self) -> Dict:
+        distinct_bytes = sum(self.distinct.values())
+        return {
+            'references': self.references,
+            'distinct': len(self.distinct),
+            'new': self.new_payloads,
+            'dedup_ratio': round(self.referenced_bytes / distinct_bytes, 2) if distinct_bytes else None,
+            'compression_ratio': round(self.new_bytes / self.stored_bytes, 2) if self.stored_bytes else None,
+            'referenced_bytes': self.referenced_bytes,
+            'stored_bytes': self.stored_bytes,
+        }
+
+    def report(self):
+        stats = self.stats()
+        if not stats['references']:
+            return
+        line = (f"  Payloads: {stats['references']:,} references to {stats['distinct']:,} distinct texts "
+                f"({stats['new']:,} new), dedup ratio {stats['dedup_ratio']:.1f}x")
+        if stats['compression_ratio']:
+            line += (f", compression {stats['compression_ratio']:.1f}x "
+                     f"({self.new_bytes / 1e6:.1f} MB -> {self.stored_bytes / 1e6:.1f} MB)")
+        print(line)
+
+
+# ====================== MATERIALIZED REPORTS ======================
+def data_signature(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """
+    (execution count, highest execution_id): changes with every import
+
+    Replaced runs are deleted and inserted again with a new, higher id.
+    """
+    return conn.execute("SELECT COUNT(*), COALESCE(MAX(execution_id), 0) FROM executions").fetchone()
+
+
+def fresh_reports(conn: sqlite3.Connection) -> List[str]:
+    """Report views whose materialized table matches the current data"""
+    try:
+        rows = conn.execute("SELECT report, executions, max_execution_id FROM report_freshness").fetchall()
+    except sqlite3.OperationalError:
+        # Database created before materialized reports
+        return []
+    signature = tuple(data_signature(conn))
+    return [report for report, executions, max_id in rows
+            if report in MATERIALIZED_REPORTS and (executions, max_id) == signature]
+
+
+def use_materialized_reports(conn: sqlite3.Connection) -> List[str]:
+    """
+    Point the report views at their materialized tables for this connection
+
+    Creates TEMP views named like the report views; they shadow the views of
+    the main schema, so queries are unchanged. Stale reports keep reading the
+    live view. Returns the names of the reports served from tables.
+    """
+    reports = fresh_reports(conn)
+    for view in reports:
+        table, keys = MATERIALIZED_REPORTS[view]
+        conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {view} AS SELECT * FROM {table} ORDER BY {', '.join(keys)}")
+    return reports
+
+
+# ====================== PARALLEL PARSING ======================
+_worker_queue = None
+
+
+def _init_parse_worker(queue):
+    global _worker_queue
+    _worker_queue = queue
+
+
+def _parse_file_worker(json_file_path: str, offset: int, batch_records: int):
+    """Parse one file in a worker process and send its rows to the writer in batches"""
+    batch = []
+    count = 0
+    end_offset = offset
+    try:
+        for data, record_fingerprint, end_offset in iter_record_entries(json_file_path, offset):
+            batch.append(record_rows(data, record_fingerprint))
+            count += 1
+            if len(batch) >= batch_records:
+                _worker_queue.put(('rows', batch))
+                batch = []
+        if batch:
+            _worker_queue.put(('rows', batch))
+        _worker_queue.put(('done', json_file_path, count, end_offset))
+    except Exception as e:
+        _worker_queue.put(('error', json_file_path, repr(e)))
+
+
+def parallel_rows(files: List[Tuple[str, int]], workers: int, on_file_done: Callable = None,
+                  batch_records: int = 50, queue_size: int = 32) -> Iterator[Tuple[tuple, List[tuple]]]:
+    """
+    Parse files in a process pool and yield their rows in the calling process
+
+    The caller stays the only SQLite writer. The bounded queue caps the rows in
+    flight at about queue_size * batch_records records, so fast parsers wait
+    for the writer instead of filling memory. Records of one file keep their
+    order; files are interleaved in completion order.
+
+    Args:
+        files: (path, byte offset to start at) pairs
+        workers: Number of parser processes
+        on_file_done: Called as on_file_done(path, records, end_offset) once a
+            file's rows have all been yielded
+    """
+    ctx = multiprocessing.get_context()
+    queue = ctx.Queue(maxsize=queue_size)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                               initializer=_init_parse_worker, initargs=(queue,))
+    futures = [pool.submit(_parse_file_worker, path, offset, batch_records) for path, offset in files]
+    try:
+        remaining = len(futures)
+        while remaining:
+            try:
+                message = queue.get(timeout=1)
+            except Empty:
+                # A worker that died hard never reports back
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+                continue
+            if message[0] == 'rows':
+                yield from message[1]
+            elif message[0] == 'done':
+                remaining -= 1
+                print(f"✓ Parsed: {message[1]} ({message[2]} records)")
+                if on_file_done:
+                    on_file_done(*message[1:])
+            else:
+                raise RuntimeError(f"Failed to parse {message[1]}: {message[2]}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        # Unblock workers waiting on a full queue so they can exit
+        while not all(future.done() for future in futures):
+            try:
+                queue.get(timeout=0.1)
+            except Empty:
+                pass
+        pool.shutdown(wait=True)
+
+
+def serial_rows(files: List[Tuple[str, int]], on_file_done: Callable = None) -> Iterator[Tuple[tuple, List[tuple]]]:
+    """Same as parallel_rows, parsing in the calling process"""
+    for path, offset in files:
+        count = 0
+        end_offset = offset
+        for data, record_fingerprint, end_offset in iter_record_entries(path, offset):
+            count += 1
+            yield record_rows(data, record_fingerprint)
+        if on_file_done:
+            on_file_done(path, count, end_offset)
+
 
 class MCPDataImporter:
     def __init__(self, db_path: str = "mcp_analysis.db"):
         self.db_path = db_path
         self.conn = None
+        self.payloads = None
         
     def create_database(self):
         """Create SQLite database with schema"""
         self.conn = sqlite3.connect(self.db_path)
+        register_payload_functions(self.conn)
+        self.payloads = None
         cursor = self.conn.cursor()
         
         # Create tables
         cursor.executescript("""
             DROP TABLE IF EXISTS conversation_steps;
             DROP TABLE IF EXISTS executions;
+            DROP TABLE IF EXISTS import_manifest;
+            DROP TABLE IF EXISTS payloads_fts;
+            DROP TABLE IF EXISTS payloads;
+            DROP TABLE IF EXISTS report_freshness;
+            DROP TABLE IF EXISTS mv_full_report;
+            DROP TABLE IF EXISTS mv_tool_usage_by_server;
+            DROP TABLE IF EXISTS mv_prompt_execution_patterns;
             DROP VIEW IF EXISTS performance_comparison;
             DROP VIEW IF EXISTS tool_usage_stats;
             DROP VIEW IF EXISTS tool_details;
@@ -28,7 +671,14 @@ class MCPDataImporter:
             DROP VIEW IF EXISTS prompt_steps_detailed;
             DROP VIEW IF EXISTS prompt_execution_patterns;
             DROP VIEW IF EXISTS conversation_steps_with_execution;
+            DROP VIEW IF EXISTS conversation_steps_text;
+            DROP VIEW IF EXISTS payload_texts;
             DROP VIEW IF EXISTS Full_Report;
+            DROP VIEW IF EXISTS budget_exceeded_runs;
+            DROP VIEW IF EXISTS latest_executions;
+            DROP VIEW IF EXISTS median_executions;
+            DROP VIEW IF EXISTS performance_by_version;
+            DROP VIEW IF EXISTS execution_timeline;
             
             
             CREATE TABLE executions (
@@ -45,10 +695,23 @@ class MCPDataImporter:
                 input_tokens INTEGER,
                 output_tokens INTEGER,
                 llm_time_s REAL,
+                llm_queue_time_s REAL,
                 mcp_time_s REAL,
                 total_steps INTEGER,
+                tool_calls INTEGER,
+                termination_reason TEXT DEFAULT 'completed',
+                budget_limit TEXT,
                 langfuse_trace_url TEXT,
-                UNIQUE(prompt_id, server_type)
+                framework_version TEXT,
+                model TEXT,
+                server_name TEXT,
+                -- JSON list of the framework phases, {phase, start_offset_s, end_offset_s} (see execution_timeline)
+                phases TEXT,
+                -- One row per run; re-importing a run replaces it
+                run_id TEXT NOT NULL UNIQUE,
+                fingerprint TEXT,
+                -- 1 for the most recent run of each (prompt_id, server_type), see refresh_latest()
+                is_latest INTEGER NOT NULL DEFAULT 0
             );
             
             CREATE TABLE conversation_steps (
@@ -57,16 +720,105 @@ class MCPDataImporter:
                 step_number INTEGER,
                 step_type TEXT,
                 duration_s REAL,
+                -- Seconds from the start of the run (the origin of executions.phases)
+                start_offset_s REAL,
+                end_offset_s REAL,
+                -- Rate limiter wait right before an LLM response started
+                queue_wait_s REAL,
                 input_tokens INTEGER,
                 output_tokens INTEGER,
                 total_tokens INTEGER,
+                -- History sent to the model before / after ContextCompactionMiddleware, and tool results it elided
+                context_tokens_before INTEGER,
+                context_tokens_after INTEGER,
+                compacted_messages INTEGER,
                 tool_name TEXT,
-                tool_input TEXT,
-                tool_output TEXT,
-                output_text TEXT,
+                -- payloads.hash of the tool input / tool output / LLM text (see conversation_steps_text)
+                tool_input_hash TEXT,
+                tool_output_hash TEXT,
+                output_text_hash TEXT,
+                attempts INTEGER,
+                retries INTEGER,
+                hedged INTEGER,
+                timed_out INTEGER,
                 FOREIGN KEY (execution_id) REFERENCES executions(execution_id)
             );
             
+            -- Tool inputs, tool outputs and LLM texts, compressed and stored once per distinct content.
+            -- payload_id is the payloads_fts rowid (an INTEGER PRIMARY KEY survives VACUUM)
+            CREATE TABLE payloads (
+                payload_id INTEGER PRIMARY KEY,
+                hash TEXT NOT NULL UNIQUE,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            
+            -- Full-text index of the payloads, one row per distinct text (searched by query_executor.py).
+            -- External content: snippets read the text back through payload_texts, it is not stored twice
+            CREATE VIRTUAL TABLE payloads_fts USING fts5(text, content='payload_texts', content_rowid='payload_id');
+            
+            -- Files already imported, so incremental imports only read what is new
+            CREATE TABLE import_manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                content_hash TEXT,
+                last_offset INTEGER,
+                prefix_hash TEXT,
+                records INTEGER,
+                imported_at TEXT
+            );
+            
+            -- Data the materialized report tables were last refreshed from (see data_signature)
+            CREATE TABLE report_freshness (
+                report TEXT PRIMARY KEY,
+                executions INTEGER,
+                max_execution_id INTEGER,
+                refreshed_at TEXT
+            );
+        """)
+        
+        self.create_indexes()
+        
+        # Create views
+        cursor.executescript("""
+            -- Most recent run of each prompt on each server; the comparison views below read
+            -- this so that re-runs do not count twice
+            CREATE VIEW latest_executions AS
+            SELECT * FROM executions WHERE is_latest = 1;
+            
+            -- conversation_steps with its payloads as text, decompressed only for the rows read
+            CREATE VIEW conversation_steps_text AS
+            SELECT 
+                c.step_id,
+                c.execution_id,
+                c.step_number,
+                c.step_type,
+                c.duration_s,
+                c.start_offset_s,
+                c.end_offset_s,
+                c.queue_wait_s,
+                c.input_tokens,
+                c.output_tokens,
+                c.total_tokens,
+                c.context_tokens_before,
+                c.context_tokens_after,
+                c.compacted_messages,
+                c.tool_name,
+                (SELECT payload_text(codec, data) FROM payloads WHERE hash = c.tool_input_hash) as tool_input,
+                (SELECT payload_text(codec, data) FROM payloads WHERE hash = c.tool_output_hash) as tool_output,
+                (SELECT payload_text(codec, data) FROM payloads WHERE hash = c.output_text_hash) as output_text,
+                c.attempts,
+                c.retries,
+                c.hedged,
+                c.timed_out
+            FROM conversation_steps c;
+            
+            -- Payloads as text, the content of payloads_fts
+            CREATE VIEW payload_texts AS
+            SELECT payload_id, hash, payload_text(codec, data) as text FROM payloads;
+            
             CREATE VIEW performance_comparison AS
             SELECT 
                 prompt_id,
@@ -86,8 +838,10 @@ class MCPDataImporter:
                     THEN 'Yes' 
                     ELSE 'No' 
                 END as has_parallel_execution,
-                ROUND(mcp_time_s / NULLIF(execution_time_s - llm_time_s, 0), 3) as parallelism_factor
-            FROM executions
+                ROUND(mcp_time_s / NULLIF(execution_time_s - llm_time_s, 0), 3) as parallelism_factor,
+                termination_reason,
+                budget_limit
+            FROM latest_executions
             ORDER BY prompt_id, server_type;
             
             CREATE VIEW tool_usage_stats AS
@@ -98,7 +852,7 @@ class MCPDataImporter:
                 AVG(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END) as avg_tool_duration,
                 COUNT(CASE WHEN c.step_type = 'llm_response' THEN 1 END) as llm_response_count,
                 AVG(CASE WHEN c.step_type = 'llm_response' THEN c.duration_s END) as avg_llm_duration
-            FROM executions e
+            FROM latest_executions e
             LEFT JOIN conversation_steps c ON e.execution_id = c.execution_id
             GROUP BY e.execution_id, e.prompt_id, e.server_type;
             
@@ -112,29 +866,11 @@ class MCPDataImporter:
                 c.tool_input,
                 c.tool_output,
                 e.raw_user_prompt
-            FROM conversation_steps c
-            JOIN executions e ON c.execution_id = e.execution_id
+            FROM conversation_steps_text c
+            JOIN latest_executions e ON c.execution_id = e.execution_id
             WHERE c.step_type = 'mcp_tool_call'
             ORDER BY e.prompt_id, e.server_type, c.step_number;
             
-            -- ✨ NEW: Aggregated tool usage by server type (4 rows total)
-            CREATE VIEW tool_usage_by_server AS
-            SELECT 
-                e.server_type,
-                COUNT(DISTINCT e.prompt_id) as prompt_count,
-                COUNT(CASE WHEN c.step_type = 'mcp_tool_call' THEN 1 END) as total_tool_calls,
-                ROUND(AVG(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as avg_tool_duration,
-                ROUND(MIN(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as min_tool_duration,
-                ROUND(MAX(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as max_tool_duration,
-                COUNT(CASE WHEN c.step_type = 'llm_response' THEN 1 END) as total_llm_responses,
-                ROUND(AVG(CASE WHEN c.step_type = 'llm_response' THEN c.duration_s END), 3) as avg_llm_duration,
-                ROUND(AVG(e.execution_time_s), 3) as avg_execution_time,
-                ROUND(AVG(e.total_tokens), 0) as avg_total_tokens
-            FROM executions e
-            LEFT JOIN conversation_steps c ON e.execution_id = c.execution_id
-            GROUP BY e.server_type
-            ORDER BY e.server_type;
-            
             -- ✨ NEW: Aggregated statistics per tool (one row per tool_name)
             CREATE VIEW tool_usage_by_tool AS
             SELECT 
@@ -146,6 +882,9 @@ class MCPDataImporter:
                 ROUND(MIN(c.duration_s), 3) as min_duration_s,
                 ROUND(MAX(c.duration_s), 3) as max_duration_s,
                 ROUND(SUM(c.duration_s), 3) as total_duration_s,
+                SUM(COALESCE(c.retries, 0)) as total_retries,
+                SUM(COALESCE(c.hedged, 0)) as total_hedges,
+                SUM(COALESCE(c.timed_out, 0)) as total_timeouts,
                 ROUND(AVG(c.total_tokens), 0) as avg_tokens,
                 ROUND(SUM(c.total_tokens), 0) as total_tokens,
                 GROUP_CONCAT(DISTINCT e.server_type) as servers_used,
@@ -154,7 +893,7 @@ class MCPDataImporter:
                 COUNT(CASE WHEN e.server_type = 'dynamic' THEN 1 END) as dynamic_count,
                 COUNT(CASE WHEN e.server_type = 'full' THEN 1 END) as full_count
             FROM conversation_steps c
-            JOIN executions e ON c.execution_id = e.execution_id
+            JOIN latest_executions e ON c.execution_id = e.execution_id
             WHERE c.step_type = 'mcp_tool_call'
             GROUP BY c.tool_name
             ORDER BY usage_count DESC;
@@ -170,6 +909,7 @@ class MCPDataImporter:
                 ROUND(AVG(e.total_tokens), 0) as avg_total_tokens,
                 ROUND(AVG(e.total_steps), 1) as avg_total_steps,
                 ROUND(AVG(e.llm_time_s), 3) as avg_llm_time_s,
+                ROUND(AVG(e.llm_queue_time_s), 3) as avg_llm_queue_time_s,
                 ROUND(AVG(e.mcp_time_s), 3) as avg_mcp_time_sum_s,
                 ROUND(AVG(e.execution_time_s - e.llm_time_s), 3) as avg_real_mcp_time_s,
                 ROUND(AVG((e.execution_time_s - e.llm_time_s) * 100.0 / e.execution_time_s), 2) as avg_real_mcp_time_pct,
@@ -177,8 +917,10 @@ class MCPDataImporter:
                 ROUND(AVG(e.mcp_time_s * 100.0 / e.execution_time_s), 2) as avg_mcp_sum_pct,
                 ROUND(AVG(CAST(e.output_tokens AS REAL) / e.input_tokens), 4) as avg_token_efficiency,
                 ROUND(SUM(CASE WHEN (e.mcp_time_s + e.llm_time_s) > e.execution_time_s THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) as parallel_execution_pct,
-                ROUND(AVG(e.mcp_time_s / NULLIF(e.execution_time_s - e.llm_time_s, 0)), 3) as avg_parallelism_factor
-            FROM executions e
+                ROUND(AVG(e.mcp_time_s / NULLIF(e.execution_time_s - e.llm_time_s, 0)), 3) as avg_parallelism_factor,
+                SUM(CASE WHEN e.termination_reason = 'budget_exceeded' THEN 1 ELSE 0 END) as budget_exceeded_runs,
+                SUM(CASE WHEN e.termination_reason = 'error' THEN 1 ELSE 0 END) as error_runs
+            FROM latest_executions e
             GROUP BY e.server_type
             ORDER BY e.server_type;
             
@@ -186,7 +928,7 @@ class MCPDataImporter:
             CREATE VIEW performance_comparison_by_prompt AS
             SELECT 
                 e.prompt_id,
-                e.raw_user_prompt,
+                MAX(e.raw_user_prompt) as raw_user_prompt,
                 COUNT(DISTINCT e.server_type) as server_count,
                 ROUND(AVG(e.execution_time_s), 3) as avg_execution_time_s,
                 ROUND(MIN(e.execution_time_s), 3) as min_execution_time_s,
@@ -205,12 +947,12 @@ class MCPDataImporter:
                 ROUND(MIN(CAST(e.output_tokens AS REAL) / e.input_tokens), 4) as min_token_efficiency,
                 ROUND(MAX(CAST(e.output_tokens AS REAL) / e.input_tokens), 4) as max_token_efficiency,
                 -- Best/worst performing server for this prompt
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY execution_time_s ASC LIMIT 1) as fastest_server,
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY execution_time_s DESC LIMIT 1) as slowest_server,
+                (SELECT server_type FROM latest_executions WHERE prompt_id = e.prompt_id ORDER BY execution_time_s ASC LIMIT 1) as fastest_server,
+                (SELECT server_type FROM latest_executions WHERE prompt_id = e.prompt_id ORDER BY execution_time_s DESC LIMIT 1) as slowest_server,
                 -- Most/least token efficient server
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY CAST(output_tokens AS REAL) / input_tokens ASC LIMIT 1) as most_efficient_server,
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY CAST(output_tokens AS REAL) / input_tokens DESC LIMIT 1) as least_efficient_server
-            FROM executions e
+                (SELECT server_type FROM latest_executions WHERE prompt_id = e.prompt_id ORDER BY CAST(output_tokens AS REAL) / input_tokens ASC LIMIT 1) as most_efficient_server,
+                (SELECT server_type FROM latest_executions WHERE prompt_id = e.prompt_id ORDER BY CAST(output_tokens AS REAL) / input_tokens DESC LIMIT 1) as least_efficient_server
+            FROM latest_executions e
             GROUP BY e.prompt_id
             ORDER BY e.prompt_id;
 
@@ -219,7 +961,7 @@ class MCPDataImporter:
             SELECT 
                 c.step_number,
                 e.prompt_id,
-                e.raw_user_prompt,
+                MAX(e.raw_user_prompt) as raw_user_prompt,
                 MAX(CASE WHEN e.server_type = 'cdata' THEN c.step_type END) as cdata_step_type,
                 MAX(CASE WHEN e.server_type = 'cdata' THEN c.tool_name END) as cdata_tool,
                 MAX(CASE WHEN e.server_type = 'cdata' THEN c.duration_s END) as cdata_duration,
@@ -233,7 +975,7 @@ class MCPDataImporter:
                 MAX(CASE WHEN e.server_type = 'full' THEN c.tool_name END) as full_tool,
                 MAX(CASE WHEN e.server_type = 'full' THEN c.duration_s END) as full_duration
             FROM conversation_steps c
-            JOIN executions e ON c.execution_id = e.execution_id
+            JOIN latest_executions e ON c.execution_id = e.execution_id
             GROUP BY c.step_number, e.prompt_id
             ORDER BY e.prompt_id, c.step_number;
                              
@@ -246,34 +988,13 @@ class MCPDataImporter:
                 c.tool_name,
                 ROUND(c.duration_s, 3) as duration_s,
                 c.total_tokens,
-                c.tool_input,
-                SUBSTR(c.tool_output, 1, 200) as tool_output_preview,
-                SUBSTR(c.output_text, 1, 200) as output_text_preview
+                (SELECT payload_text(codec, data) FROM payloads WHERE hash = c.tool_input_hash) as tool_input,
+                (SELECT payload_preview(codec, data, 200) FROM payloads WHERE hash = c.tool_output_hash) as tool_output_preview,
+                (SELECT payload_preview(codec, data, 200) FROM payloads WHERE hash = c.output_text_hash) as output_text_preview
             FROM conversation_steps c
-            JOIN executions e ON c.execution_id = e.execution_id
+            JOIN latest_executions e ON c.execution_id = e.execution_id
             ORDER BY e.prompt_id, c.step_number, e.server_type;
                              
-            CREATE VIEW prompt_execution_patterns AS
-            SELECT 
-                e.prompt_id,
-                e.raw_user_prompt,
-                e.server_type,
-                e.total_steps,
-                COUNT(CASE WHEN c.step_type = 'mcp_tool_call' THEN 1 END) as tool_calls,
-                COUNT(CASE WHEN c.step_type = 'llm_response' THEN 1 END) as llm_responses,
-                GROUP_CONCAT(
-                    CASE 
-                        WHEN c.step_type = 'mcp_tool_call' THEN c.tool_name 
-                        ELSE 'LLM'
-                    END, ' → '
-                ) as execution_sequence,
-                ROUND(SUM(CASE WHEN c.step_type = 'mcp_tool_call' THEN c.duration_s END), 3) as total_tool_time,
-                ROUND(SUM(CASE WHEN c.step_type = 'llm_response' THEN c.duration_s END), 3) as total_llm_time
-            FROM executions e
-            LEFT JOIN conversation_steps c ON e.execution_id = c.execution_id
-            GROUP BY e.execution_id, e.prompt_id, e.server_type
-            ORDER BY e.prompt_id, e.server_type;
-                             
             CREATE VIEW conversation_steps_with_execution AS
             SELECT 
                 -- From executions table
@@ -292,142 +1013,187 @@ class MCPDataImporter:
                 c.step_type,
                 c.duration_s,
                 c.total_tokens AS step_total_tokens,
+                c.context_tokens_before,
+                c.context_tokens_after,
+                c.compacted_messages,
                 c.tool_name,
                 c.tool_input,
                 c.tool_output,
                 c.output_text
-            FROM conversation_steps c
-            JOIN executions e ON c.execution_id = e.execution_id
+            FROM conversation_steps_text c
+            JOIN latest_executions e ON c.execution_id = e.execution_id
             ORDER BY e.prompt_id, e.server_type, c.step_number;
                              
-            CREATE VIEW Full_Report AS
+            -- Runs cancelled by a per-run budget (tokens, wall time or tool calls), across all runs
+            CREATE VIEW budget_exceeded_runs AS
             SELECT 
-                e.prompt_id as Number,
-                e.raw_user_prompt as Prompt,
-                -- Winners
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY total_steps ASC LIMIT 1) as Steps_Winner,
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY total_tokens ASC LIMIT 1) as Tokens_Winner,
-                (SELECT server_type FROM executions WHERE prompt_id = e.prompt_id ORDER BY execution_time_s ASC LIMIT 1) as Time_Winner,
-                -- total_steps
-                MAX(CASE WHEN e.server_type = 'cdata' THEN e.total_steps END) as CData_Steps,
-                MAX(CASE WHEN e.server_type = 'static' THEN e.total_steps END) as Monday_Steps,
-                MAX(CASE WHEN e.server_type = 'dynamic' THEN e.total_steps END) as Graph_Steps,
-                MAX(CASE WHEN e.server_type = 'full' THEN e.total_steps END) as Full_Steps,
-                -- total_tokens
-                MAX(CASE WHEN e.server_type = 'cdata' THEN e.total_tokens END) as CData_Total_Tokens,
-                MAX(CASE WHEN e.server_type = 'static' THEN e.total_tokens END) as Monday_Total_Tokens,
-                MAX(CASE WHEN e.server_type = 'dynamic' THEN e.total_tokens END) as Graph_Total_Tokens,
-                MAX(CASE WHEN e.server_type = 'full' THEN e.total_tokens END) as Full_Total_Tokens,
-                -- execution_time_s
-                MAX(CASE WHEN e.server_type = 'cdata' THEN e.execution_time_s END) as CData_Whole_Chat_Time,
-                MAX(CASE WHEN e.server_type = 'static' THEN e.execution_time_s END) as Monday_Whole_Chat_Time,
-                MAX(CASE WHEN e.server_type = 'dynamic' THEN e.execution_time_s END) as Graph_Whole_Chat_Time,
-                MAX(CASE WHEN e.server_type = 'full' THEN e.execution_time_s END) as Full_Whole_Chat_Time
+                e.prompt_id,
+                e.server_type,
+                e.run_id,
+                e.framework_version,
+                e.model,
+                e.execution_timestamp,
+                e.budget_limit,
+                e.execution_time_s,
+                e.input_tokens,
+                e.output_tokens,
+                e.tool_calls,
+                e.total_steps
             FROM executions e
-            GROUP BY e.prompt_id
-            ORDER BY e.prompt_id;
+            WHERE e.termination_reason = 'budget_exceeded'
+            ORDER BY e.prompt_id, e.server_type, e.execution_timestamp;
+            
+            -- Median of N completed runs per prompt and server, with the spread across runs
+            CREATE VIEW median_executions AS
+            WITH ranked AS (
+                SELECT 
+                    prompt_id,
+                    server_type,
+                    execution_time_s,
+                    total_tokens,
+                    total_steps,
+                    llm_time_s,
+                    mcp_time_s,
+                    COUNT(*) OVER pair as runs,
+                    ROW_NUMBER() OVER (PARTITION BY prompt_id, server_type ORDER BY execution_time_s) as time_rank,
+                    ROW_NUMBER() OVER (PARTITION BY prompt_id, server_type ORDER BY total_tokens) as tokens_rank,
+                    ROW_NUMBER() OVER (PARTITION BY prompt_id, server_type ORDER BY total_steps) as steps_rank,
+                    ROW_NUMBER() OVER (PARTITION BY prompt_id, server_type ORDER BY llm_time_s) as llm_rank,
+                    ROW_NUMBER() OVER (PARTITION BY prompt_id, server_type ORDER BY mcp_time_s) as mcp_rank
+                FROM executions
+                WHERE termination_reason = 'completed'
+                WINDOW pair AS (PARTITION BY prompt_id, server_type)
+            )
+            SELECT 
+                prompt_id,
+                server_type,
+                MAX(runs) as runs,
+                -- Middle row, or the mean of the two middle rows for an even count
+                ROUND(AVG(CASE WHEN time_rank IN ((runs + 1) / 2, (runs + 2) / 2) THEN execution_time_s END), 3) as median_execution_time_s,
+                ROUND(MIN(execution_time_s), 3) as min_execution_time_s,
+                ROUND(MAX(execution_time_s), 3) as max_execution_time_s,
+                ROUND(AVG(execution_time_s * execution_time_s) - AVG(execution_time_s) * AVG(execution_time_s), 3) as execution_time_variance,
+                ROUND(AVG(CASE WHEN tokens_rank IN ((runs + 1) / 2, (runs + 2) / 2) THEN total_tokens END), 0) as median_total_tokens,
+                ROUND(AVG(CASE WHEN steps_rank IN ((runs + 1) / 2, (runs + 2) / 2) THEN total_steps END), 1) as median_total_steps,
+                ROUND(AVG(CASE WHEN llm_rank IN ((runs + 1) / 2, (runs + 2) / 2) THEN llm_time_s END), 3) as median_llm_time_s,
+                ROUND(AVG(CASE WHEN mcp_rank IN ((runs + 1) / 2, (runs + 2) / 2) THEN mcp_time_s END), 3) as median_mcp_time_s
+            FROM ranked
+            GROUP BY prompt_id, server_type
+            ORDER BY prompt_id, server_type;
+            
+            -- Aggregates per framework version, model and server, across all runs
+            CREATE VIEW performance_by_version AS
+            SELECT 
+                e.framework_version,
+                e.model,
+                e.server_type,
+                COUNT(*) as runs,
+                COUNT(DISTINCT e.prompt_id) as prompt_count,
+                MIN(e.execution_timestamp) as first_run,
+                MAX(e.execution_timestamp) as last_run,
+                ROUND(AVG(e.execution_time_s), 3) as avg_execution_time_s,
+                ROUND(MIN(e.execution_time_s), 3) as min_execution_time_s,
+                ROUND(MAX(e.execution_time_s), 3) as max_execution_time_s,
+                ROUND(AVG(e.total_tokens), 0) as avg_total_tokens,
+                ROUND(AVG(e.total_steps), 1) as avg_total_steps,
+                ROUND(AVG(e.llm_time_s), 3) as avg_llm_time_s,
+                ROUND(AVG(e.mcp_time_s), 3) as avg_mcp_time_sum_s,
+                ROUND(AVG(e.llm_queue_time_s), 3) as avg_llm_queue_time_s,
+                SUM(CASE WHEN e.termination_reason = 'budget_exceeded' THEN 1 ELSE 0 END) as budget_exceeded_runs,
+                SUM(CASE WHEN e.termination_reason = 'error' THEN 1 ELSE 0 END) as error_runs
+            FROM executions e
+            GROUP BY e.framework_version, e.model, e.server_type
+            ORDER BY e.framework_version, e.model, e.server_type;
+            
+            -- Framework phases and conversation steps of every run on one axis (seconds from
+            -- the run's start); steps may overlap each other (concurrent tool calls)
+            CREATE VIEW execution_timeline AS
+            SELECT 
+                e.execution_id,
+                e.prompt_id,
+                e.server_type,
+                e.run_id,
+                'phase' as kind,
+                p.value ->> '$.phase' as name,
+                CAST(p.value ->> '$.start_offset_s' AS REAL) as start_offset_s,
+                CAST(p.value ->> '$.end_offset_s' AS REAL) as end_offset_s
+            FROM executions e, json_each(e.phases) p
+            UNION ALL
+            SELECT 
+                e.execution_id,
+                e.prompt_id,
+                e.server_type,
+                e.run_id,
+                c.step_type,
+                COALESCE(c.tool_name, 'LLM'),
+                c.start_offset_s,
+                c.end_offset_s
+            FROM conversation_steps c
+            JOIN executions e ON c.execution_id = e.execution_id
+            WHERE c.start_offset_s IS NOT NULL
+            ORDER BY execution_id, start_offset_s, kind;
         """)
         
+        for view, query in REPORT_QUERIES.items():
+            self.conn.execute(f"CREATE VIEW {view} AS {query.format(where='')}")
+        
+        # Materialized copies of the slowest report views, with the views' columns
+        for view, (table, keys) in MATERIALIZED_REPORTS.items():
+            self.conn.execute(f"CREATE TABLE {table} AS SELECT * FROM {view} WHERE 0")
+            self.conn.execute(f"CREATE INDEX idx_{table} ON {table}({', '.join(keys)})")
+        
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         self.conn.commit()
         print(f"✓ Database created: {self.db_path}")
     
+    def open_database(self, rebuild: bool = False):
+        """Open the database for an incremental import, creating it when missing, outdated or rebuild is set"""
+        self.conn = sqlite3.connect(self.db_path)
+        register_payload_functions(self.conn)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if rebuild or version != SCHEMA_VERSION:
+            if not rebuild and version:
+                print(f"Schema version {version} is outdated (current: {SCHEMA_VERSION}), rebuilding")
+            self.conn.close()
+            self.create_database()
+    
+    def create_indexes(self):
+        """Create the lookup and covering indexes used by the views"""
+        # Plain execute (not executescript) so this can run inside bulk_import's transaction
+        for name, target in INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    
     def import_json_file(self, json_file_path: str):
         """Import a single JSON file containing array of test results"""
-        try:
-            # Use UTF-8 encoding to handle Unicode characters (emojis, special chars)
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if isinstance(data, list):
-                for item in data:
-                    self._import_execution(item)
-            else:
-                self._import_execution(data)
-            
-            self.conn.commit()
-            print(f"✓ Imported: {json_file_path}")
-            
-        except UnicodeDecodeError as e:
-            print(f"✗ Encoding error in {json_file_path}: {e}")
-            print("  Trying with error handling...")
-            
-            # Fallback: try with error handling
-            with open(json_file_path, 'r', encoding='utf-8', errors='replace') as f:
-                data = json.load(f)
-            
-            if isinstance(data, list):
-                for item in data:
-                    self._import_execution(item)
-            else:
-                self._import_execution(data)
-            
-            self.conn.commit()
-            print(f"✓ Imported (with replacements): {json_file_path}")
+        was_fresh = fresh_reports(self.conn)
+        touched = set()
+        for item, record_fingerprint, _ in iter_record_entries(json_file_path):
+            touched.add(self._import_execution(item, record_fingerprint))
+        
+        if self.payloads:
+            self.payloads.flush()
+            # Steps of executions replaced by a record with the same run_id
+            replaced = self.conn.execute("""
+                DELETE FROM conversation_steps
+                WHERE execution_id NOT IN (SELECT execution_id FROM executions)
+            """).rowcount
+            if replaced:
+                self.payloads.prune()
+        self.refresh_latest()
+        self.refresh_reports(touched, was_fresh)
+        self.conn.commit()
+        print(f"✓ Imported: {json_file_path}")
     
-    def _import_execution(self, data: Dict):
-        """Import a single execution record"""
+    def _import_execution(self, data: Dict, record_fingerprint: Optional[str] = None) -> Tuple:
+        """Import a single execution record, returning its (prompt_id, server_type)"""
         cursor = self.conn.cursor()
-        
-        # Determine server type from mcp_server field
-        server_mapping = {
-            'cdata_monday': 'cdata',
-            'native_monday_static': 'static',
-            'native_monday_dynamic': 'dynamic',
-            'native_monday_full': 'full'
-        }
-        server_type = server_mapping.get(data.get('mcp_server', ''), 'unknown')
-        
-        # Insert execution record
-        cursor.execute("""
-            INSERT OR REPLACE INTO executions (
-                prompt_id, server_type, server_description, execution_timestamp,
-                session_mode, raw_user_prompt, final_answer, execution_time_s,
-                total_tokens, input_tokens, output_tokens, llm_time_s, mcp_time_s,
-                total_steps, langfuse_trace_url
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            data.get('prompt_id'),
-            server_type,
-            data.get('server_description'),
-            data.get('execution_timestamp'),
-            data.get('session_mode'),
-            data.get('raw_user_prompt'),
-            data.get('final_answer'),
-            data.get('execution_time_s'),
-            data['summary'].get('total_tokens'),
-            data['summary'].get('input_tokens'),
-            data['summary'].get('output_tokens'),
-            data['summary'].get('llm_time_s'),
-            data['summary'].get('mcp_time_s'),
-            data['summary'].get('total_steps'),
-            data.get('langfuse_trace_url')
-        ))
-        
-        execution_id = cursor.lastrowid
-        
-        # Import conversation flow
-        for idx, step in enumerate(data.get('conversation_flow', []), 1):
-            step_type = step.get('type')
-            
-            cursor.execute("""
-                INSERT INTO conversation_steps (
-                    execution_id, step_number, step_type, duration_s,
-                    input_tokens, output_tokens, total_tokens,
-                    tool_name, tool_input, tool_output, output_text
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                execution_id,
-                idx,
-                step_type,
-                step.get('duration_s'),
-                step.get('input_tokens'),
-                step.get('output_tokens'),
-                step.get('total_tokens'),
-                step.get('tool'),
-                step.get('input'),
-                step.get('output'),
-                step.get('output_text')
-            ))
+        if self.payloads is None:
+            self.payloads = PayloadStore(self.conn)
+        execution, _ = record_rows(data, record_fingerprint)
+        cursor.execute(_insert_sql('executions', EXECUTION_COLUMNS, "INSERT OR REPLACE"), execution)
+        cursor.executemany(_insert_sql('conversation_steps', STEP_COLUMNS),
+                           [self.payloads.hash_step(step) for step in step_rows(cursor.lastrowid, data)])
+        return execution[0], execution[1]
     
     def import_multiple_files(self, file_pattern: str):
         """Import multiple JSON files matching a pattern"""
@@ -437,25 +1203,294 @@ class MCPDataImporter:
         for file_path in files:
             self.import_json_file(str(file_path))
         
+        if self.payloads:
+            self.payloads.report()
         print(f"\n✓ Total imported: {len(files)} files")
     
+    def refresh_latest(self):
+        """Flag the most recent run of each (prompt_id, server_type) as is_latest"""
+        self.conn.execute("""
+            UPDATE executions SET is_latest = ranked.position = 1
+            FROM (
+                SELECT 
+                    execution_id,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY prompt_id, server_type
+                        ORDER BY execution_timestamp DESC, execution_id DESC
+                    ) as position
+                FROM executions
+            ) ranked
+            WHERE executions.execution_id = ranked.execution_id
+              AND executions.is_latest IS NOT (ranked.position = 1)
+        """)
+    
+    def refresh_reports(self, touched: Optional[Iterable[Tuple]] = None, was_fresh: Iterable[str] = ()):
+        """
+        Bring the materialized report tables up to date and record their freshness
+
+        Reports listed in was_fresh (fresh before the import) only recompute the
+        rows of the (prompt_id, server_type) pairs in touched; the others are
+        rebuilt. Runs inside the caller's transaction.
+        """
+        conn = self.conn
+        if touched is not None:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS touched_pairs (prompt_id INTEGER, server_type TEXT)")
+            conn.execute("DELETE FROM touched_pairs")
+            conn.executemany("INSERT INTO touched_pairs VALUES (?, ?)", touched)
+        
+        for view, (table, keys) in MATERIALIZED_REPORTS.items():
+            if touched is not None and view in was_fresh:
+                # Filtered inside the query: SQLite does not push a WHERE into an ordered view
+                touched_keys = f"SELECT DISTINCT {', '.join(keys.values())} FROM touched_pairs"
+                where = f"WHERE ({', '.join('e.' + column for column in keys.values())}) IN ({touched_keys})"
+                conn.execute(f"DELETE FROM {table} WHERE ({', '.join(keys)}) IN ({touched_keys})")
+                conn.execute(f"INSERT INTO {table} {REPORT_QUERIES[view].format(where=where)}")
+            else:
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute(f"INSERT INTO {table} SELECT * FROM main.{view}")
+        
+        executions, max_execution_id = data_signature(conn)
+        refreshed_at = datetime.now().isoformat(timespec='seconds')
+        conn.executemany("INSERT OR REPLACE INTO report_freshness VALUES (?, ?, ?, ?)",
+                         [(view, executions, max_execution_id, refreshed_at) for view in MATERIALIZED_REPORTS])
+    
+    def drop_indexes(self):
+        for name in INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+    
+    def bulk_import(self, records: Iterable[Dict], batch_size: int = 5000) -> Dict:
+        """Bulk import execution records (dicts as written by the agent), see bulk_import_rows"""
+        return self.bulk_import_rows((record_rows(data) for data in records), batch_size)
+    
+    def bulk_import_rows(self, rows: Iterable[Tuple[tuple, List[tuple]]], batch_size: int = 5000,
+                         defer_indexes: Optional[bool] = None, manifest: Optional[List[tuple]] = None) -> Dict:
+        """
+        Import execution rows in one transaction with batched executemany
+
+        The connection runs in WAL mode with synchronous=OFF while loading (a
+        crash mid-import can lose the import, never earlier data, and the
+        database is rebuilt from the JSON files anyway). A record with the
+        run_id of a stored run replaces it, records whose fingerprint is
+        already in the database are skipped, and is_latest is refreshed.
+
+        Args:
+            rows: Iterable of (execution_row, step_rows) pairs from record_rows()
+            batch_size: Step rows buffered before each executemany
+            defer_indexes: Drop the indexes for the load and rebuild them once at
+                the end; by default only when loading into an empty database
+            manifest: import_manifest rows written in the same transaction; the
+                list is read after rows is exhausted, so it may be filled lazily
+
+        Returns:
+            Dict with executions, skipped, steps, seconds and rows_per_s
+        """
+        started = time.perf_counter()
+        conn = self.conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-262144")  # 256 MiB
+        
+        conn.execute("BEGIN")
+        try:
+            if defer_indexes is None:
+                defer_indexes = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM executions)").fetchone()[0]
+            if defer_indexes:
+                self.drop_indexes()
+            was_fresh = fresh_reports(conn)
+            touched = set()
+            self.payloads = payloads = PayloadStore(conn)
+            known = {row[0] for row in conn.execute("SELECT fingerprint FROM executions WHERE fingerprint IS NOT NULL")}
+            fingerprint_index = EXECUTION_COLUMNS.index('fingerprint')
+            # Explicit ids so step rows can be built without a lastrowid round trip per execution
+            next_id = conn.execute("SELECT COALESCE(MAX(execution_id), 0) + 1 FROM executions").fetchone()[0]
+            insert_execution = _insert_sql('executions', ('execution_id',) + EXECUTION_COLUMNS, "INSERT OR REPLACE")
+            insert_step = _insert_sql('conversation_steps', STEP_COLUMNS)
+            execution_batch, step_batch = [], []
+            executions = steps = skipped = 0
+            
+            for execution, steps_of_execution in rows:
+                record_fingerprint = execution[fingerprint_index]
+                if record_fingerprint is not None:
+                    if record_fingerprint in known:
+                        skipped += 1
+                        continue
+                    known.add(record_fingerprint)
+                execution_batch.append((next_id,) + execution)
+                touched.add((execution[0], execution[1]))
+                step_batch.extend(payloads.hash_step((next_id,) + step[1:]) for step in steps_of_execution)
+                next_id += 1
+                if len(step_batch) >= batch_size or len(execution_batch) >= batch_size:
+                    conn.executemany(insert_execution, execution_batch)
+                    conn.executemany(insert_step, step_batch)
+                    payloads.flush()
+                    executions += len(execution_batch)
+                    steps += len(step_batch)
+                    execution_batch, step_batch = [], []
+            conn.executemany(insert_execution, execution_batch)
+            conn.executemany(insert_step, step_batch)
+            payloads.flush()
+            executions += len(execution_batch)
+            steps += len(step_batch)
+            
+            # Steps of executions replaced by a later record with the same run_id
+            replaced = conn.execute("""
+                DELETE FROM conversation_steps
+                WHERE execution_id NOT IN (SELECT execution_id FROM executions)
+            """).rowcount
+            if replaced:
+                payloads.prune()
+            if manifest:
+                conn.executemany("INSERT OR REPLACE INTO import_manifest VALUES (?, ?, ?, ?, ?, ?, ?, ?)", manifest)
+            load_seconds = time.perf_counter() - started
+            if defer_indexes:
+                self.create_indexes()
+                # Merge the search index segments written batch by batch into one b-tree
+                conn.execute("INSERT INTO payloads_fts (payloads_fts) VALUES ('optimize')")
+            self.refresh_latest()
+            self.refresh_reports(touched, was_fresh)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.execute("PRAGMA synchronous=FULL")
+        
+        conn.execute("ANALYZE")
+        seconds = time.perf_counter() - started
+        rows_written = executions + steps
+        result = {
+            'executions': executions,
+            'skipped': skipped,
+            'steps': steps,
+            'seconds': round(seconds, 3),
+            'load_seconds': round(load_seconds, 3),
+            'index_seconds': round(seconds - load_seconds, 3),
+            'rows_per_s': round(rows_written / seconds) if seconds else 0,
+            'payloads': payloads.stats(),
+        }
+        print(f"✓ Bulk imported {executions:,} executions and {steps:,} steps in {seconds:.2f}s "
+              f"({result['rows_per_s']:,} rows/s; load {load_seconds:.2f}s, indexes {result['index_seconds']:.2f}s)")
+        if skipped:
+            print(f"  Skipped {skipped:,} executions already in the database")
+        payloads.report()
+        return result
+    
+    def _plan_files(self, files: List[str]) -> Tuple[List[Tuple[str, int]], Dict[str, tuple]]:
+        """
+        Compare files with the import manifest
+
+        Returns:
+            ([(path, byte offset to read from)] for new or changed files,
+             {path: manifest row} for the files already imported)
+        """
+        to_read = []
+        previous = {}
+        for path in files:
+            row = self.conn.execute(
+                "SELECT size, mtime, content_hash, last_offset, prefix_hash, records FROM import_manifest WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if row is None:
+                to_read.append((path, 0))
+                continue
+            previous[path] = row
+            size, mtime, content_hash, last_offset, prefix_hash, _ = row
+            stat = os.stat(path)
+            if stat.st_size == size and stat.st_mtime == mtime:
+                continue
+            
+            whole_hash, current_prefix_hash = hash_file(path, last_offset)
+            if whole_hash == content_hash:
+                # Touched but unchanged
+                self.conn.execute("UPDATE import_manifest SET mtime = ? WHERE path = ?", (stat.st_mtime, path))
+            elif stat.st_size > last_offset and current_prefix_hash == prefix_hash:
+                # Records appended after the ones already imported (the agent rewrites the
+                # whole history array, but earlier records serialize identically)
+                to_read.append((path, last_offset))
+            else:
+                # Rewritten: read it all again, fingerprints skip the unchanged records
+                to_read.append((path, 0))
+        self.conn.commit()
+        return to_read, previous
+    
+    def bulk_import_files(self, file_pattern: str, batch_size: int = 5000, workers: int = 1,
+                          incremental: bool = False) -> Dict:
+        """
+        Bulk import every JSON file matching a pattern in a single transaction
+
+        Files are parsed incrementally, one record at a time. With workers > 1
+        they are parsed in a process pool while this process writes. With
+        incremental=True, files listed in import_manifest are skipped when
+        unchanged, and only read past the last imported record when records
+        were appended.
+        """
+        files = [str(path.resolve()) for path in sorted(Path('.').glob(file_pattern))]
+        print(f"Found {len(files)} files matching '{file_pattern}'")
+        if incremental:
+            to_read, previous = self._plan_files(files)
+            print(f"  {len(files) - len(to_read)} unchanged, "
+                  f"{sum(1 for _, offset in to_read if offset)} appended, "
+                  f"{sum(1 for _, offset in to_read if not offset)} new or rewritten")
+        else:
+            to_read, previous = [(path, 0) for path in files], {}
+        if not to_read:
+            print("✓ Database is up to date")
+            return {'executions': 0, 'skipped': 0, 'steps': 0, 'seconds': 0.0, 'rows_per_s': 0}
+        
+        manifest = []
+        
+        def on_file_done(path, records, end_offset):
+            stat = os.stat(path)
+            content_hash, prefix_hash = hash_file(path, end_offset)
+            _, offset = next(item for item in to_read if item[0] == path)
+            if offset and path in previous:
+                records += previous[path][5]
+            manifest.append((path, stat.st_size, stat.st_mtime, content_hash, end_offset, prefix_hash,
+                             records, datetime.now().isoformat(timespec='seconds')))
+        
+        if workers > 1 and len(to_read) > 1:
+            rows = parallel_rows(to_read, min(workers, len(to_read)), on_file_done)
+        else:
+            rows = serial_rows(to_read, on_file_done)
+        return self.bulk_import_rows(rows, batch_size, manifest=manifest)
+    
     def close(self):
         if self.conn:
             self.conn.close()
 
 #Usage
 if __name__ == "__main__":
-    importer = MCPDataImporter("mcp_analysis.db")
+    import argparse
     
-    # Create database
-    importer.create_database()
+    parser = argparse.ArgumentParser(description='Import execution JSON files into the analysis database')
+    parser.add_argument('--db', default='mcp_analysis.db', help='SQLite database to import into (default: mcp_analysis.db)')
+    parser.add_argument('--pattern', default='../executions/Prompts/prompt_*.json', help='Glob of JSON files to import')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per executemany batch (default: 5000)')
+    parser.add_argument('--rebuild', action='store_true', help='Drop everything and import all files again')
+    parser.add_argument('--per-file', action='store_true', help='Rebuild, committing file by file with row-at-a-time inserts (slower)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Processes parsing files in parallel (default: 1)')
+    parser.add_argument('--duckdb', nargs='?', const='', metavar='PATH',
+                        help='Also refresh the DuckDB mirror (default path: the database with a .duckdb extension)')
+    args = parser.parse_args()
     
-    # Import your JSON file
-    # importer.import_json_file("../executions/Prompts/prompt_1.json")
+    importer = MCPDataImporter(args.db)
     
-    # If you want to import ALL prompt files (prompt_1.json to prompt_24.json):
-    importer.import_multiple_files("../executions/Prompts/prompt_*.json")
+    # Import all prompt files (prompt_1.json to prompt_24.json by default)
+    if args.per_file:
+        importer.create_database()
+        importer.import_multiple_files(args.pattern)
+    else:
+        # Only new or changed executions are read unless --rebuild is given
+        importer.open_database(rebuild=args.rebuild)
+        result = importer.bulk_import_files(args.pattern, args.batch_size, args.workers, incremental=True)
     
     importer.close()
     
-    print("\n✓ Import complete! Database ready for analysis.")
\ No newline at end of file
+    if args.duckdb is not None:
+        from duckdb_backend import build_duckdb, default_duckdb_path
+        duckdb_path = args.duckdb or default_duckdb_path(args.db)
+        if args.per_file or result['executions'] or not os.path.exists(duckdb_path):
+            build_duckdb(args.db, duckdb_path)
+    
+    print("\n✓ Import complete! Database ready for analysis.")
@@ -1,48 +1,359 @@
 import sqlite3
 import csv
+import json
+import re
+import statistics
 import sys
 import os
+import time
+
+import duckdb_backend
+from import_mcp_data import register_payload_functions, use_materialized_reports
 
 # Get the directory where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(script_dir, "mcp_analysis.db")
 
-def execute_query(query, output_file=None):
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet', 'arrow')
+FORMAT_EXTENSIONS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+# Rows fetched from SQLite at a time; memory use depends on this, not on the result size
+FETCH_SIZE = 5000
+
+# Batches inspected before the Parquet/Arrow schema is fixed (columns still all NULL become strings)
+SCHEMA_LOOKAHEAD_BATCHES = 10
+
+# Tables whose full scans are flagged by --profile
+LARGE_TABLES = ('conversation_steps',)
+
+# The progress handler counts one tick per this many SQLite VM instructions
+VM_TICK = 1000
+
+# Read Full_Report, tool_usage_by_server and prompt_execution_patterns from the tables
+# the importer keeps up to date, when they are fresh (--live turns this off)
+use_materialized = True
+
+# DuckDB mirror to query instead of db_path (--duckdb), see duckdb_backend.py
+duckdb_path = None
+
+# Default number of search results (--limit)
+SEARCH_LIMIT = 20
+
+# Tokens of context in each search snippet
+SNIPPET_TOKENS = 16
+
+
+def connect():
+    """Open the database, with the report views served from their materialized tables when fresh"""
+    if duckdb_path:
+        return duckdb_backend.connect(duckdb_path)
+    conn = sqlite3.connect(db_path)
+    register_payload_functions(conn)
+    if use_materialized:
+        use_materialized_reports(conn)
+    return conn
+
+
+def output_format_for(output_file, fmt=None):
+    """Explicit format, else the one implied by the output file extension, else CSV"""
+    if fmt:
+        return fmt
+    if output_file:
+        return FORMAT_EXTENSIONS.get(os.path.splitext(output_file)[1].lower(), 'csv')
+    return 'csv'
+
+def project_columns(query, columns):
+    """
+    Wrap a query so that only the given columns are returned
+
+    SQLite flattens the subquery, so the other columns (e.g. full tool
+    outputs) are never read from disk.
+    """
+    column_list = ', '.join('"' + column.replace('"', '""') + '"' for column in columns)
+    return f"SELECT {column_list} FROM ({query.strip().rstrip(';')})"
+
+def iter_batches(cursor, fetch_size=FETCH_SIZE):
+    """Yield the cursor's rows in lists of at most fetch_size"""
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield rows
+
+# ====================== WRITERS ======================
+def write_csv(f, column_names, batches):
+    writer = csv.writer(f)
+    writer.writerow(column_names)
+    total = 0
+    for rows in batches:
+        writer.writerows(rows)
+        total += len(rows)
+    return total
+
+def write_jsonl(f, column_names, batches):
+    total = 0
+    for rows in batches:
+        f.writelines(
+            json.dumps(dict(zip(column_names, row)), ensure_ascii=False, default=str) + "\n"
+            for row in rows
+        )
+        total += len(rows)
+    return total
+
+def _arrow_schema(pa, column_names, lookahead):
+    """Infer an Arrow schema from the first batches (SQLite columns carry no fixed type)"""
+    fields = []
+    for index, name in enumerate(column_names):
+        kinds = {type(row[index]) for rows in lookahead for row in rows if row[index] is not None}
+        if not kinds:
+            arrow_type = pa.string()
+        elif kinds <= {int}:
+            arrow_type = pa.int64()
+        elif kinds <= {int, float}:
+            arrow_type = pa.float64()
+        elif kinds <= {bytes}:
+            arrow_type = pa.binary()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+def _arrow_batch(pa, schema, rows):
+    columns = []
+    for field, values in zip(schema, zip(*rows)):
+        if pa.types.is_string(field.type):
+            values = [None if value is None or isinstance(value, str) else str(value) for value in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def write_arrow(output_file, column_names, batches, fmt):
+    """Write batches to a Parquet file or an Arrow IPC file, one record batch per fetch"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError(f"{fmt} output requires pyarrow (pip install pyarrow)")
+    
+    batches = iter(batches)
+    lookahead = []
+    for rows in batches:
+        lookahead.append(rows)
+        if len(lookahead) >= SCHEMA_LOOKAHEAD_BATCHES:
+            break
+    schema = _arrow_schema(pa, column_names, lookahead)
+    
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(output_file, schema, compression='zstd')
+        write = writer.write_batch
+    else:
+        sink = pa.OSFile(output_file, 'wb')
+        writer = pa.ipc.new_file(sink, schema)
+        write = writer.write_batch
+    total = 0
+    try:
+        for rows in lookahead:
+            write(_arrow_batch(pa, schema, rows))
+            total += len(rows)
+        lookahead = None  # Release the inspected batches
+        for rows in batches:
+            write(_arrow_batch(pa, schema, rows))
+            total += len(rows)
+    finally:
+        writer.close()
+        if fmt != 'parquet':
+            sink.close()
+    return total
+
+def execute_query(query, output_file=None, fmt=None, columns=None, fetch_size=FETCH_SIZE, params=()):
     """
-    Execute a SQL query and print results in CSV format
+    Execute a SQL query and stream the results
+
+    Rows are fetched fetch_size at a time and written as they arrive, so
+    memory use stays constant however large the result is.
     
     Args:
         query: SQL query string to execute
-        output_file: Optional file path to save CSV output (default: print to console)
+        output_file: Optional file path to save the output (default: print CSV to console)
+        fmt: One of OUTPUT_FORMATS (default: from the output file extension, else CSV)
+        columns: Optional list of columns to keep (projection pushed into SQLite)
+        fetch_size: Rows fetched per batch
+        params: Values for the query's parameters
     """
+    fmt = output_format_for(output_file, fmt)
     try:
-        conn = sqlite3.connect(db_path)
+        if fmt in ('parquet', 'arrow') and not output_file:
+            raise ValueError(f"{fmt} output needs an output file (-o)")
+        if columns:
+            query = project_columns(query, columns)
+        
+        conn = connect()
         cursor = conn.cursor()
         
         # Execute the query
-        cursor.execute(query)
+        cursor.execute(query, params)
         
         # Get column names
         column_names = [description[0] for description in cursor.description]
-        
-        # Fetch all results
-        rows = cursor.fetchall()
+        batches = iter_batches(cursor, fetch_size)
         
         # Determine output destination
         if output_file:
             # Write to file
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(column_names)
-                writer.writerows(rows)
-            print(f"✓ Results saved to: {output_file}")
-            print(f"  Total rows: {len(rows)}")
+            if fmt in ('parquet', 'arrow'):
+                total = write_arrow(output_file, column_names, batches, fmt)
+            else:
+                with open(output_file, 'w', newline='', encoding='utf-8') as f:
+                    if fmt == 'jsonl':
+                        total = write_jsonl(f, column_names, batches)
+                    else:
+                        total = write_csv(f, column_names, batches)
+            print(f"✓ Results saved to: {output_file} ({fmt})")
+            print(f"  Total rows: {total}")
         else:
             # Write to console
-            writer = csv.writer(sys.stdout)
-            writer.writerow(column_names)
-            writer.writerows(rows)
+            if fmt == 'jsonl':
+                write_jsonl(sys.stdout, column_names, batches)
+            else:
+                write_csv(sys.stdout, column_names, batches)
+        
+        conn.close()
+        
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+
+# ====================== PROFILING ======================
+def explain_query_plan(conn, query):
+    """Return EXPLAIN QUERY PLAN rows as (id, parent, detail)"""
+    return [(row[0], row[1], row[3]) for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+def format_plan(plan):
+    """Indent plan rows under their parent, like the sqlite3 shell's .eqp output"""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * (depth[node_id] + 1) + detail)
+    return lines
+
+def table_aliases(conn, query):
+    """
+    Map the names used in plan rows back to tables
+
+    Plans name tables by their alias (e.g. "SCAN c"), so aliases are
+    collected from the query and from every view it may expand.
+    """
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    sources = [query] + [row[0] for row in conn.execute("SELECT sql FROM sqlite_master WHERE type = 'view'")]
+    keywords = {'where', 'on', 'join', 'left', 'inner', 'cross', 'group', 'order', 'limit', 'using', 'set', 'union', 'natural'}
+    aliases = {}
+    for table in tables:
+        aliases[table] = table
+        pattern = re.compile(rf"\b{re.escape(table)}\s+(?:AS\s+)?(\w+)", re.IGNORECASE)
+        for sql in sources:
+            for alias in pattern.findall(sql or ''):
+                if alias.lower() not in keywords:
+                    aliases.setdefault(alias, table)
+    return aliases
+
+def table_row_count(conn, table):
+    """Row count from ANALYZE statistics when available, else COUNT(*)"""
+    try:
+        row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row:
+        return int(row[0].split()[0])
+    return conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+def full_scans(conn, query, plan):
+    """Tables read with a full scan (no index) according to the plan, as (alias, table) pairs"""
+    aliases = table_aliases(conn, query)
+    scans = []
+    for _, _, detail in plan:
+        match = re.match(r"SCAN (\w+)(.*)", detail)
+        if match and 'INDEX' not in match.group(2) and match.group(1) in aliases:
+            scans.append((match.group(1), aliases[match.group(1)]))
+    return scans
+
+def profile_query(query, repeat=1, columns=None):
+    """
+    Run a query and report how it executes instead of printing its rows
+
+    Shows the query plan, timings over `repeat` runs (the first one with an
+    empty SQLite page cache, the others warm), rows returned, a scan estimate
+    from the plan, SQLite VM instructions and planner statistics, and flags
+    full scans of LARGE_TABLES.
+    """
+    try:
+        if duckdb_path:
+            raise ValueError("--profile reads SQLite query plans; run it without --duckdb")
+        if columns:
+            query = project_columns(query, columns)
+        query = query.strip().rstrip(';')
+        conn = sqlite3.connect(db_path)
+        register_payload_functions(conn)
+        materialized = use_materialized_reports(conn) if use_materialized else []
+        
+        plan = explain_query_plan(conn, query)
+        print("\n=== QUERY PLAN ===")
+        for line in format_plan(plan):
+            print(line)
+        
+        ticks = [0]
+        
+        def count_tick():
+            ticks[0] += 1
+            return 0
+        
+        conn.set_progress_handler(count_tick, VM_TICK)
+        timings = []
+        rows_returned = 0
+        for _ in range(max(repeat, 1)):
+            ticks[0] = 0
+            started = time.perf_counter()
+            cursor = conn.execute(query)
+            rows_returned = sum(len(rows) for rows in iter_batches(cursor))
+            timings.append(time.perf_counter() - started)
+        conn.set_progress_handler(None, 0)
+        
+        print("\n=== PROFILE ===")
+        print(f"Rows returned:     {rows_returned:,}")
+        if len(timings) == 1:
+            print(f"Execution time:    {timings[0]:.3f}s (cold SQLite page cache; use --repeat for warm timings)")
+        else:
+            warm = timings[1:]
+            print(f"Execution time:    first {timings[0]:.3f}s (cold SQLite page cache)")
+            print(f"                   warm  min {min(warm):.3f}s / median {statistics.median(warm):.3f}s / "
+                  f"max {max(warm):.3f}s over {len(warm)} run{'s' if len(warm) > 1 else ''}")
+        print(f"VM instructions:   ~{ticks[0] * VM_TICK:,}")
+        
+        scans = full_scans(conn, query, plan)
+        scanned = {table: table_row_count(conn, table) for _, table in scans}
+        if scanned:
+            print("Full scans:        " + ", ".join(f"{table} ({count:,} rows)" for table, count in scanned.items()))
+            print(f"Rows scanned:      ≥{sum(scanned.values()):,} (estimate from the plan; index lookups not counted)")
+        else:
+            print("Full scans:        none (every table is read through an index)")
+        
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        db_mb = conn.execute("PRAGMA page_count").fetchone()[0] * page_size / 1e6
+        cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        cache_mb = (-cache_size * 1024 if cache_size < 0 else cache_size * page_size) / 1e6
+        print(f"Planner stats:     {'present (ANALYZE)' if has_stats else 'missing - run ANALYZE'}")
+        if materialized:
+            print(f"Report tables:     {', '.join(materialized)} read from materialized tables (--live to bypass)")
+        print(f"Page cache:        {cache_mb:.1f} MB for a {db_mb:.1f} MB database"
+              + (" (database does not fit, warm runs still read from disk)" if db_mb > cache_mb else ""))
         
+        for alias, table in scans:
+            if table in LARGE_TABLES:
+                via = f" (as '{alias}')" if alias != table else ""
+                print(f"⚠️  Full table scan on {table}{via}: {scanned[table]:,} rows read; "
+                      "filter on an indexed column (execution_id) or narrow the view")
         conn.close()
         
     except sqlite3.Error as e:
@@ -50,20 +361,111 @@ def execute_query(query, output_file=None):
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
 
-def execute_query_from_file(file_path, output_file=None):
+# ====================== SEARCH ======================
+# Ranked full-text search over tool inputs, tool outputs and LLM texts. payloads_fts indexes
+# each distinct text once; the best texts are picked first, then expanded to the steps using them
+SEARCH_QUERY = """
+    WITH top AS (
+        SELECT rowid as payload_id, rank
+        FROM payloads_fts
+        WHERE payloads_fts MATCH :match
+        ORDER BY rank
+        LIMIT :limit
+    ),
+    hits AS (
+        -- Snippets only for the texts kept (each one decompresses its payload)
+        SELECT
+            p.hash,
+            top.rank,
+            snippet(payloads_fts, 0, '[', ']', '…', :tokens) as snippet
+        FROM payloads_fts
+        JOIN top ON top.payload_id = payloads_fts.rowid
+        JOIN payloads p ON p.payload_id = top.payload_id
+        WHERE payloads_fts MATCH :match
+    ),
+    matches AS (
+        SELECT h.rank, h.snippet, 'tool_input' as field, c.execution_id, c.step_number, c.step_type, c.tool_name
+        FROM hits h JOIN conversation_steps c ON c.tool_input_hash = h.hash
+        UNION ALL
+        SELECT h.rank, h.snippet, 'tool_output', c.execution_id, c.step_number, c.step_type, c.tool_name
+        FROM hits h JOIN conversation_steps c ON c.tool_output_hash = h.hash
+        UNION ALL
+        SELECT h.rank, h.snippet, 'output_text', c.execution_id, c.step_number, c.step_type, c.tool_name
+        FROM hits h JOIN conversation_steps c ON c.output_text_hash = h.hash
+    )
+    SELECT
+        ROUND(-m.rank, 3) as score,
+        e.prompt_id,
+        e.server_type,
+        e.run_id,
+        e.execution_timestamp,
+        e.is_latest,
+        m.step_number,
+        m.step_type,
+        m.tool_name,
+        m.field,
+        m.snippet
+    FROM matches m
+    JOIN executions e ON e.execution_id = m.execution_id
+    ORDER BY m.rank, e.execution_timestamp DESC, m.step_number
+    LIMIT :limit
+"""
+
+def fts_match(conn, terms):
+    """
+    FTS5 query for search terms
+
+    Words match texts containing all of them, and FTS5 syntax (quotes, AND /
+    OR / NOT, prefix*) is used as is. Anything FTS5 cannot parse, such as a
+    SQL fragment, is searched as one phrase.
+    """
+    terms = terms.strip()
+    if re.fullmatch(r'[\w\s]+', terms):
+        return terms
+    try:
+        conn.execute("SELECT 1 FROM payloads_fts WHERE payloads_fts MATCH ? LIMIT 1", (terms,)).fetchall()
+        return terms
+    except sqlite3.OperationalError:
+        return '"' + terms.replace('"', '""') + '"'
+
+def search_steps(terms, limit=SEARCH_LIMIT, output_file=None, fmt=None):
+    """
+    Print the steps whose tool input, tool output or LLM text best match the terms
+
+    Ranked by BM25, best first, with a snippet around the matches in [brackets].
+    Steps sharing a text share its score; limit caps both the texts and the steps.
+    """
+    if duckdb_path:
+        print("❌ Full-text search needs the SQLite database (drop --duckdb)", file=sys.stderr)
+        return
+    conn = connect()
+    try:
+        match = fts_match(conn, terms)
+    finally:
+        conn.close()
+    execute_query(SEARCH_QUERY, output_file, fmt, params={'match': match, 'limit': limit, 'tokens': SNIPPET_TOKENS})
+
+def execute_query_from_file(file_path, output_file=None, fmt=None, columns=None, profile=False, repeat=1):
     """
     Execute a SQL query from a file
     
     Args:
         file_path: Path to file containing SQL query
-        output_file: Optional file path to save CSV output
+        output_file: Optional file path to save the output
+        fmt: Output format, see execute_query
+        columns: Optional list of columns to keep
+        profile: Profile the query instead of printing its rows
+        repeat: Runs when profiling
     """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             query = f.read()
         
         print(f"Executing query from: {file_path}")
-        execute_query(query, output_file)
+        if profile:
+            profile_query(query, repeat, columns)
+        else:
+            execute_query(query, output_file, fmt, columns)
         
     except FileNotFoundError:
         print(f"❌ File not found: {file_path}", file=sys.stderr)
@@ -94,13 +496,15 @@ def list_views():
     print("\n=== AVAILABLE VIEWS ===")
     execute_query(query)
 
-def interactive_mode():
+def interactive_mode(profile=False, repeat=1):
     """Interactive query mode"""
     print("\n" + "="*80)
     print("INTERACTIVE QUERY MODE")
     print("="*80)
     print("Enter your SQL query (type 'exit' to quit, 'tables' to list tables)")
     print("For multi-line queries, end with semicolon (;)")
+    print("Type 'profile' to toggle profiling, 'profile N' to profile with N runs")
+    print("Type 'search <terms>' for a full-text search of the steps")
     print("="*80 + "\n")
     
     query_buffer = []
@@ -125,6 +529,23 @@ def interactive_mode():
                 query_buffer = []
                 print("Query buffer cleared.")
                 continue
+            elif line.strip().lower().split()[:1] == ['search'] and not query_buffer:
+                terms = line.strip()[len('search'):].strip()
+                if terms:
+                    print()
+                    search_steps(terms)
+                    print()
+                else:
+                    print("Usage: search <terms>")
+                continue
+            elif line.strip().lower().split()[:1] == ['profile'] and not query_buffer:
+                words = line.split()
+                if len(words) > 1 and words[1].isdigit():
+                    profile, repeat = True, int(words[1])
+                else:
+                    profile = not profile
+                print(f"Profiling {'on' if profile else 'off'}" + (f" ({repeat} runs)" if profile else ""))
+                continue
             
             query_buffer.append(line)
             
@@ -132,7 +553,10 @@ def interactive_mode():
             if line.strip().endswith(';'):
                 query = ' '.join(query_buffer)
                 print()  # Empty line before results
-                execute_query(query)
+                if profile:
+                    profile_query(query, repeat)
+                else:
+                    execute_query(query)
                 print()  # Empty line after results
                 query_buffer = []
                 
@@ -145,10 +569,11 @@ def interactive_mode():
 
 def main():
     """Main entry point"""
+    global use_materialized, duckdb_path
     import argparse
     
     parser = argparse.ArgumentParser(
-        description='Execute SQL queries on MCP analysis database and output as CSV',
+        description='Execute SQL queries on MCP analysis database and output as CSV, JSON lines, Parquet or Arrow',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -164,6 +589,25 @@ Examples:
   # Save results to CSV file
   python query_executor.py -q "SELECT * FROM Full_Report" -o results.csv
   
+  # Stream a large view to Parquet, keeping only some columns
+  python query_executor.py -q "SELECT * FROM conversation_steps_with_execution" \
+      --columns prompt_id,server_type,tool_name,duration_s -o steps.parquet
+  
+  # JSON lines to the console
+  python query_executor.py -q "SELECT * FROM performance_comparison" --format jsonl
+  
+  # Profile a slow view: plan, timings over 5 runs, scans
+  python query_executor.py -q "SELECT * FROM Full_Report" --profile --repeat 5
+  
+  # Full-text search of tool inputs, tool outputs and LLM texts, best 50 matching steps
+  python query_executor.py --search "timeout OR rate limit" --limit 50
+  
+  # SQL fragments are searched as a phrase
+  python query_executor.py --search "SELECT * FROM Boards"
+  
+  # Same views on the DuckDB mirror written by import_mcp_data.py --duckdb
+  python query_executor.py -q "SELECT * FROM tool_usage_by_tool" --duckdb
+  
   # List all tables and views
   python query_executor.py --tables
   
@@ -174,10 +618,21 @@ Examples:
     
     parser.add_argument('-q', '--query', help='SQL query to execute')
     parser.add_argument('-f', '--file', help='File containing SQL query')
-    parser.add_argument('-o', '--output', help='Output CSV file (default: print to console)')
+    parser.add_argument('-o', '--output', help='Output file (default: print to console)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS,
+                        help='Output format (default: from the output file extension, else csv)')
+    parser.add_argument('--columns', help='Comma-separated columns to keep')
+    parser.add_argument('--fetch-size', type=int, default=FETCH_SIZE, help=f'Rows fetched per batch (default: {FETCH_SIZE})')
+    parser.add_argument('-s', '--search', metavar='TERMS', help='Full-text search of the steps, ranked (FTS5 syntax accepted)')
+    parser.add_argument('--limit', type=int, default=SEARCH_LIMIT, help=f'Search results to show (default: {SEARCH_LIMIT})')
     parser.add_argument('--tables', action='store_true', help='List all tables and views')
     parser.add_argument('--views', action='store_true', help='List all views')
     parser.add_argument('-i', '--interactive', action='store_true', help='Interactive mode')
+    parser.add_argument('--profile', action='store_true', help='Show query plan, timings and scans instead of results')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per query when profiling (default: 1)')
+    parser.add_argument('--live', action='store_true', help='Compute the report views instead of reading their materialized tables')
+    parser.add_argument('--duckdb', nargs='?', const=duckdb_backend.default_duckdb_path(db_path), metavar='PATH',
+                        help='Run queries on the DuckDB mirror (default path: mcp_analysis.duckdb next to the database)')
     
     args = parser.parse_args()
     
@@ -187,18 +642,26 @@ Examples:
         print("Please run the importer script first to create the database.", file=sys.stderr)
         sys.exit(1)
     
+    columns = [column.strip() for column in args.columns.split(',')] if args.columns else None
+    use_materialized = not args.live
+    duckdb_path = args.duckdb
+    
     # Execute based on arguments
     if args.tables:
         list_tables()
     elif args.views:
         list_views()
+    elif args.search:
+        search_steps(args.search, args.limit, args.output, args.format)
+    elif args.query and args.profile:
+        profile_query(args.query, args.repeat, columns)
     elif args.query:
-        execute_query(args.query, args.output)
+        execute_query(args.query, args.output, args.format, columns, args.fetch_size)
     elif args.file:
-        execute_query_from_file(args.file, args.output)
-    elif args.interactive or len(sys.argv) == 1:
+        execute_query_from_file(args.file, args.output, args.format, columns, args.profile, args.repeat)
+    elif args.interactive or len(sys.argv) == 1 or args.profile or args.duckdb:
         # Default to interactive mode if no arguments
-        interactive_mode()
+        interactive_mode(args.profile, args.repeat)
     else:
         parser.print_help()
 
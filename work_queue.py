@@ -0,0 +1,629 @@
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENT_SCRIPT = os.path.join(ROOT_DIR, "M_K_langfuse_agent.py")
+IMPORTER_SCRIPT = os.path.join(ROOT_DIR, "utils", "import_mcp_data.py")
+ANALYZE_SCRIPT = os.path.join(ROOT_DIR, "utils", "analyze_data.py")
+
+# Seconds a claimed job stays leased without a heartbeat; a worker that stops
+# heartbeating (crash, host down) loses the job to the next worker after this
+LEASE_S = 180
+# Seconds between heartbeats of a running job
+HEARTBEAT_S = 30
+# Seconds an idle worker waits before looking for jobs again
+POLL_S = 10
+# Attempts per job before it is marked failed
+MAX_ATTEMPTS = 3
+# Wait before a failed job is retried, doubled after every attempt
+RETRY_BACKOFF_S = 30
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id INTEGER PRIMARY KEY,
+        prompt_id INTEGER NOT NULL,
+        server TEXT NOT NULL,
+        trial INTEGER NOT NULL,
+        trials INTEGER NOT NULL,
+        -- pending -> running -> done; a failed attempt goes back to pending until max_attempts, then failed
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        -- Unix time before which a retried job is not claimed
+        not_before REAL NOT NULL DEFAULT 0,
+        worker TEXT,
+        lease_expires REAL,
+        started_at REAL,
+        finished_at REAL,
+        error TEXT,
+        -- JSON list of the job's runs: run_id, trial, termination_reason, json_path
+        result TEXT,
+        UNIQUE (prompt_id, server, trial)
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, not_before);
+"""
+
+
+# ====================== WORK QUEUE ======================
+class WorkQueue:
+    """SQLite-backed queue of benchmark jobs, one per prompt × server × trial.
+
+    Workers claim a job with a lease and extend it with heartbeats while the
+    job runs. A job whose lease runs out (its worker died) is claimed again by
+    another worker; a job that fails is retried with a growing backoff, up to
+    its max_attempts. Every state change happens in a BEGIN IMMEDIATE
+    transaction, so any number of worker processes can share the queue.
+
+    The queue file can sit on a filesystem shared by several hosts if it
+    supports POSIX locks (e.g. NFSv4): the rollback journal is used, since
+    WAL needs shared memory. Leases use wall-clock time, so hosts need
+    synchronized clocks (NTP); the lease is long enough to absorb small skews.
+
+    Args:
+        path: Queue database (created if missing).
+        lease_s: Seconds a claim or heartbeat holds a job.
+    """
+
+    def __init__(self, path: str, lease_s: float = LEASE_S):
+        self.path = path
+        self.lease_s = lease_s
+        # Autocommit: the transactions below are explicit
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = DELETE")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, statements):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements()
+            self.conn.execute("COMMIT")
+            return result
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, prompt_ids: Iterable[int], servers: Iterable[str], trials: int = 1,
+                max_attempts: int = MAX_ATTEMPTS) -> int:
+        """Add a job for every prompt × server × trial not queued yet; returns the jobs added."""
+        rows = [(prompt_id, server, trial, trials, max_attempts)
+                for prompt_id in prompt_ids for server in servers for trial in range(1, trials + 1)]
+
+        def insert():
+            before = self.conn.total_changes
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO jobs (prompt_id, server, trial, trials, max_attempts)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            return self.conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Lease the next runnable job to ``worker``, or None if there is none right now."""
+        def claim_next():
+            now = time.time()
+            # Jobs of workers that stopped heartbeating: retry, or give up after max_attempts
+            self.conn.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                    error = 'lease expired on worker ' || worker,
+                    worker = NULL,
+                    lease_expires = NULL
+                WHERE status = 'running' AND lease_expires < ?
+            """, (now,))
+            # Trial-major order, so each server's trials are spread over the whole batch
+            row = self.conn.execute("""
+                SELECT job_id FROM jobs
+                WHERE status = 'pending' AND not_before <= ?
+                ORDER BY trial, prompt_id, server
+                LIMIT 1
+            """, (now,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("""
+                UPDATE jobs
+                SET status = 'running', worker = ?, attempts = attempts + 1,
+                    lease_expires = ?, started_at = ?, finished_at = NULL
+                WHERE job_id = ?
+            """, (worker, now + self.lease_s, now, row['job_id']))
+            return dict(self.conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row['job_id'],)).fetchone())
+
+        return self._transaction(claim_next)
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend the lease; False when ``worker`` no longer holds the job."""
+        cursor = self.conn.execute("""
+            UPDATE jobs SET lease_expires = ?
+            WHERE job_id = ? AND worker = ? AND status = 'running'
+        """, (time.time() + self.lease_s, job_id, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: List[Dict]) -> bool:
+        cursor = self.conn.execute("""
+            UPDATE jobs
+            SET status = 'done', result = ?, error = NULL, finished_at = ?, lease_expires = NULL
+            WHERE job_id = ? AND worker = ? AND status = 'running'
+        """, (json.dumps(result), time.time(), job_id, worker))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str, backoff_s: float = RETRY_BACKOFF_S) -> bool:
+        """Record a failed attempt: back to pending after a backoff, or failed after max_attempts."""
+        cursor = self.conn.execute("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                not_before = ? + ? * (1 << (attempts - 1)),
+                error = ?, worker = NULL, lease_expires = NULL, finished_at = ?
+            WHERE job_id = ? AND worker = ? AND status = 'running'
+        """, (time.time(), backoff_s, error, time.time(), job_id, worker))
+        return cursor.rowcount == 1
+
+    def release(self, job_id: int, worker: str) -> bool:
+        """Give a job back without charging the attempt (the worker was stopped, the job did not fail)."""
+        cursor = self.conn.execute("""
+            UPDATE jobs
+            SET status = 'pending', attempts = MAX(attempts - 1, 0), not_before = 0,
+                error = 'interrupted on worker ' || worker, worker = NULL, lease_expires = NULL
+            WHERE job_id = ? AND worker = ? AND status = 'running'
+        """, (job_id, worker))
+        return cursor.rowcount == 1
+
+    def release_interrupted(self) -> int:
+        """
+        Give back the running jobs of workers that are gone, without charging the attempt
+
+        A job counts as interrupted when its lease ran out, or when its worker
+        ran on this host and its process no longer exists.
+        """
+        def release_all():
+            now = time.time()
+            host = socket.gethostname()
+            released = 0
+            for job_id, worker, lease_expires in self.conn.execute(
+                    "SELECT job_id, worker, lease_expires FROM jobs WHERE status = 'running'").fetchall():
+                worker_host, _, pid = worker.rpartition('-')
+                gone = worker_host == host and pid.isdigit() and not _process_alive(int(pid))
+                if lease_expires < now or gone:
+                    released += self.release(job_id, worker)
+            return released
+
+        return self._transaction(release_all)
+
+    def retry_failed(self, max_attempts: Optional[int] = None) -> int:
+        """
+        Put failed jobs back in the queue
+
+        Args:
+            max_attempts: Raise every unfinished job's attempt limit to this and
+                requeue the failed jobs, each with at least one more attempt
+                (default: requeue every failed job with fresh attempts)
+        """
+        if max_attempts is None:
+            cursor = self.conn.execute("""
+                UPDATE jobs SET status = 'pending', attempts = 0, not_before = 0
+                WHERE status = 'failed'
+            """)
+            return cursor.rowcount
+
+        def raise_limit():
+            self.conn.execute("UPDATE jobs SET max_attempts = MAX(max_attempts, ?) WHERE status != 'done'",
+                              (max_attempts,))
+            # A job is only failed once it used all its attempts, so grant it one more at least
+            return self.conn.execute("""
+                UPDATE jobs SET status = 'pending', not_before = 0, max_attempts = MAX(max_attempts, attempts + 1)
+                WHERE status = 'failed'
+            """).rowcount
+
+        return self._transaction(raise_limit)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in ('pending', 'running', 'done', 'failed')}
+        for status, count in self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def unfinished(self) -> int:
+        """Jobs pending or running, i.e. that may still need a worker."""
+        counts = self.counts()
+        return counts['pending'] + counts['running']
+
+    def manifest(self) -> List[Dict]:
+        """Every job with its status, attempts, last error and runs."""
+        jobs = []
+        for row in self.conn.execute("""
+            SELECT job_id, prompt_id, server, trial, trials, status, attempts, max_attempts,
+                   worker, started_at, finished_at, error, result
+            FROM jobs ORDER BY prompt_id, server, trial
+        """):
+            job = dict(row)
+            job['runs'] = json.loads(job.pop('result')) if job['result'] else []
+            jobs.append(job)
+        return jobs
+
+    def failures(self, limit: int = 20) -> List[Dict]:
+        return [dict(row) for row in self.conn.execute("""
+            SELECT job_id, prompt_id, server, trial, attempts, status, error FROM jobs
+            WHERE error IS NOT NULL AND status != 'done'
+            ORDER BY job_id LIMIT ?
+        """, (limit,))]
+
+
+# ====================== WORKER ======================
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        # os.kill() would terminate the process on Windows; rely on the lease there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def default_output_dir(queue_path: str) -> str:
+    """Where workers write their runs: workers/<worker id>/ next to the queue."""
+    return os.path.join(os.path.dirname(os.path.abspath(queue_path)), "workers")
+
+
+def _run_job(queue: WorkQueue, job: Dict, worker: str, log_dir: str, heartbeat_s: float):
+    """
+    Run one job in a child process, heartbeating while it runs
+
+    Returns:
+        (runs, None) on success, (None, error) on failure, (None, None) when the lease was lost
+    """
+    result_path = os.path.join(log_dir, f"job_{job['job_id']}.result.json")
+    if os.path.exists(result_path):
+        os.remove(result_path)
+    command = [sys.executable, AGENT_SCRIPT, "--server", job['server'], "--prompt", str(job['prompt_id']),
+               "--trials", str(job['trials']), "--trial", str(job['trial']),
+               "--log-dir", log_dir, "--result", result_path]
+
+    # Workers of this host share the agent checkpoints, so a retried job resumes wherever it failed
+    env = dict(os.environ)
+    # Every worker of the queue draws on the same LLM rate limits
+    env.setdefault("ANTHROPIC_RATE_DB", os.path.join(os.path.dirname(os.path.abspath(queue.path)), "rate_limits.db"))
+    env.setdefault("AGENT_CHECKPOINT_DB", os.path.join(os.path.dirname(log_dir),
+                                                       f"agent_checkpoints_{socket.gethostname()}.db"))
+
+    with open(os.path.join(log_dir, f"job_{job['job_id']}.out"), "a", encoding="utf-8") as output:
+        process = subprocess.Popen(command, stdout=output, stderr=subprocess.STDOUT, cwd=ROOT_DIR, env=env)
+        while True:
+            try:
+                exit_code = process.wait(timeout=heartbeat_s)
+                break
+            except subprocess.TimeoutExpired:
+                if not queue.heartbeat(job['job_id'], worker):
+                    # Another worker took the job over; don't record a duplicate run
+                    process.terminate()
+                    process.wait()
+                    return None, None
+
+    if exit_code != 0 or not os.path.exists(result_path):
+        return None, f"exit code {exit_code}"
+    with open(result_path, "r", encoding="utf-8") as f:
+        runs = json.load(f)
+    os.remove(result_path)
+    errors = [run['run_id'] for run in runs if run['termination_reason'] == 'error']
+    if errors:
+        return None, f"run {', '.join(errors)} ended in an error"
+    return runs, None
+
+
+def run_worker(queue_path: str, output_dir: Optional[str] = None, worker: Optional[str] = None,
+               poll_s: float = POLL_S, heartbeat_s: float = HEARTBEAT_S, lease_s: float = LEASE_S):
+    """
+    Claim and run jobs until the queue has none left
+
+    Each job runs M_K_langfuse_agent.py in a child process, writing to
+    <output_dir>/<worker id>/, so workers never write to the same history
+    files; merge() imports them all.
+
+    Returns:
+        (jobs done, jobs failed) by this worker
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    log_dir = os.path.join(output_dir or default_output_dir(queue_path), worker)
+    os.makedirs(log_dir, exist_ok=True)
+    queue = WorkQueue(queue_path, lease_s)
+    done = failed = 0
+
+    print(f"✓ Worker {worker} started, writing to {log_dir}")
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            # Running jobs of other workers may still fail and come back
+            if not queue.unfinished():
+                break
+            time.sleep(poll_s)
+            continue
+
+        label = (f"job {job['job_id']}: prompt {job['prompt_id']} on {job['server']}, "
+                 f"trial {job['trial']}/{job['trials']} (attempt {job['attempts']}/{job['max_attempts']})")
+        print(f"▶ {worker} {label}")
+        started = time.perf_counter()
+        try:
+            runs, error = _run_job(queue, job, worker, log_dir, heartbeat_s)
+        except KeyboardInterrupt:
+            # Stopped by the user: the job goes back to the queue for --resume
+            queue.release(job['job_id'], worker)
+            queue.close()
+            raise
+        seconds = time.perf_counter() - started
+
+        if runs is not None:
+            if queue.complete(job['job_id'], worker, runs):
+                done += 1
+                print(f"✓ {worker} {label} done in {seconds:.1f}s")
+            else:
+                print(f"⚠️  {worker} {label} finished after its lease expired; the result is kept but not recorded")
+        elif error is not None:
+            queue.fail(job['job_id'], worker, error)
+            failed += 1
+            print(f"❌ {worker} {label} failed after {seconds:.1f}s: {error}")
+        else:
+            print(f"⚠️  {worker} lost the lease of {label}, stopped it")
+
+    queue.close()
+    print(f"👋 Worker {worker} finished: {done} jobs done, {failed} failed attempts")
+    return done, failed
+
+
+# ====================== MERGE ======================
+def merge(queue_path: str, db_path: str, output_dir: Optional[str] = None, extra_args: Iterable[str] = ()):
+    """Import every worker's prompt histories into one analysis database (incrementally)."""
+    output_dir = output_dir or default_output_dir(queue_path)
+    command = [sys.executable, IMPORTER_SCRIPT, "--db", os.path.abspath(db_path),
+               "--pattern", "*/prompt_*.json", *extra_args]
+    return subprocess.run(command, cwd=output_dir).returncode
+
+
+def build_reports(db_path: str, report_dir: str) -> List[str]:
+    """Rebuild the aggregate reports of the analysis database as Markdown; returns the files written."""
+    os.makedirs(report_dir, exist_ok=True)
+    reports = {
+        'full_report.md': ['--full'],
+        'prompt_report.md': ['-p', 'all'],
+    }
+    written = []
+    for name, report_args in reports.items():
+        path = os.path.join(report_dir, name)
+        command = [sys.executable, ANALYZE_SCRIPT, '--db', os.path.abspath(db_path), *report_args,
+                   '--format', 'markdown', '-o', path]
+        if subprocess.run(command, cwd=ROOT_DIR).returncode == 0:
+            written.append(path)
+    return written
+
+
+# ====================== BATCH RUN ======================
+def start_workers(queue_path: str, output_dir: Optional[str], processes: int, lease_s: float = LEASE_S):
+    """Run ``processes`` workers on this host until the queue has no job left"""
+    from multiprocessing import Process
+
+    if processes == 1:
+        run_worker(queue_path, output_dir, lease_s=lease_s)
+        return
+    workers = [Process(target=run_worker, args=(queue_path, output_dir), kwargs={'lease_s': lease_s})
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # The workers got the interrupt too and give their jobs back
+        for worker in workers:
+            worker.join()
+        raise
+
+
+def run_batch(queue_path: str, prompt_ids: List[int], servers: List[str], trials: int = 1, processes: int = 1,
+              resume: bool = False, failed: str = 'retry', max_attempts: int = MAX_ATTEMPTS,
+              db_path: str = os.path.join(ROOT_DIR, 'utils', 'mcp_analysis.db'), report_dir: Optional[str] = None,
+              output_dir: Optional[str] = None, lease_s: float = LEASE_S):
+    """
+    Run a prompt × server × trial matrix to the end, then merge the results and rebuild the reports
+
+    The queue is the batch's manifest: every job's status, attempts, last
+    error and run ids are recorded as it completes, and exported to
+    <queue>.manifest.json at the end. A batch that died (proxy outage,
+    laptop sleep, crash) continues with resume=True:
+
+    - finished jobs are skipped,
+    - jobs that were running when it died go back to the queue without
+      using up an attempt,
+    - failed jobs follow ``failed``: 'retry' requeues them with one more
+      attempt, or up to max_attempts if that is higher, 'reset' requeues
+      them with fresh attempts, 'skip' leaves them,
+    - jobs for prompts, servers or trials added to the matrix are queued.
+
+    Returns:
+        The queue's final job counts
+    """
+    queue = WorkQueue(queue_path, lease_s)
+    existing = sum(queue.counts().values())
+    if existing and not resume:
+        queue.close()
+        raise RuntimeError(f"{queue_path} already holds {existing} jobs of an earlier batch: "
+                           "pass --resume to continue it, or use another --queue")
+    if resume:
+        counts = queue.counts()
+        print(f"✓ Resuming {queue_path}: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+        released = queue.release_interrupted()
+        requeued = 0
+        if failed == 'retry':
+            requeued = queue.retry_failed(max_attempts)
+        elif failed == 'reset':
+            requeued = queue.retry_failed()
+        print(f"  {released} interrupted jobs back in the queue, {requeued} failed jobs retried ({failed})")
+    added = queue.enqueue(prompt_ids, servers, trials, max_attempts)
+    print(f"✓ {added} new jobs queued, {queue.unfinished()} to run")
+    queue.close()
+
+    started = time.perf_counter()
+    start_workers(queue_path, output_dir, processes, lease_s)
+
+    queue = WorkQueue(queue_path, lease_s)
+    counts = queue.counts()
+    manifest_path = os.path.splitext(queue_path)[0] + ".manifest.json"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(queue.manifest(), f, indent=2)
+    queue.close()
+    print(f"\n✓ Batch finished in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{count} {status}" for status, count in counts.items()))
+    print(f"✓ Manifest written: {manifest_path}")
+    if counts['failed']:
+        print(f"⚠️  {counts['failed']} jobs failed; see 'status', then run again with --resume (--failed reset to retry them all)")
+
+    if merge(queue_path, db_path, output_dir) == 0:
+        reports = build_reports(db_path, report_dir or os.path.dirname(os.path.abspath(queue_path)))
+        for report in reports:
+            print(f"✓ Report rebuilt: {report}")
+    else:
+        print("❌ Merging the results failed; reports not rebuilt")
+    return counts
+
+
+def parse_prompts(spec: str) -> List[int]:
+    """'all', or a comma-separated list of numbers and ranges like '1-10,13'"""
+    from prompts import ALL_PROMPTS
+
+    if spec == 'all':
+        return [prompt_id for prompt_id, _ in ALL_PROMPTS]
+    prompt_ids = []
+    for part in spec.split(','):
+        first, _, last = part.partition('-')
+        prompt_ids.extend(range(int(first), int(last or first) + 1))
+    return prompt_ids
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Distribute prompt × server × trial runs over worker processes and hosts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Queue prompts 1-44 on two servers, 5 trials each
+  python work_queue.py enqueue --prompts 1-44 --servers cdata_monday,native_monday_full --trials 5
+
+  # Run 4 workers on this host (start more on other hosts sharing the queue's filesystem)
+  python work_queue.py worker --processes 4
+
+  # Progress, then import every worker's results into the analysis database
+  python work_queue.py status
+  python work_queue.py merge --db utils/mcp_analysis.db
+
+  # All of it in one go, then after an interruption continue where it stopped
+  python work_queue.py --queue batch.db run --prompts 1-44 --servers cdata_monday,native_monday_full --trials 5 -p 4
+  python work_queue.py --queue batch.db run --prompts 1-44 --servers cdata_monday,native_monday_full --trials 5 -p 4 --resume
+        """
+    )
+    parser.add_argument('--queue', default='work_queue.db', help='Queue database (default: work_queue.db)')
+    parser.add_argument('--output-dir', help="Workers' output directory (default: workers/ next to the queue)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help='Queue prompt × server × trial jobs')
+    enqueue.add_argument('--prompts', default='all', help="'all' or e.g. '1-10,13' (default: all)")
+    enqueue.add_argument('--servers', required=True, help='Comma-separated server configurations')
+    enqueue.add_argument('--trials', type=int, default=1, help='Trials per prompt and server (default: 1)')
+    enqueue.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                         help=f'Attempts per job before it fails (default: {MAX_ATTEMPTS})')
+
+    worker = commands.add_parser('worker', help='Run jobs until the queue is empty')
+    worker.add_argument('-p', '--processes', type=int, default=1, help='Worker processes on this host (default: 1)')
+    worker.add_argument('--lease', type=float, default=LEASE_S, help=f'Lease seconds (default: {LEASE_S})')
+
+    run = commands.add_parser('run', help='Queue a matrix, run it with local workers, merge and rebuild the reports')
+    run.add_argument('--prompts', default='all', help="'all' or e.g. '1-10,13' (default: all)")
+    run.add_argument('--servers', required=True, help='Comma-separated server configurations')
+    run.add_argument('--trials', type=int, default=1, help='Trials per prompt and server (default: 1)')
+    run.add_argument('-p', '--processes', type=int, default=1, help='Worker processes on this host (default: 1)')
+    run.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                     help=f'Attempts per job before it fails (default: {MAX_ATTEMPTS})')
+    run.add_argument('--resume', action='store_true', help='Continue the batch in --queue, skipping finished jobs')
+    run.add_argument('--failed', choices=['retry', 'reset', 'skip'], default='retry',
+                     help="On --resume: retry failed jobs once more (or up to --max-attempts), 'reset' their attempts, "
+                          "or 'skip' them")
+    run.add_argument('--db', default=os.path.join('utils', 'mcp_analysis.db'),
+                     help='Analysis database to merge into (default: utils/mcp_analysis.db)')
+    run.add_argument('--report-dir', help='Where to write the rebuilt reports (default: next to the queue)')
+    run.add_argument('--lease', type=float, default=LEASE_S, help=f'Lease seconds (default: {LEASE_S})')
+
+    status = commands.add_parser('status', help='Job counts and recent failures')
+    status.add_argument('--manifest', metavar='PATH', help='Also write every job (status, attempts, error, runs) as JSON')
+    commands.add_parser('retry-failed', help='Queue the failed jobs again')
+
+    merge_parser = commands.add_parser('merge', help="Import the workers' results into one analysis database")
+    merge_parser.add_argument('--db', default=os.path.join('utils', 'mcp_analysis.db'),
+                              help='Analysis database (default: utils/mcp_analysis.db)')
+    merge_parser.add_argument('--duckdb', action='store_true', help='Also refresh the DuckDB mirror')
+    args = parser.parse_args()
+
+    if args.command in ('enqueue', 'run'):
+        from server_configs import get_server_configurations
+
+        servers = [server.strip() for server in args.servers.split(',') if server.strip()]
+        unknown = set(servers) - set(get_server_configurations(os.environ.get("MONDAY_API_KEY", "")))
+        if unknown:
+            parser.error(f"unknown servers: {', '.join(sorted(unknown))}")
+
+    if args.command == 'run':
+        try:
+            counts = run_batch(args.queue, parse_prompts(args.prompts), servers, args.trials, args.processes,
+                               args.resume, args.failed, args.max_attempts, args.db, args.report_dir,
+                               args.output_dir, args.lease)
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(1 if counts['failed'] else 0)
+
+    elif args.command == 'enqueue':
+        queue = WorkQueue(args.queue)
+        added = queue.enqueue(parse_prompts(args.prompts), servers, args.trials, args.max_attempts)
+        print(f"✓ Queued {added} new jobs ({queue.unfinished()} pending or running)")
+        queue.close()
+
+    elif args.command == 'worker':
+        start_workers(args.queue, args.output_dir, args.processes, args.lease)
+
+    elif args.command == 'status':
+        queue = WorkQueue(args.queue)
+        counts = queue.counts()
+        print(" | ".join(f"{status}: {count}" for status, count in counts.items()))
+        for job in queue.failures():
+            print(f"  ❌ job {job['job_id']} (prompt {job['prompt_id']} on {job['server']}, trial {job['trial']}, "
+                  f"{job['status']}, {job['attempts']} attempts): {job['error']}")
+        if args.manifest:
+            with open(args.manifest, "w", encoding="utf-8") as f:
+                json.dump(queue.manifest(), f, indent=2)
+            print(f"✓ Manifest written: {args.manifest}")
+        queue.close()
+
+    elif args.command == 'retry-failed':
+        queue = WorkQueue(args.queue)
+        print(f"✓ {queue.retry_failed()} failed jobs queued again")
+        queue.close()
+
+    elif args.command == 'merge':
+        sys.exit(merge(args.queue, args.db, args.output_dir, ['--duckdb'] if args.duckdb else []))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n👋 Exiting...")
+        sys.exit(1)